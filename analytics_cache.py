@@ -0,0 +1,83 @@
+"""
+Analytics Cache Module
+Memoized project analytics (health score, critical path, budget, resources),
+keyed by project and the versions of the collections they are computed from
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+from typing import Any, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+# Results kept; one per (analysis, project, arguments)
+CACHE_SIZE = 512
+
+
+class AnalyticsCache:
+    """LRU cache of computed results
+
+    Keys include the storage versions of the collections a result was
+    computed from, so a change to the data makes old entries unreachable
+    instead of having to invalidate them; they age out of the LRU.
+    Results are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        # Computed outside the lock; two threads missing together both compute
+        result = compute()
+        with self._lock:
+            self._entries[key] = result
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+def memoized(*collections: str, cache: str = 'analytics_cache'):
+    """
+    Cache a ProjectManager analysis by its arguments and the versions of ``collections``
+
+    Uses the instance's AnalyticsCache named by ``cache`` and its
+    ``storage``; without a storage backend there are no versions and every
+    call computes. Today's date is part of the key because the analyses
+    compare dates with now.
+    Place it below @reads so the versions are read under the same lock as
+    the data.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.storage is None:
+                return method(self, *args, **kwargs)
+            key = (
+                method.__name__, args, tuple(sorted(kwargs.items())),
+                tuple(self.storage.version(collection) for collection in collections),
+                date.today()
+            )
+            return getattr(self, cache).get_or_compute(key, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
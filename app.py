@@ -2,7 +2,7 @@ from flask import Flask, jsonify, request, render_template, send_from_directory,
 from flask_cors import CORS
 import json
 import os
-from datetime import datetime, date, timedelta
+from datetime import datetime, timedelta
 import uuid
 import threading
 import time
@@ -10,14 +10,32 @@ import time
 from ai_helper import call_ai_api
 from werkzeug.utils import secure_filename
 import shutil
-import difflib
 from ftp_sync import FTPSyncManager
 from project_manager import ProjectManager
 from team_manager import TeamManager
 from meeting_exporter import MeetingExporter, get_meeting_filename
+from task_store import TaskStore
+from persistence import atomic_write_json
+from storage import create_backend
+from keyed_collection import KeyedCollection
+from due_dates import parse_follow_up_datetime, start_of_day
+from dashboard_summary import DashboardSummary
+from similarity_index import SimilarityIndex
+from task_query import QueryError, TaskQuery
+from task_activity import TaskActivityStore
+from task_changes import BatchError, TaskBatch, apply_task_changes, apply_task_patch, new_task
+from http_cache import check_if_match, conditional, with_record_etag
+from merge_patch import apply_merge_patch
+from ndjson_io import NDJSON_MIMETYPE, export_ndjson, import_records, read_json_array, read_ndjson
+from event_hub import ChangeNotifier, DueWatcher, EventHub
+from data_locks import locked, reads, writes
+from compression import init_compression
+from json_provider import init_json_provider
 
 app = Flask(__name__)
 CORS(app)
+init_json_provider(app)
+init_compression(app)
 
 DATA_FILE = 'data/tasks.json'
 CONFIG_FILE = 'data/config.json'
@@ -31,17 +49,36 @@ PROJECTS_FILE = 'data/projects.json'
 DEALS_FILE = 'data/deals.json'
 MEETINGS_FILE = 'data/meetings.json'
 MEETING_TEMPLATES_FILE = 'data/meeting_templates.json'
+TASK_ACTIVITY_DIR = 'data/task_activity'
+TASK_STORE_FLUSH_INTERVAL = 0.5  # Seconds of task changes coalesced into one write
+DATA_SNAPSHOTS = 5  # Previous versions of each core data file kept in data/snapshots
+# Open /api/events streams; each holds a server thread, so keep this well below waitress --threads
+EVENT_STREAM_LIMIT = int(os.environ.get('EVENT_STREAM_LIMIT', 4))
+EVENT_STREAM_RETRY_SECONDS = 60
+
+def _configured_storage_backend():
+    """Read the storage backend ('json', 'sqlite' or 'journal') from settings"""
+    if os.path.exists(SETTINGS_FILE):
+        try:
+            with open(SETTINGS_FILE, 'r') as f:
+                return json.load(f).get('storage_backend', 'json')
+        except (OSError, ValueError):
+            pass
+    return 'json'
 
-def load_tasks():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r') as f:
-            return json.load(f)
-    return []
+# Tasks, deals, meetings, projects and objectives go through the storage
+# backend; JSON files by default, SQLite after `python storage.py migrate`,
+# or JSON files plus an append-only change journal with 'journal'
+storage = create_backend(_configured_storage_backend(), 'data', snapshots=DATA_SNAPSHOTS)
 
-def save_tasks(tasks):
-    os.makedirs('data', exist_ok=True)
-    with open(DATA_FILE, 'w') as f:
-        json.dump(tasks, f, indent=2, default=str)
+# Tasks are served from memory and written through the backend in the background
+task_store = TaskStore(storage, flush_interval=TASK_STORE_FLUSH_INTERVAL)
+
+# Task history and comments live in per-task logs, loaded only by detail views
+task_activity = TaskActivityStore(TASK_ACTIVITY_DIR, task_store)
+
+def load_tasks():
+    return task_store.all()
 
 def load_config():
     if os.path.exists(CONFIG_FILE):
@@ -76,9 +113,7 @@ def load_config():
     }
 
 def save_config(config):
-    os.makedirs('data', exist_ok=True)
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump(config, f, indent=2)
+    atomic_write_json(CONFIG_FILE, config)
 
 def load_settings():
     if os.path.exists(SETTINGS_FILE):
@@ -91,9 +126,9 @@ def load_settings():
     }
 
 def save_settings(settings):
-    os.makedirs('data', exist_ok=True)
-    with open(SETTINGS_FILE, 'w') as f:
-        json.dump(settings, f, indent=2)
+    atomic_write_json(SETTINGS_FILE, settings)
+    # Settings aren't a storage collection, but responses depending on them are versioned
+    storage.touch('settings')
 
 def load_templates():
     if os.path.exists(TEMPLATES_FILE):
@@ -123,36 +158,7 @@ def load_templates():
     }
 
 def save_templates(templates):
-    os.makedirs('data', exist_ok=True)
-    with open(TEMPLATES_FILE, 'w') as f:
-        json.dump(templates, f, indent=2)
-
-def parse_follow_up_datetime(follow_up_value):
-    """Parse follow-up date/datetime string and return datetime object"""
-    if not follow_up_value:
-        return None
-    
-    # Try parsing as datetime first (YYYY-MM-DDTHH:MM format from datetime-local input)
-    try:
-        # Handle both with and without seconds
-        if 'T' in follow_up_value:
-            if len(follow_up_value) == 16:  # YYYY-MM-DDTHH:MM
-                return datetime.fromisoformat(follow_up_value + ':00')
-            else:
-                return datetime.fromisoformat(follow_up_value)
-        elif ' ' in follow_up_value:
-            # Handle space-separated datetime
-            return datetime.strptime(follow_up_value, '%Y-%m-%d %H:%M:%S')
-    except:
-        pass
-    
-    # Try parsing as date only (YYYY-MM-DD format)
-    try:
-        date_obj = datetime.strptime(follow_up_value, '%Y-%m-%d')
-        # Set to end of day for date-only values for backward compatibility
-        return date_obj.replace(hour=23, minute=59, second=59)
-    except:
-        return None
+    atomic_write_json(TEMPLATES_FILE, templates)
 
 def is_overdue(follow_up_value, status=None):
     """Check if a task is overdue based on follow-up date/time"""
@@ -194,51 +200,43 @@ def load_ai_summary_cache():
     return None
 
 def save_ai_summary_cache(summary, include_completed_cancelled=False):
-    os.makedirs('data', exist_ok=True)
     cache_data = {
         'summary': summary,
         'timestamp': datetime.now().isoformat(),
         'include_completed_cancelled': include_completed_cancelled
     }
-    with open(AI_SUMMARY_CACHE_FILE, 'w') as f:
-        json.dump(cache_data, f, indent=2)
+    atomic_write_json(AI_SUMMARY_CACHE_FILE, cache_data)
 
 def load_objectives():
-    if os.path.exists(TOPICS_FILE):
-        with open(TOPICS_FILE, 'r') as f:
-            return json.load(f)
-    return []
+    return KeyedCollection(storage.load('objectives'))
 
 def save_objectives(objectives):
-    os.makedirs('data', exist_ok=True)
-    with open(TOPICS_FILE, 'w') as f:
-        json.dump(objectives, f, indent=2, default=str)
+    storage.save('objectives', objectives)
+    dashboard_summary.objectives_changed()
+
+# Materialized /api/tasks/summary
+dashboard_summary = DashboardSummary(task_store, load_objectives)
+
+# Candidate index for duplicate detection on task create
+similarity_index = SimilarityIndex(task_store)
 
 def load_projects():
-    if os.path.exists(PROJECTS_FILE):
-        with open(PROJECTS_FILE, 'r') as f:
-            data = json.load(f)
-            # Handle both old (list) and new (dict with projects/templates) formats
-            if isinstance(data, list):
-                return data
-            elif isinstance(data, dict) and 'projects' in data:
-                return data['projects']
-            else:
-                return data if isinstance(data, list) else []
-    return []
+    data = storage.load('projects')
+    # Handle both old (list) and new (dict with projects/templates) formats
+    if isinstance(data, list):
+        return KeyedCollection(data)
+    elif isinstance(data, dict) and 'projects' in data:
+        return KeyedCollection(data['projects'])
+    else:
+        return KeyedCollection()
 
 def save_projects(projects):
-    os.makedirs('data', exist_ok=True)
     # If projects is a dict (new format), save as is
     # If it's a list (old format), just save the list
-    with open(PROJECTS_FILE, 'w') as f:
-        json.dump(projects, f, indent=2, default=str)
+    storage.save('projects', projects)
 
 def load_deals():
-    if os.path.exists(DEALS_FILE):
-        with open(DEALS_FILE, 'r') as f:
-            return json.load(f)
-    return []
+    return KeyedCollection(storage.load('deals'))
 
 def get_deleted_deal_ids():
     """Get set of deleted deal IDs from the deleted_deals.json file"""
@@ -260,20 +258,13 @@ def get_active_deals():
     return [deal for deal in deals if deal.get('id') not in deleted_deal_ids]
 
 def save_deals(deals):
-    os.makedirs('data', exist_ok=True)
-    with open(DEALS_FILE, 'w') as f:
-        json.dump(deals, f, indent=2, default=str)
+    storage.save('deals', deals)
 
 def load_meetings():
-    if os.path.exists(MEETINGS_FILE):
-        with open(MEETINGS_FILE, 'r') as f:
-            return json.load(f)
-    return []
+    return KeyedCollection(storage.load('meetings'))
 
 def save_meetings(meetings):
-    os.makedirs('data', exist_ok=True)
-    with open(MEETINGS_FILE, 'w') as f:
-        json.dump(meetings, f, indent=2, default=str)
+    storage.save('meetings', meetings)
 
 def load_meeting_templates():
     if os.path.exists(MEETING_TEMPLATES_FILE):
@@ -308,9 +299,7 @@ def load_meeting_templates():
     }
 
 def save_meeting_templates(templates):
-    os.makedirs('data', exist_ok=True)
-    with open(MEETING_TEMPLATES_FILE, 'w') as f:
-        json.dump(templates, f, indent=2, default=str)
+    atomic_write_json(MEETING_TEMPLATES_FILE, templates, default=str)
 
 def calculate_financial_year(date_str):
     """Calculate Australian financial year from a date string.
@@ -345,61 +334,36 @@ def load_dashboard_layouts():
 def save_dashboard_layout(user_id, layout):
     layouts = load_dashboard_layouts()
     layouts[user_id] = layout
-    os.makedirs('data', exist_ok=True)
-    with open(DASHBOARD_LAYOUTS_FILE, 'w') as f:
-        json.dump(layouts, f, indent=2)
-
-def add_task_history(task_id, field, old_value, new_value, action='modified'):
-    """Add history entry to a task"""
-    tasks = load_tasks()
-    for task in tasks:
-        if task.get('id') == task_id:
-            if 'history' not in task:
-                task['history'] = []
-            task['history'].append({
-                'timestamp': datetime.now().isoformat(),
-                'action': action,
-                'field': field,
-                'old_value': old_value,
-                'new_value': new_value
-            })
-            save_tasks(tasks)
-            break
+    atomic_write_json(DASHBOARD_LAYOUTS_FILE, layouts)
+
+@writes('tasks')
+def add_task_history(task_id, field, old_value, new_value, action='modified', comment_count=None, changes=None):
+    """
+    Queue a history entry for a task (written to its activity log in the
+    background) and refresh the task's last_updated, and its comment_count
+    if given. ``changes`` are other fields saved in the same update.
+    Returns the entry, or None if there is no such task.
+    """
+    task = task_store.get(task_id)
+    if not task:
+        return None
+    entry = {
+        'timestamp': datetime.now().isoformat(),
+        'action': action,
+        'field': field,
+        'old_value': old_value,
+        'new_value': new_value
+    }
+    task_activity.record_history(task_id, [entry])
+    summary = dict(changes or {}, last_updated=entry['timestamp'])
+    if comment_count is not None and comment_count != task.get('comment_count'):
+        summary['comment_count'] = comment_count
+    task_store.update(dict(task, **summary))
+    return entry
 
 def find_similar_tasks(task_title, task_description='', customer=''):
     """Find tasks similar to the given task"""
-    tasks = load_tasks()
-    similar = []
-    
-    for existing in tasks:
-        if existing.get('status') == 'Completed':
-            continue
-            
-        similarity_score = 0
-        
-        # Check title similarity
-        if existing.get('title'):
-            title_ratio = difflib.SequenceMatcher(None, task_title.lower(), existing['title'].lower()).ratio()
-            similarity_score += title_ratio * 50
-        
-        # Check description similarity
-        if task_description and existing.get('description'):
-            desc_ratio = difflib.SequenceMatcher(None, task_description.lower(), existing['description'].lower()).ratio()
-            similarity_score += desc_ratio * 30
-        
-        # Check customer match
-        if customer and existing.get('customer_name') == customer:
-            similarity_score += 20
-        
-        if similarity_score > 40:  # Threshold for similarity
-            similar.append({
-                'task': existing,
-                'score': similarity_score
-            })
-    
-    # Sort by similarity score
-    similar.sort(key=lambda x: x['score'], reverse=True)
-    return similar[:5]  # Return top 5 similar tasks
+    return similarity_index.find_similar(task_title, task_description, customer)
 
 @app.route('/test')
 def test_page():
@@ -549,27 +513,63 @@ def project_workspace(project_id):
         import traceback
         return f"<pre>Error loading project workspace:\n{str(e)}\n\nTraceback:\n{traceback.format_exc()}</pre>", 500
 
+# Validators for conditional GETs (see http_cache.py)
+def tasks_validators():
+    return storage.version('tasks'), storage.last_modified('tasks')
+
+def summary_validators():
+    """Tasks and objectives versions plus the current due-date time window"""
+    since, until = dashboard_summary.time_window(datetime.now())
+    tag = f"{storage.version('tasks')}.{storage.version('objectives')}.{until.isoformat()}"
+    modified = max(storage.last_modified('tasks'), storage.last_modified('objectives'), since.timestamp())
+    return tag, modified
+
+def notification_validators():
+    """Like the summary, but only while nothing is due soon (minutesUntilDue changes every poll)"""
+    now = datetime.now()
+    if task_store.due.between(now, now + timedelta(hours=1), include_start=False, include_end=True):
+        return None
+    since, until = dashboard_summary.time_window(now)
+    return f"{storage.version('tasks')}.{until.isoformat()}", max(storage.last_modified('tasks'), since.timestamp())
+
+def deals_validators():
+    tag = f"{storage.version('deals')}.{storage.version('settings')}"
+    return tag, max(storage.last_modified('deals'), storage.last_modified('settings'))
+
 @app.route('/api/tasks', methods=['GET'])
+@reads('tasks')
+@conditional(tasks_validators)
 def get_tasks():
-    tasks = load_tasks()
-    return jsonify(tasks)
+    """List tasks, optionally filtered, sorted, paginated and projected (see task_query.py)
+
+    History and comments are left out unless ?include=activity is given.
+    """
+    include_activity = request.args.get('include') == 'activity'
+    try:
+        query = TaskQuery(request.args)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    if query.is_plain:
+        if include_activity:
+            return jsonify([task_activity.with_activity(task) for task in load_tasks()])
+        return jsonify(load_tasks())
+
+    try:
+        tasks, total, next_cursor = query.run(task_store)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    if include_activity:
+        tasks = [task_activity.with_activity(task) if 'id' in task else task for task in tasks]
+    response = jsonify(tasks)
+    response.headers['X-Total-Count'] = str(total)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
 
 @app.route('/api/tasks', methods=['POST'])
+@writes('tasks')
 def create_task():
-    task = request.json
-    task['id'] = str(uuid.uuid4())
-    task['created_date'] = datetime.now().isoformat()
-    task['history'] = [{
-        'timestamp': datetime.now().isoformat(),
-        'action': 'created',
-        'field': 'task',
-        'old_value': None,
-        'new_value': 'Task created'
-    }]
-    task['comments'] = []
-    task['attachments'] = []
-    task['dependencies'] = []
-    task['blocks'] = []
+    task = new_task(request.json)
     
     # Check for similar tasks
     similar = find_similar_tasks(
@@ -578,9 +578,7 @@ def create_task():
         task.get('customer_name', '')
     )
     
-    tasks = load_tasks()
-    tasks.append(task)
-    save_tasks(tasks)
+    task_store.add(task)
     
     response = {'task': task}
     if similar:
@@ -588,147 +586,92 @@ def create_task():
     
     return jsonify(response), 201
 
+@app.route('/api/tasks/<task_id>', methods=['GET'])
+@reads('tasks')
+def get_task(task_id):
+    """One task with its history and comments (list responses leave them out)"""
+    task = task_store.get(task_id)
+    if not task:
+        return jsonify({'error': 'Task not found'}), 404
+    return with_record_etag(jsonify(task_activity.with_activity(task)), task)
+
 @app.route('/api/tasks/<task_id>', methods=['PUT'])
+@writes('tasks')
 def update_task(task_id):
-    tasks = load_tasks()
-    task_data = request.json
-    for i, task in enumerate(tasks):
-        if task['id'] == task_id:
-            # Track history for changed fields
-            if 'history' not in tasks[i]:
-                tasks[i]['history'] = []
-                
-            # Preserve fields that might not be sent in the update
-            preserved_fields = ['history', 'comments', 'attachments', 'dependencies', 'blocks', 'created_date']
-            
-            for field, new_value in task_data.items():
-                if field not in preserved_fields and tasks[i].get(field) != new_value:
-                    tasks[i]['history'].append({
-                        'timestamp': datetime.now().isoformat(),
-                        'action': 'modified',
-                        'field': field,
-                        'old_value': tasks[i].get(field),
-                        'new_value': new_value
-                    })
-            
-            # Update task data while preserving certain fields if not provided
-            for field in preserved_fields:
-                if field not in task_data and field in tasks[i]:
-                    task_data[field] = tasks[i][field]
-            
-            tasks[i].update(task_data)
-            save_tasks(tasks)
-            return jsonify(tasks[i])
+    task = task_store.get(task_id)
+    if task:
+        failed = check_if_match(task, 'Task')
+        if failed:
+            return failed
+        apply_task_changes(task, request.json)
+        task_store.update(task)
+        return with_record_etag(jsonify(task), task)
     return jsonify({'error': 'Task not found'}), 404
 
+@app.route('/api/tasks/<task_id>', methods=['PATCH'])
+@writes('tasks')
+def patch_task(task_id):
+    """Change only the fields in a JSON Merge Patch body; send If-Match to detect concurrent edits"""
+    patch = request.get_json(silent=True)
+    if not isinstance(patch, dict):
+        return jsonify({'error': 'Expected a JSON object (merge patch)'}), 400
+    task = task_store.get(task_id)
+    if not task:
+        return jsonify({'error': 'Task not found'}), 404
+    failed = check_if_match(task, 'Task')
+    if failed:
+        return failed
+    if 'id' in patch and patch['id'] != task_id:
+        return jsonify({'error': 'A task id cannot be changed'}), 400
+    apply_task_patch(task, patch)
+    task_store.update(task)
+    return with_record_etag(jsonify(task), task)
+
+@app.route('/api/tasks/batch', methods=['POST'])
+@writes('tasks')
+def batch_tasks():
+    """Apply a list of create / update / delete / dependencies operations atomically (see task_changes.py)"""
+    data = request.get_json(silent=True) or {}
+    batch = TaskBatch(task_store)
+    try:
+        results = batch.run(data.get('operations') if isinstance(data, dict) else None)
+    except BatchError as e:
+        error = {'error': str(e)}
+        if e.index is not None:
+            error['index'] = e.index
+        return jsonify(error), e.status
+    batch.commit()
+    return jsonify({'results': results, 'version': storage.version('tasks')})
+
 @app.route('/api/tasks/<task_id>/dependencies', methods=['PUT'])
+@writes('tasks')
 def update_task_dependencies(task_id):
     """Update task dependencies"""
-    tasks = load_tasks()
     dependencies = request.json.get('dependencies', [])
-    
-    for task in tasks:
-        if task['id'] == task_id:
-            task['dependencies'] = dependencies
-            
-            # Update blocks field for dependent tasks
-            for t in tasks:
-                if 'blocks' not in t:
-                    t['blocks'] = []
-                # Remove this task from blocks if no longer dependent
-                if task_id in t.get('blocks', []) and t['id'] not in dependencies:
-                    t['blocks'].remove(task_id)
-                # Add this task to blocks if newly dependent
-                elif t['id'] in dependencies and task_id not in t.get('blocks', []):
-                    t['blocks'].append(task_id)
-            
-            save_tasks(tasks)
-            return jsonify({'success': True, 'dependencies': dependencies})
-    
-    return jsonify({'error': 'Task not found'}), 404
+    # Same as a one-operation batch: sets the list and fixes up the other tasks' 'blocks'
+    batch = TaskBatch(task_store)
+    try:
+        batch.run([{'op': 'dependencies', 'id': task_id, 'dependencies': dependencies}])
+    except BatchError as e:
+        return jsonify({'error': str(e)}), e.status
+    batch.commit()
+    return jsonify({'success': True, 'dependencies': dependencies})
 
 @app.route('/api/tasks/<task_id>', methods=['DELETE'])
+@writes('tasks')
 def delete_task(task_id):
-    tasks = load_tasks()
-    tasks = [task for task in tasks if task['id'] != task_id]
-    save_tasks(tasks)
+    task_store.delete(task_id)
     return '', 204
 
 @app.route('/api/tasks/summary', methods=['GET'])
+@reads('objectives', 'tasks')
+@conditional(summary_validators)
 def get_summary():
-    tasks = load_tasks()
-    topics = load_objectives()  # Load objectives
-    today = date.today().isoformat()
-    
-    # Filter out completed and cancelled tasks for active counts
-    active_statuses = ['Completed', 'Cancelled']
-    active_tasks = [t for t in tasks if t.get('status') not in active_statuses]
-    
-    # Get active objectives
-    active_objectives = [t for t in topics if t.get('status') not in ['Completed']]
-    
-    # Process objectives for dashboard display
-    objectives_with_stats = []
-    for obj in active_objectives:
-        # Calculate OKR score
-        okr_score = 0
-        if obj.get('key_results'):
-            total_progress = sum(kr.get('progress', 0) for kr in obj['key_results'])
-            okr_score = total_progress / len(obj['key_results']) if obj['key_results'] else 0
-        
-        # Count associated tasks
-        obj_tasks = [t for t in active_tasks if t.get('topic_id') == obj['id']]
-        completed_obj_tasks = [t for t in tasks if t.get('topic_id') == obj['id'] and t.get('status') == 'Completed']
-        
-        objectives_with_stats.append({
-            'id': obj.get('id'),
-            'title': obj.get('title'),
-            'type': obj.get('objective_type', 'aspirational'),
-            'period': obj.get('period', 'Q1'),
-            'confidence': obj.get('confidence', 0.5),
-            'okr_score': okr_score,
-            'key_results_count': len(obj.get('key_results', [])),
-            'key_results_completed': sum(1 for kr in obj.get('key_results', []) if kr.get('progress', 0) >= 1),
-            'total_tasks': len(obj_tasks) + len(completed_obj_tasks),
-            'active_tasks': len(obj_tasks),
-            'completed_tasks': len(completed_obj_tasks),
-            'status': obj.get('status', 'Active'),
-            'target_date': obj.get('target_date')
-        })
-    
-    # Get all overdue tasks
-    overdue_tasks = [t for t in active_tasks if is_overdue(t.get('follow_up_date'), t.get('status'))]
-    # Sort overdue tasks by follow-up date (oldest first)
-    overdue_tasks = sorted(overdue_tasks, key=lambda x: parse_follow_up_datetime(x.get('follow_up_date')) or datetime.min)
-    
-    summary = {
-        'total': len(active_tasks),  # Only count active tasks
-        'open': len([t for t in tasks if t.get('status') == 'Open']),
-        'due_today': len([t for t in active_tasks if is_due_today(t.get('follow_up_date'))]),
-        'overdue': len(overdue_tasks),
-        'overdue_tasks': overdue_tasks,  # Include full list of overdue tasks
-        'urgent': [t for t in active_tasks if t.get('priority') == 'Urgent'],
-        'by_customer': {},
-        'upcoming': [],
-        'active_objectives': len(active_objectives),
-        'objectives': objectives_with_stats[:5]  # Top 5 objectives for dashboard
-    }
-    
-    # Only show active tasks grouped by customer
-    for task in active_tasks:
-        customer = task.get('customer_name', 'Unassigned')
-        if customer not in summary['by_customer']:
-            summary['by_customer'][customer] = []
-        summary['by_customer'][customer].append(task)
-    
-    # Only show upcoming active tasks (not overdue and not due today)
-    upcoming = [t for t in active_tasks if t.get('follow_up_date') and 
-                not is_overdue(t.get('follow_up_date'), t.get('status')) and 
-                not is_due_today(t.get('follow_up_date'))]
-    # Sort by datetime properly
-    upcoming = sorted(upcoming, key=lambda x: parse_follow_up_datetime(x.get('follow_up_date')) or datetime.max)[:5]
-    
-    return jsonify(summary)
+    # Maintained incrementally by task/objective changes; see dashboard_summary.py
+    # ?format=compact lists task ids per section plus one table of the tasks
+    compact = request.args.get('format') == 'compact'
+    body = dashboard_summary.render(lambda summary: jsonify(summary).get_data(), compact=compact)
+    return app.response_class(body, mimetype='application/json')
 
 @app.route('/api/ai/summary/cache-status', methods=['GET'])
 def ai_summary_cache_status():
@@ -813,10 +756,11 @@ def ai_summary():
                     'cache_timestamp': cached['timestamp']
                 })
     
-    tasks = load_tasks()
-    topics = load_objectives()  # Load objectives
-    projects = load_projects()  # Load projects
-    deals = load_deals()  # Load deals
+    with locked(read=['tasks', 'objectives', 'projects', 'deals']):
+        tasks = load_tasks()
+        topics = load_objectives()  # Load objectives
+        projects = load_projects()  # Load projects
+        deals = load_deals()  # Load deals
     
     # Filter tasks based on the parameter
     if include_completed_cancelled:
@@ -1088,10 +1032,14 @@ def ai_follow_up():
     if task.get('assigned_to'):
         task_context += f"\nAssigned to: {task.get('assigned_to')}"
     
-    # Add comments if they exist
-    if task.get('comments') and len(task['comments']) > 0:
+    # Add comments if they exist (list views don't carry them; read the task's log)
+    comments = task.get('comments')
+    if comments is None and task.get('id'):
+        with locked(read=['tasks']):
+            comments = task_activity.comments(task['id'])
+    if comments and len(comments) > 0:
         task_context += "\n\nRecent Comments:"
-        for comment in task['comments'][-3:]:  # Last 3 comments
+        for comment in comments[-3:]:  # Last 3 comments
             task_context += f"\n- {comment.get('text', '')}"
     
     # Add dependencies context if they exist
@@ -1125,65 +1073,161 @@ def test_notification():
         'message': 'System notifications disabled. Browser notifications are active when dashboard is open.'
     })
 
-@app.route('/api/tasks/notification-check', methods=['GET'])
-def check_notification_tasks():
-    """Check for tasks that need notifications (for browser notifications)"""
-    tasks = load_tasks()
-    
-    # Get active tasks only
-    active_tasks = [t for t in tasks if t.get('status') not in ['Completed', 'Cancelled']]
+def notification_payload(now):
+    """Overdue / due-soon / due-today tasks for browser notifications (call under the tasks read lock)"""
+    due_soon_end = now + timedelta(hours=1)
+    tomorrow_start = start_of_day(now.date()) + timedelta(days=1)
+    
+    def in_store_order(task_ids):
+        return sorted(task_ids, key=task_store.position)
+    
+    def notification(task_id):
+        task = task_store.get(task_id)
+        return {
+            'id': task.get('id'),
+            'title': task.get('title'),
+            'follow_up_date': task.get('follow_up_date'),
+            'customer_name': task.get('customer_name'),
+            'priority': task.get('priority')
+        }
     
-    # Find overdue tasks
-    overdue = []
-    for task in active_tasks:
-        if is_overdue(task.get('follow_up_date'), task.get('status')):
-            overdue.append({
-                'id': task.get('id'),
-                'title': task.get('title'),
-                'follow_up_date': task.get('follow_up_date'),
-                'customer_name': task.get('customer_name'),
-                'priority': task.get('priority')
-            })
+    # Find overdue active tasks
+    overdue = [notification(task_id) for task_id in in_store_order(task_store.due.before(now))]
     
-    # Find tasks due soon (within next hour)
+    # Find tasks due soon (within next hour but not overdue)
     due_soon = []
-    for task in active_tasks:
-        follow_up_dt = parse_follow_up_datetime(task.get('follow_up_date'))
-        if follow_up_dt:
-            time_until_due = (follow_up_dt - datetime.now()).total_seconds()
-            # Due within next hour but not overdue
-            if 0 < time_until_due <= 3600:
-                due_soon.append({
-                    'id': task.get('id'),
-                    'title': task.get('title'),
-                    'follow_up_date': task.get('follow_up_date'),
-                    'customer_name': task.get('customer_name'),
-                    'priority': task.get('priority'),
-                    'minutesUntilDue': time_until_due / 60
-                })
-    
-    # Find tasks due today (but not overdue or due soon)
-    due_today = []
-    for task in active_tasks:
-        if is_due_today(task.get('follow_up_date')) and not is_overdue(task.get('follow_up_date'), task.get('status')):
-            follow_up_dt = parse_follow_up_datetime(task.get('follow_up_date'))
-            if follow_up_dt:
-                time_until_due = (follow_up_dt - datetime.now()).total_seconds()
-                # Only include if more than 1 hour away (otherwise it's in due_soon)
-                if time_until_due > 3600:
-                    due_today.append({
-                        'id': task.get('id'),
-                        'title': task.get('title'),
-                        'follow_up_date': task.get('follow_up_date'),
-                        'customer_name': task.get('customer_name'),
-                        'priority': task.get('priority')
-                    })
+    for task_id in in_store_order(task_store.due.between(now, due_soon_end, include_start=False, include_end=True)):
+        item = notification(task_id)
+        item['minutesUntilDue'] = (task_store.due.due_at(task_id) - now).total_seconds() / 60
+        due_soon.append(item)
+    
+    # Find tasks due later today (more than 1 hour away, otherwise they're in due_soon)
+    due_today = [
+        notification(task_id)
+        for task_id in in_store_order(task_store.due.between(due_soon_end, tomorrow_start, include_start=False))
+    ]
     
-    return jsonify({
+    return {
         'overdue': overdue,
         'dueSoon': due_soon,
         'dueToday': due_today
-    })
+    }
+
+@app.route('/api/tasks/notification-check', methods=['GET'])
+@reads('tasks')
+@conditional(notification_validators)
+def check_notification_tasks():
+    """Check for tasks that need notifications (for browser notifications)"""
+    return jsonify(notification_payload(datetime.now()))
+
+# Server-sent events: one producer per kind of event, fanned out by the hub (see event_hub.py)
+event_hub = EventHub(max_subscribers=EVENT_STREAM_LIMIT)
+change_notifier = ChangeNotifier(event_hub, storage.version)
+storage.changes.add_listener(change_notifier.changed)
+due_watcher = DueWatcher(event_hub, task_store.due, notification_payload)
+
+def wake_due_watcher(collection):
+    if collection == 'tasks':
+        due_watcher.wake()
+
+change_notifier.on_change(wake_due_watcher)
+
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """
+    Server-sent event stream
+
+    Events: change ({collection, version} - follow up with /api/changes),
+    notifications (the notification-check payload, sent on connect and
+    whenever a task becomes due soon or overdue) and sync (deal sync finished).
+    Once EVENT_STREAM_LIMIT streams are open, further clients get 503 and
+    poll /api/events/versions and /api/tasks/notification-check instead.
+    """
+    subscription = event_hub.subscribe()
+    if subscription is None:
+        response = jsonify({'error': 'Too many open event streams', 'poll': '/api/events/versions'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(EVENT_STREAM_RETRY_SECONDS)
+        return response
+    return app.response_class(
+        subscription.stream(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+# Collections served by /api/changes and how to read their current records
+CHANGE_FEED_LOADERS = {
+    'tasks': load_tasks,
+    'deals': get_active_deals,
+    'projects': load_projects,
+    'meetings': load_meetings,
+    'objectives': load_objectives
+}
+
+@app.route('/api/events/versions', methods=['GET'])
+def get_event_versions():
+    """Current version of each collection - what clients refused an event stream poll"""
+    return jsonify({collection: storage.version(collection) for collection in CHANGE_FEED_LOADERS})
+
+def parse_changes_cursor(cursor):
+    """Per-collection seqs from an /api/changes cursor ({} if it is unusable)"""
+    parts = (cursor or '').split('.')
+    if len(parts) != len(CHANGE_FEED_LOADERS) + 1 or parts[0] != storage.instance:
+        # Missing, malformed or issued before a restart
+        return {}
+    try:
+        return dict(zip(CHANGE_FEED_LOADERS, (int(part) for part in parts[1:])))
+    except ValueError:
+        return {}
+
+@app.route('/api/changes', methods=['GET'])
+@reads(*CHANGE_FEED_LOADERS)
+def get_changes():
+    """
+    Records changed since a cursor
+
+    Pass the returned cursor as ?since= on the next call. A collection comes
+    back whole with "resync": true when there is no usable cursor or its
+    changes have aged out of the change ring; the client should then
+    replace its copy. ?collections= limits the response to some collections.
+    """
+    requested = [c.strip() for c in request.args.get('collections', '').split(',') if c.strip()]
+    unknown = [c for c in requested if c not in CHANGE_FEED_LOADERS]
+    if unknown:
+        return jsonify({'error': f"Unknown collection: {', '.join(unknown)}"}), 400
+    requested = requested or list(CHANGE_FEED_LOADERS)
+
+    # -1 marks collections the client has never synced
+    seqs = {collection: -1 for collection in CHANGE_FEED_LOADERS}
+    seqs.update(parse_changes_cursor(request.args.get('since')))
+
+    changes = {}
+    for collection in requested:
+        # Read the seq before the records: anything changing in between is sent again next time
+        delta = storage.changes.since(collection, seqs[collection])
+        if delta is None:
+            seqs[collection] = storage.changes.seq(collection)
+            records = CHANGE_FEED_LOADERS[collection]()
+            changes[collection] = {'resync': True, 'upserted': list(records), 'deleted': []}
+            continue
+
+        upserted_ids, deleted_ids, seqs[collection] = delta
+        upserted = []
+        if upserted_ids:
+            current = (task_store if collection == 'tasks'
+                       else KeyedCollection(CHANGE_FEED_LOADERS[collection]()))
+            for record_id in upserted_ids:
+                record = current.get(record_id)
+                if record is None:
+                    # Removed since (or hidden, like deleted deals)
+                    deleted_ids.append(record_id)
+                else:
+                    upserted.append(record)
+        changes[collection] = {'resync': False, 'upserted': upserted, 'deleted': deleted_ids}
+
+    cursor = '.'.join([storage.instance] + [str(seqs[collection]) for collection in CHANGE_FEED_LOADERS])
+    return jsonify({'cursor': cursor, 'changes': changes})
 
 @app.route('/api/settings', methods=['GET'])
 def get_settings():
@@ -1214,26 +1258,87 @@ def update_settings():
     save_settings(current_settings)
     return jsonify({'success': True})
 
+# Collections that can be exported / imported (see ndjson_io.py)
+TRANSFER_COLLECTIONS = ('tasks', 'deals')
+
+def _transfer_collection():
+    collection = request.args.get('collection', 'tasks')
+    return collection if collection in TRANSFER_COLLECTIONS else None
+
 @app.route('/api/export', methods=['GET'])
 def export_tasks():
-    tasks = load_tasks()
-    return jsonify(tasks)
+    """Export tasks (or ?collection=deals) as a JSON array, or streamed as NDJSON with ?format=ndjson"""
+    collection = _transfer_collection()
+    if collection is None:
+        return jsonify({'error': f"collection must be one of {', '.join(TRANSFER_COLLECTIONS)}"}), 400
+    ndjson = (request.args.get('format') == 'ndjson'
+              or request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE)
+    # Exported tasks carry their history and comments, so an export can be imported elsewhere
+    with_activity = task_activity.with_activity if collection == 'tasks' else (lambda record: record)
+    with locked(read=[collection]):
+        records = load_tasks() if collection == 'tasks' else load_deals()
+        if not ndjson:
+            return jsonify([with_activity(record) for record in records])
+    
+    body = export_ndjson(records, lambda: locked(read=[collection]),
+                         lambda record: app.json.dumps(with_activity(record)))
+    filename = f"{collection}_export_{datetime.now().strftime('%Y-%m-%d')}.ndjson"
+    return app.response_class(body, mimetype=NDJSON_MIMETYPE, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"'
+    })
+
+def _commit_imported_tasks(batch):
+    with locked(write=['tasks']):
+        new_tasks = [task for task in batch if task_store.get(task['id']) is None]
+        task_store.apply(new_tasks)
+    return len(new_tasks)
+
+def _import_deals(items):
+    """
+    Import deals with a single load and save: the deals file is rewritten
+    whole, so committing per batch would rewrite it once per batch
+    """
+    pending = []
+
+    def buffer(batch):
+        pending.extend(batch)
+        return len(batch)
+
+    report = import_records(items, buffer)
+    with locked(write=['deals']):
+        deals = load_deals()
+        new_deals = [deal for deal in pending if not deals.has(deal['id'])]
+        if new_deals:
+            deals.extend(new_deals)
+            save_deals(deals)
+    report['imported'] -= len(pending) - len(new_deals)
+    report['skipped'] += len(pending) - len(new_deals)
+    return report
 
 @app.route('/api/import', methods=['POST'])
 def import_tasks():
-    imported_tasks = request.json
-    if not isinstance(imported_tasks, list):
-        return jsonify({'error': 'Invalid format'}), 400
+    """
+    Import tasks (or ?collection=deals) whose ids are not present yet
+
+    Takes a JSON array, or NDJSON (Content-Type application/x-ndjson or
+    ?format=ndjson) which is parsed as it is read. Tasks are committed in
+    batches, each under a short write lock; deals are saved once at the end.
+    """
+    collection = _transfer_collection()
+    if collection is None:
+        return jsonify({'error': f"collection must be one of {', '.join(TRANSFER_COLLECTIONS)}"}), 400
     
-    current_tasks = load_tasks()
-    for task in imported_tasks:
-        if 'id' not in task:
-            task['id'] = str(uuid.uuid4())
-        if not any(t['id'] == task['id'] for t in current_tasks):
-            current_tasks.append(task)
+    if request.mimetype == NDJSON_MIMETYPE or request.args.get('format') == 'ndjson':
+        items = read_ndjson(request.stream)
+    else:
+        imported = request.get_json(silent=True)
+        if not isinstance(imported, list):
+            return jsonify({'error': 'Invalid format'}), 400
+        items = read_json_array(imported)
     
-    save_tasks(current_tasks)
-    return jsonify({'imported': len(imported_tasks)})
+    if collection == 'deals':
+        return jsonify(_import_deals(items))
+    return jsonify(import_records(items, _commit_imported_tasks))
 
 # Template endpoints
 @app.route('/api/templates', methods=['GET'])
@@ -1266,11 +1371,13 @@ def delete_template(template_identifier):
 
 # Topics API endpoints
 @app.route('/api/topics', methods=['GET'])
+@reads('objectives')
 def get_objectives():
     objectives = load_objectives()
     return jsonify(objectives)
 
 @app.route('/api/topics', methods=['POST'])
+@writes('objectives')
 def create_objective():
     objective = request.json
     objective['id'] = str(uuid.uuid4())
@@ -1308,9 +1415,10 @@ def create_objective():
     return jsonify(objective), 201
 
 @app.route('/api/topics/<topic_id>', methods=['GET'])
+@reads('objectives', 'tasks')
 def get_objective(topic_id):
     objectives = load_objectives()
-    objective = next((o for o in objectives if o['id'] == topic_id), None)
+    objective = objectives.get(topic_id)
     if objective:
         # Get tasks associated with this objective
         tasks = load_tasks()
@@ -1322,9 +1430,10 @@ def get_objective(topic_id):
     return jsonify({'error': 'Objective not found'}), 404
 
 @app.route('/api/topics/<topic_id>', methods=['PUT'])
+@writes('objectives')
 def update_objective(topic_id):
     objectives = load_objectives()
-    objective_index = next((i for i, o in enumerate(objectives) if o['id'] == topic_id), None)
+    objective_index = objectives.index_of(topic_id)
     
     if objective_index is not None:
         updated_objective = request.json
@@ -1357,15 +1466,16 @@ def update_objective(topic_id):
 # DELETE endpoint moved below to avoid duplication
 
 @app.route('/api/topics/<topic_id>/tasks', methods=['GET'])
+@reads('tasks')
 def get_objective_tasks(topic_id):
-    tasks = load_tasks()
-    topic_tasks = [t for t in tasks if t.get('topic_id') == topic_id]
+    topic_tasks = task_store.find(topic_id=topic_id)
     return jsonify(topic_tasks)
 
 @app.route('/api/topics/<topic_id>/notes', methods=['PUT'])
+@writes('objectives')
 def update_objective_notes(topic_id):
     objectives = load_objectives()
-    objective_index = next((i for i, o in enumerate(objectives) if o['id'] == topic_id), None)
+    objective_index = objectives.index_of(topic_id)
     
     if objective_index is not None:
         notes_data = request.json
@@ -1378,9 +1488,10 @@ def update_objective_notes(topic_id):
     return jsonify({'error': 'Objective not found'}), 404
 
 @app.route('/api/topics/<topic_id>', methods=['DELETE'])
+@writes('objectives', 'tasks')
 def delete_objective(topic_id):
     objectives = load_objectives()
-    objective_index = next((i for i, o in enumerate(objectives) if o['id'] == topic_id), None)
+    objective_index = objectives.index_of(topic_id)
     
     if objective_index is not None:
         # Remove the objective
@@ -1388,32 +1499,29 @@ def delete_objective(topic_id):
         save_objectives(objectives)
         
         # Remove objective association from tasks
-        tasks = load_tasks()
-        tasks_updated = False
-        for task in tasks:
-            if task.get('topic_id') == topic_id:
-                del task['topic_id']
-                tasks_updated = True
-        
-        if tasks_updated:
-            save_tasks(tasks)
+        task_store.apply([
+            {field: value for field, value in task.items() if field != 'topic_id'}
+            for task in task_store.find(topic_id=topic_id)
+        ])
         
         return jsonify({'success': True, 'deleted': deleted_objective})
     
     return jsonify({'error': 'Objective not found'}), 404
 
 # Initialize project manager
-project_manager = ProjectManager()
+project_manager = ProjectManager(task_store, storage)
 
 # Projects (Topics) endpoints
 @app.route('/api/projects', methods=['GET'])
+@reads('projects', 'tasks')
 def get_projects():
     projects = load_projects()
+    portfolio = project_manager.portfolio_snapshot()
     # Add calculated fields for each project
     for project in projects:
         # Add health score - handle potential errors gracefully
         try:
-            health = project_manager.calculate_project_health_score(project['id'])
+            health = portfolio[project['id']]['health']
             if 'error' not in health:
                 project['health_score'] = health.get('overall_score', 50)
                 project['health_status'] = health.get('health_status', 'Unknown')
@@ -1432,6 +1540,7 @@ def get_projects():
     return jsonify(projects)
 
 @app.route('/api/projects', methods=['POST'])
+@writes('projects')
 def create_project():
     project = request.json
     project['id'] = str(uuid.uuid4())
@@ -1451,9 +1560,10 @@ def create_project():
     return jsonify(project), 201
 
 @app.route('/api/projects/<project_id>', methods=['GET'])
+@reads('projects')
 def get_project(project_id):
     projects = load_projects()
-    project = next((p for p in projects if p['id'] == project_id), None)
+    project = projects.get(project_id)
     
     if project:
         return jsonify(project)
@@ -1461,9 +1571,10 @@ def get_project(project_id):
     return jsonify({'error': 'Project not found'}), 404
 
 @app.route('/api/projects/<project_id>', methods=['PUT'])
+@writes('projects')
 def update_project(project_id):
     projects = load_projects()
-    project_index = next((i for i, p in enumerate(projects) if p['id'] == project_id), None)
+    project_index = projects.index_of(project_id)
     
     if project_index is not None:
         updated_data = request.json
@@ -1478,15 +1589,16 @@ def update_project(project_id):
 # DELETE endpoint moved below to avoid duplication
 
 @app.route('/api/projects/<project_id>/tasks', methods=['GET'])
+@reads('tasks')
 def get_project_tasks(project_id):
-    tasks = load_tasks()
-    project_tasks = [t for t in tasks if t.get('project_id') == project_id]
+    project_tasks = task_store.find(project_id=project_id)
     return jsonify(project_tasks)
 
 @app.route('/api/projects/<project_id>/notes', methods=['PUT'])
+@writes('projects')
 def update_project_notes(project_id):
     projects = load_projects()
-    project_index = next((i for i, p in enumerate(projects) if p['id'] == project_id), None)
+    project_index = projects.index_of(project_id)
     
     if project_index is not None:
         notes_data = request.json
@@ -1499,9 +1611,10 @@ def update_project_notes(project_id):
     return jsonify({'error': 'Project not found'}), 404
 
 @app.route('/api/projects/<project_id>', methods=['DELETE'])
+@writes('projects', 'tasks')
 def delete_project(project_id):
     projects = load_projects()
-    project_index = next((i for i, p in enumerate(projects) if p['id'] == project_id), None)
+    project_index = projects.index_of(project_id)
     
     if project_index is not None:
         # Remove the project
@@ -1509,15 +1622,10 @@ def delete_project(project_id):
         save_projects(projects)
         
         # Remove project association from tasks
-        tasks = load_tasks()
-        tasks_updated = False
-        for task in tasks:
-            if task.get('project_id') == project_id:
-                del task['project_id']
-                tasks_updated = True
-        
-        if tasks_updated:
-            save_tasks(tasks)
+        task_store.apply([
+            {field: value for field, value in task.items() if field != 'project_id'}
+            for task in task_store.find(project_id=project_id)
+        ])
         
         return jsonify({'success': True, 'deleted': deleted_project})
     
@@ -1527,6 +1635,7 @@ def delete_project(project_id):
 
 # Project Phases
 @app.route('/api/projects/<project_id>/phases', methods=['GET'])
+@reads('projects')
 def get_project_phases(project_id):
     project = project_manager.get_project(project_id)
     if project:
@@ -1534,9 +1643,10 @@ def get_project_phases(project_id):
     return jsonify({'error': 'Project not found'}), 404
 
 @app.route('/api/projects/<project_id>/phases', methods=['POST'])
+@writes('projects')
 def create_project_phase(project_id):
     projects = load_projects()
-    project_index = next((i for i, p in enumerate(projects) if p['id'] == project_id), None)
+    project_index = projects.index_of(project_id)
     
     if project_index is not None:
         phase = request.json
@@ -1555,9 +1665,10 @@ def create_project_phase(project_id):
     return jsonify({'error': 'Project not found'}), 404
 
 @app.route('/api/projects/<project_id>/phases/<phase_id>', methods=['PUT'])
+@writes('projects')
 def update_project_phase(project_id, phase_id):
     projects = load_projects()
-    project_index = next((i for i, p in enumerate(projects) if p['id'] == project_id), None)
+    project_index = projects.index_of(project_id)
     
     if project_index is not None:
         phases = projects[project_index].get('phases', [])
@@ -1573,9 +1684,10 @@ def update_project_phase(project_id, phase_id):
     return jsonify({'error': 'Project not found'}), 404
 
 @app.route('/api/projects/<project_id>/phases/<phase_id>', methods=['DELETE'])
+@writes('projects')
 def delete_project_phase(project_id, phase_id):
     projects = load_projects()
-    project_index = next((i for i, p in enumerate(projects) if p['id'] == project_id), None)
+    project_index = projects.index_of(project_id)
     
     if project_index is not None:
         phases = projects[project_index].get('phases', [])
@@ -1592,6 +1704,7 @@ def delete_project_phase(project_id, phase_id):
 
 # Milestones
 @app.route('/api/projects/<project_id>/milestones', methods=['GET'])
+@reads('projects')
 def get_project_milestones(project_id):
     project = project_manager.get_project(project_id)
     if project:
@@ -1605,9 +1718,10 @@ def get_project_milestones(project_id):
     return jsonify({'error': 'Project not found'}), 404
 
 @app.route('/api/projects/<project_id>/milestones', methods=['POST'])
+@writes('projects')
 def create_project_milestone(project_id):
     projects = load_projects()
-    project_index = next((i for i, p in enumerate(projects) if p['id'] == project_id), None)
+    project_index = projects.index_of(project_id)
     
     if project_index is not None:
         milestone_data = request.json
@@ -1643,6 +1757,7 @@ def create_project_milestone(project_id):
 
 # Gantt Chart Data
 @app.route('/api/projects/<project_id>/gantt', methods=['GET'])
+@reads('projects', 'tasks')
 def get_project_gantt(project_id):
     project = project_manager.get_project(project_id)
     if project:
@@ -1686,9 +1801,10 @@ def get_project_gantt(project_id):
     return jsonify({'error': 'Project not found'}), 404
 
 @app.route('/api/projects/<project_id>/gantt', methods=['PUT'])
+@writes('projects', 'tasks')
 def update_project_gantt(project_id):
     projects = load_projects()
-    project_index = next((i for i, p in enumerate(projects) if p['id'] == project_id), None)
+    project_index = projects.index_of(project_id)
     
     if project_index is not None:
         gantt_data = request.json
@@ -1701,22 +1817,20 @@ def update_project_gantt(project_id):
         
         # Update task gantt properties if provided
         if 'tasks' in gantt_data:
-            tasks = load_tasks()
             for gantt_task in gantt_data['tasks']:
-                task_index = next((i for i, t in enumerate(tasks) if t['id'] == gantt_task['id']), None)
-                if task_index is not None:
-                    if 'gantt_properties' not in tasks[task_index]:
-                        tasks[task_index]['gantt_properties'] = {}
+                task = task_store.get(gantt_task['id'])
+                if task is not None:
+                    if 'gantt_properties' not in task:
+                        task['gantt_properties'] = {}
                     
-                    tasks[task_index]['gantt_properties'].update({
+                    task['gantt_properties'].update({
                         'start_date': gantt_task.get('start'),
                         'end_date': gantt_task.get('end'),
                         'progress': gantt_task.get('progress', 0),
                         'duration': gantt_task.get('duration'),
                         'is_critical_path': gantt_task.get('is_critical', False)
                     })
-            
-            save_tasks(tasks)
+                    task_store.update(task)
         
         save_projects(projects)
         return jsonify({'success': True})
@@ -1725,14 +1839,18 @@ def update_project_gantt(project_id):
 
 # Critical Path Analysis
 @app.route('/api/projects/<project_id>/critical-path', methods=['GET'])
+@reads('projects', 'tasks')
 def get_project_critical_path(project_id):
     result = project_manager.calculate_critical_path(project_id)
+    if 'cycle' in result:
+        return jsonify(result), 409
     if 'error' in result:
         return jsonify(result), 404
     return jsonify(result)
 
 # Resource Management
 @app.route('/api/projects/<project_id>/resources', methods=['GET'])
+@reads('projects')
 def get_project_resources(project_id):
     project = project_manager.get_project(project_id)
     if project:
@@ -1740,9 +1858,10 @@ def get_project_resources(project_id):
     return jsonify({'error': 'Project not found'}), 404
 
 @app.route('/api/projects/<project_id>/resources', methods=['POST'])
+@writes('projects')
 def assign_project_resource(project_id):
     projects = load_projects()
-    project_index = next((i for i, p in enumerate(projects) if p['id'] == project_id), None)
+    project_index = projects.index_of(project_id)
     
     if project_index is not None:
         resource = request.json
@@ -1758,9 +1877,10 @@ def assign_project_resource(project_id):
     return jsonify({'error': 'Project not found'}), 404
 
 @app.route('/api/projects/<project_id>/resources/<resource_id>', methods=['PUT'])
+@writes('projects')
 def update_project_resource(project_id, resource_id):
     projects = load_projects()
-    project_index = next((i for i, p in enumerate(projects) if p['id'] == project_id), None)
+    project_index = projects.index_of(project_id)
     
     if project_index is not None:
         resources = projects[project_index].get('resources', [])
@@ -1776,9 +1896,10 @@ def update_project_resource(project_id, resource_id):
     return jsonify({'error': 'Project not found'}), 404
 
 @app.route('/api/projects/<project_id>/resources/<resource_id>', methods=['DELETE'])
+@writes('projects')
 def remove_project_resource(project_id, resource_id):
     projects = load_projects()
-    project_index = next((i for i, p in enumerate(projects) if p['id'] == project_id), None)
+    project_index = projects.index_of(project_id)
     
     if project_index is not None:
         resources = projects[project_index].get('resources', [])
@@ -1795,6 +1916,7 @@ def remove_project_resource(project_id, resource_id):
 
 # Resource Utilization
 @app.route('/api/projects/<project_id>/resource-utilization', methods=['GET'])
+@reads('projects', 'tasks')
 def get_resource_utilization(project_id):
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
@@ -1806,6 +1928,7 @@ def get_resource_utilization(project_id):
 
 # Budget Tracking
 @app.route('/api/projects/<project_id>/budget', methods=['GET'])
+@reads('projects', 'tasks')
 def get_project_budget(project_id):
     project = project_manager.get_project(project_id)
     if project:
@@ -1817,9 +1940,10 @@ def get_project_budget(project_id):
     return jsonify({'error': 'Project not found'}), 404
 
 @app.route('/api/projects/<project_id>/budget', methods=['PUT'])
+@writes('projects')
 def update_project_budget(project_id):
     projects = load_projects()
-    project_index = next((i for i, p in enumerate(projects) if p['id'] == project_id), None)
+    project_index = projects.index_of(project_id)
     
     if project_index is not None:
         budget_data = request.json
@@ -1839,9 +1963,10 @@ def update_project_budget(project_id):
     return jsonify({'error': 'Project not found'}), 404
 
 @app.route('/api/projects/<project_id>/expenses', methods=['POST'])
+@writes('projects')
 def add_project_expense(project_id):
     projects = load_projects()
-    project_index = next((i for i, p in enumerate(projects) if p['id'] == project_id), None)
+    project_index = projects.index_of(project_id)
     
     if project_index is not None:
         expense = request.json
@@ -1879,6 +2004,7 @@ def add_project_expense(project_id):
 
 # Risk Management
 @app.route('/api/projects/<project_id>/risks', methods=['GET'])
+@reads('projects')
 def get_project_risks(project_id):
     project = project_manager.get_project(project_id)
     if project:
@@ -1886,9 +2012,10 @@ def get_project_risks(project_id):
     return jsonify({'error': 'Project not found'}), 404
 
 @app.route('/api/projects/<project_id>/risks', methods=['POST'])
+@writes('projects')
 def create_project_risk(project_id):
     projects = load_projects()
-    project_index = next((i for i, p in enumerate(projects) if p['id'] == project_id), None)
+    project_index = projects.index_of(project_id)
     
     if project_index is not None:
         risk = request.json
@@ -1914,9 +2041,10 @@ def create_project_risk(project_id):
     return jsonify({'error': 'Project not found'}), 404
 
 @app.route('/api/projects/<project_id>/risks/<risk_id>', methods=['PUT'])
+@writes('projects')
 def update_project_risk(project_id, risk_id):
     projects = load_projects()
-    project_index = next((i for i, p in enumerate(projects) if p['id'] == project_id), None)
+    project_index = projects.index_of(project_id)
     
     if project_index is not None:
         risks = projects[project_index].get('risks', [])
@@ -1946,9 +2074,10 @@ def update_project_risk(project_id, risk_id):
     return jsonify({'error': 'Project not found'}), 404
 
 @app.route('/api/projects/<project_id>/risks/<risk_id>', methods=['DELETE'])
+@writes('projects')
 def delete_project_risk(project_id, risk_id):
     projects = load_projects()
-    project_index = next((i for i, p in enumerate(projects) if p['id'] == project_id), None)
+    project_index = projects.index_of(project_id)
     
     if project_index is not None:
         risks = projects[project_index].get('risks', [])
@@ -1965,11 +2094,13 @@ def delete_project_risk(project_id, risk_id):
 
 # Templates
 @app.route('/api/project-templates', methods=['GET'])
+@reads('projects')
 def get_project_templates():
     templates = project_manager.load_templates()
     return jsonify(templates)
 
 @app.route('/api/project-templates', methods=['POST'])
+@writes('projects')
 def create_project_template():
     template = request.json
     template['id'] = str(uuid.uuid4())
@@ -2004,6 +2135,7 @@ def create_project_from_template(template_id):
 
 # Project Health Score
 @app.route('/api/projects/<project_id>/health', methods=['GET'])
+@reads('projects', 'tasks')
 def get_project_health(project_id):
     health = project_manager.calculate_project_health_score(project_id)
     if 'error' in health:
@@ -2012,8 +2144,10 @@ def get_project_health(project_id):
 
 # Portfolio Management
 @app.route('/api/portfolio/dashboard', methods=['GET'])
+@reads('projects', 'tasks')
 def get_portfolio_dashboard():
     projects = load_projects()
+    portfolio = project_manager.portfolio_snapshot()
     
     # Calculate portfolio metrics
     total_projects = len(projects)
@@ -2022,11 +2156,7 @@ def get_portfolio_dashboard():
     
     # Budget summary
     total_budget = sum(p.get('budget', {}).get('total_budget', 0) for p in projects)
-    total_spent = 0
-    
-    for project in projects:
-        expenses = project.get('budget', {}).get('expense_items', [])
-        total_spent += sum(e['amount'] for e in expenses if e.get('status') == 'Spent')
+    total_spent = sum(portfolio[p['id']]['budget']['summary']['total_spent'] for p in projects)
     
     # Resource utilization across projects
     all_resources = {}
@@ -2045,7 +2175,7 @@ def get_portfolio_dashboard():
     # Health summary
     health_summary = {'Excellent': 0, 'Good': 0, 'At Risk': 0, 'Critical': 0}
     for project in projects:
-        health = project_manager.calculate_project_health_score(project['id'])
+        health = portfolio[project['id']]['health']
         if 'error' not in health:
             health_summary[health['health_status']] = health_summary.get(health['health_status'], 0) + 1
     
@@ -2064,14 +2194,16 @@ def get_portfolio_dashboard():
     })
 
 @app.route('/api/portfolio/resource-utilization', methods=['GET'])
+@reads('projects', 'tasks')
 def get_portfolio_resource_utilization():
     projects = load_projects()
     
     # Aggregate resource utilization across all projects
     resource_data = {}
+    portfolio = project_manager.portfolio_snapshot()
     
     for project in projects:
-        util = project_manager.calculate_resource_utilization(project['id'])
+        util = portfolio[project['id']]['resources']
         if 'error' not in util:
             for resource_id, data in util['utilization'].items():
                 if resource_id not in resource_data:
@@ -2095,6 +2227,7 @@ def get_portfolio_resource_utilization():
 
 # Integration with existing tasks
 @app.route('/api/projects/<project_id>/link-task', methods=['POST'])
+@writes('projects', 'tasks')
 def link_task_to_project(project_id):
     task_id = request.json.get('task_id')
     phase_id = request.json.get('phase_id')
@@ -2103,23 +2236,22 @@ def link_task_to_project(project_id):
     if not task_id:
         return jsonify({'error': 'Task ID required'}), 400
     
-    tasks = load_tasks()
-    task_index = next((i for i, t in enumerate(tasks) if t['id'] == task_id), None)
+    task = task_store.get(task_id)
     
-    if task_index is not None:
-        tasks[task_index]['project_id'] = project_id
+    if task is not None:
+        task['project_id'] = project_id
         
         if phase_id:
-            tasks[task_index]['phase_id'] = phase_id
+            task['phase_id'] = phase_id
         
         if milestone_id:
-            tasks[task_index]['milestone_id'] = milestone_id
+            task['milestone_id'] = milestone_id
         
-        save_tasks(tasks)
+        task_store.update(task)
         
         # Update project task list
         projects = load_projects()
-        project_index = next((i for i, p in enumerate(projects) if p['id'] == project_id), None)
+        project_index = projects.index_of(project_id)
         
         if project_index is not None:
             if 'task_ids' not in projects[project_index]:
@@ -2134,23 +2266,23 @@ def link_task_to_project(project_id):
     return jsonify({'error': 'Task not found'}), 404
 
 @app.route('/api/projects/<project_id>/unlink-task/<task_id>', methods=['DELETE'])
+@writes('projects', 'tasks')
 def unlink_task_from_project(project_id, task_id):
-    tasks = load_tasks()
-    task_index = next((i for i, t in enumerate(tasks) if t['id'] == task_id), None)
+    task = task_store.get(task_id)
     
-    if task_index is not None:
-        if 'project_id' in tasks[task_index]:
-            del tasks[task_index]['project_id']
-        if 'phase_id' in tasks[task_index]:
-            del tasks[task_index]['phase_id']
-        if 'milestone_id' in tasks[task_index]:
-            del tasks[task_index]['milestone_id']
+    if task is not None:
+        if 'project_id' in task:
+            del task['project_id']
+        if 'phase_id' in task:
+            del task['phase_id']
+        if 'milestone_id' in task:
+            del task['milestone_id']
         
-        save_tasks(tasks)
+        task_store.update(task)
         
         # Update project task list
         projects = load_projects()
-        project_index = next((i for i, p in enumerate(projects) if p['id'] == project_id), None)
+        project_index = projects.index_of(project_id)
         
         if project_index is not None:
             if 'task_ids' in projects[project_index] and task_id in projects[project_index]['task_ids']:
@@ -2163,6 +2295,7 @@ def unlink_task_from_project(project_id, task_id):
 
 # Reports
 @app.route('/api/projects/<project_id>/reports/progress', methods=['GET'])
+@reads('projects', 'tasks')
 def get_project_progress_report(project_id):
     project = project_manager.get_project(project_id)
     if not project:
@@ -2216,7 +2349,7 @@ def get_project_progress_report(project_id):
     })
 
 # Team Management endpoints
-team_manager = TeamManager()
+team_manager = TeamManager(task_store=task_store)
 
 @app.route('/api/teams', methods=['GET'])
 def get_teams():
@@ -2294,17 +2427,17 @@ def delete_member(member_id):
     return jsonify({'error': 'Member not found'}), 404
 
 @app.route('/api/members/<member_id>/workload', methods=['GET'])
+@reads('tasks')
 def get_member_workload(member_id):
-    tasks = load_tasks()
-    workload = team_manager.get_member_workload(member_id, tasks)
+    workload = team_manager.get_member_workload(member_id)
     if workload:
         return jsonify(workload)
     return jsonify({'error': 'Member not found'}), 404
 
 @app.route('/api/teams/<team_id>/workload', methods=['GET'])
+@reads('tasks')
 def get_team_workload(team_id):
-    tasks = load_tasks()
-    workload = team_manager.get_team_workload(team_id, tasks)
+    workload = team_manager.get_team_workload(team_id)
     if workload:
         return jsonify(workload)
     return jsonify({'error': 'Team not found'}), 404
@@ -2333,6 +2466,8 @@ def add_department():
 
 # Deals endpoints
 @app.route('/api/deals', methods=['GET'])
+@reads('deals')
+@conditional(deals_validators)
 def get_deals():
     # Get only active deals (excluding deleted ones)
     active_deals = get_active_deals()
@@ -2346,6 +2481,7 @@ def get_deals():
     })
 
 @app.route('/api/deals', methods=['POST'])
+@writes('deals')
 def create_deal():
     deal = request.json
     deal['id'] = str(uuid.uuid4())
@@ -2376,161 +2512,178 @@ def create_deal():
     return jsonify(deal)
 
 @app.route('/api/deals/<deal_id>', methods=['GET'])
+@reads('deals')
 def get_deal(deal_id):
-    deals = load_deals()
-    deal = next((d for d in deals if d['id'] == deal_id), None)
+    deal = storage.get('deals', deal_id)
     if deal:
-        return jsonify(deal)
+        return with_record_etag(jsonify(deal), deal)
     return jsonify({'error': 'Deal not found'}), 404
 
-@app.route('/api/deals/<deal_id>', methods=['PUT'])
+def prepare_deal_update(deal, deal_data, current_user):
+    """Apply the server-maintained fields of an edited deal"""
+    # Preserve original data
+    deal_data['id'] = deal['id']
+    deal_data['created_at'] = deal.get('created_at', datetime.now().isoformat())
+    deal_data['created_by'] = deal.get('created_by', current_user)
+    deal_data['owned_by'] = deal.get('owned_by', current_user)
+    deal_data['updated_at'] = datetime.now().isoformat()
+    deal_data['updated_by'] = current_user
+    
+    # Preserve notes if not in update
+    if 'notes' not in deal_data:
+        deal_data['notes'] = deal.get('notes', [])
+    
+    # If status changed to Won and date_won not set, set it to today
+    if deal_data.get('dealStatus') == 'Won' and not deal_data.get('date_won'):
+        deal_data['date_won'] = datetime.now().date().isoformat()
+    
+    # Calculate financial year if date_won exists
+    if deal_data.get('date_won'):
+        deal_data['financial_year'] = calculate_financial_year(deal_data['date_won'])
+    return deal_data
+
+@app.route('/api/deals/<deal_id>', methods=['PUT', 'PATCH'])
+@writes('deals')
 def update_deal(deal_id):
-    deal_data = request.json
+    """PUT replaces the deal; PATCH applies a JSON Merge Patch. Both honour If-Match."""
+    deal_data = request.get_json(silent=True)
+    if not isinstance(deal_data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
     deals = load_deals()
     settings = load_settings()
     current_user = settings.get('user_id', 'unknown')
     
-    for i, deal in enumerate(deals):
-        if deal['id'] == deal_id:
-            # Check ownership - only allow updates if user owns the deal
-            if deal.get('owned_by') and deal.get('owned_by') != current_user:
-                return jsonify({'error': 'You can only edit deals you created'}), 403
-            
-            # Preserve original data
-            deal_data['id'] = deal_id
-            deal_data['created_at'] = deal.get('created_at', datetime.now().isoformat())
-            deal_data['created_by'] = deal.get('created_by', current_user)
-            deal_data['owned_by'] = deal.get('owned_by', current_user)
-            deal_data['updated_at'] = datetime.now().isoformat()
-            deal_data['updated_by'] = current_user
-            
-            # Preserve notes if not in update
-            if 'notes' not in deal_data:
-                deal_data['notes'] = deal.get('notes', [])
-            
-            # If status changed to Won and date_won not set, set it to today
-            if deal_data.get('dealStatus') == 'Won' and not deal_data.get('date_won'):
-                deal_data['date_won'] = datetime.now().date().isoformat()
-            
-            # Calculate financial year if date_won exists
-            if deal_data.get('date_won'):
-                deal_data['financial_year'] = calculate_financial_year(deal_data['date_won'])
-            
-            deals[i] = deal_data
-            save_deals(deals)
-            return jsonify(deal_data)
+    i = deals.index_of(deal_id)
+    if i is not None:
+        deal = deals[i]
+        # Check ownership - only allow updates if user owns the deal
+        if deal.get('owned_by') and deal.get('owned_by') != current_user:
+            return jsonify({'error': 'You can only edit deals you created'}), 403
+        failed = check_if_match(deal, 'Deal')
+        if failed:
+            return failed
+        
+        if request.method == 'PATCH':
+            deal_data = apply_merge_patch(deal, deal_data)
+        deal_data = prepare_deal_update(deal, deal_data, current_user)
+        deals[i] = deal_data
+        save_deals(deals)
+        return with_record_etag(jsonify(deal_data), deal_data)
     return jsonify({'error': 'Deal not found'}), 404
 
 @app.route('/api/deals/<deal_id>/notes', methods=['POST'])
+@writes('deals')
 def add_deal_note(deal_id):
     note = request.json
     note['id'] = str(uuid.uuid4())
     note['timestamp'] = datetime.now().isoformat()
     
     deals = load_deals()
-    for deal in deals:
-        if deal['id'] == deal_id:
-            if 'notes' not in deal:
-                deal['notes'] = []
-            deal['notes'].append(note)
-            deal['updated_at'] = datetime.now().isoformat()
-            save_deals(deals)
-            return jsonify(note)
-    
+    deal = deals.get(deal_id)
+    if deal is not None:
+        if 'notes' not in deal:
+            deal['notes'] = []
+        deal['notes'].append(note)
+        deal['updated_at'] = datetime.now().isoformat()
+        save_deals(deals)
+        return jsonify(note)
+
     return jsonify({'error': 'Deal not found'}), 404
 
 @app.route('/api/deals/<deal_id>/notes/<note_id>', methods=['DELETE'])
+@writes('deals')
 def delete_deal_note(deal_id, note_id):
     deals = load_deals()
-    for deal in deals:
-        if deal['id'] == deal_id:
-            if 'notes' in deal:
-                deal['notes'] = [n for n in deal['notes'] if n.get('id') != note_id]
-                deal['updated_at'] = datetime.now().isoformat()
-                save_deals(deals)
-                return jsonify({'success': True})
-    
+    deal = deals.get(deal_id)
+    if deal is not None:
+        if 'notes' in deal:
+            deal['notes'] = [n for n in deal['notes'] if n.get('id') != note_id]
+            deal['updated_at'] = datetime.now().isoformat()
+            save_deals(deals)
+            return jsonify({'success': True})
+
     return jsonify({'error': 'Deal or note not found'}), 404
 
 @app.route('/api/deals/<deal_id>/comments', methods=['GET', 'POST'])
+@writes('deals')
 def handle_deal_comments(deal_id):
     deals = load_deals()
     settings = load_settings()
     current_user = settings.get('user_id', 'unknown')
     
-    for i, deal in enumerate(deals):
-        if deal['id'] == deal_id:
-            if request.method == 'GET':
-                # Get comments and mark as read if owned by current user
-                comments = deal.get('comments', [])
-                
-                # Mark comments as read if the current user owns the deal
-                if deal.get('owned_by') == current_user:
-                    unread_before = any(not c.get('read', False) for c in comments)
-                    for comment in comments:
-                        if not comment.get('read', False):
-                            comment['read'] = True
-                            comment['read_at'] = datetime.now().isoformat()
-                    
-                    # Save if we marked any as read
-                    if unread_before:
-                        deals[i] = deal
-                        save_deals(deals)
-                
-                return jsonify(comments)
+    i = deals.index_of(deal_id)
+    if i is not None:
+        deal = deals[i]
+        if request.method == 'GET':
+            # Get comments and mark as read if owned by current user
+            comments = deal.get('comments', [])
             
-            elif request.method == 'POST':
-                comment = request.json
-                comment['id'] = str(uuid.uuid4())
-                comment['author'] = current_user
-                comment['timestamp'] = datetime.now().isoformat()
-                comment['read'] = False  # New comments are unread
-                
-                if 'comments' not in deal:
-                    deal['comments'] = []
+            # Mark comments as read if the current user owns the deal
+            if deal.get('owned_by') == current_user:
+                unread_before = any(not c.get('read', False) for c in comments)
+                for comment in comments:
+                    if not comment.get('read', False):
+                        comment['read'] = True
+                        comment['read_at'] = datetime.now().isoformat()
                 
-                deal['comments'].append(comment)
-                deals[i] = deal
-                save_deals(deals)
-                return jsonify(comment)
-    
+                # Save if we marked any as read
+                if unread_before:
+                    deals[i] = deal
+                    save_deals(deals)
+            
+            return jsonify(comments)
+        
+        elif request.method == 'POST':
+            comment = request.json
+            comment['id'] = str(uuid.uuid4())
+            comment['author'] = current_user
+            comment['timestamp'] = datetime.now().isoformat()
+            comment['read'] = False  # New comments are unread
+            
+            if 'comments' not in deal:
+                deal['comments'] = []
+            
+            deal['comments'].append(comment)
+            deals[i] = deal
+            save_deals(deals)
+            return jsonify(comment)
+
     return jsonify({'error': 'Deal not found'}), 404
 
 @app.route('/api/deals/<deal_id>/comments/<comment_id>/read', methods=['POST'])
+@writes('deals')
 def mark_comment_read(deal_id, comment_id):
     deals = load_deals()
     settings = load_settings()
     current_user = settings.get('user_id', 'unknown')
     
-    for i, deal in enumerate(deals):
-        if deal['id'] == deal_id:
-            # Only the deal owner can mark comments as read
-            if deal.get('owned_by') != current_user:
-                return jsonify({'error': 'Only the deal owner can mark comments as read'}), 403
-            
-            for comment in deal.get('comments', []):
-                if comment.get('id') == comment_id:
-                    comment['read'] = True
-                    comment['read_at'] = datetime.now().isoformat()
-                    deals[i] = deal
-                    save_deals(deals)
-                    return jsonify({'success': True})
-            
-            return jsonify({'error': 'Comment not found'}), 404
-    
+    i = deals.index_of(deal_id)
+    if i is not None:
+        deal = deals[i]
+        # Only the deal owner can mark comments as read
+        if deal.get('owned_by') != current_user:
+            return jsonify({'error': 'Only the deal owner can mark comments as read'}), 403
+        
+        for comment in deal.get('comments', []):
+            if comment.get('id') == comment_id:
+                comment['read'] = True
+                comment['read_at'] = datetime.now().isoformat()
+                deals[i] = deal
+                save_deals(deals)
+                return jsonify({'success': True})
+        
+        return jsonify({'error': 'Comment not found'}), 404
+
     return jsonify({'error': 'Deal not found'}), 404
 
 @app.route('/api/deals/<deal_id>', methods=['DELETE'])
+@writes('deals')
 def delete_deal(deal_id):
     deals = load_deals()
     settings = load_settings()
     
     # Find the deal to get ownership info
-    deal_to_delete = None
-    for deal in deals:
-        if deal['id'] == deal_id:
-            deal_to_delete = deal
-            break
+    deal_to_delete = deals.get(deal_id)
     
     if not deal_to_delete:
         return jsonify({'error': 'Deal not found'}), 404
@@ -2569,8 +2722,7 @@ def delete_deal(deal_id):
                         if datetime.fromisoformat(d['deleted_at']) > cutoff]
         
         # Save the updated list
-        with open(deleted_deals_file, 'w') as f:
-            json.dump(deleted_deals, f, indent=2)
+        atomic_write_json(deleted_deals_file, deleted_deals)
             
         app.logger.info(f"Tracked deletion of deal {deal_id} by {user_id}")
     except Exception as e:
@@ -2660,7 +2812,8 @@ def sync_upload_deals():
         sync_manager = FTPSyncManager(settings)
         
         # Get only active deals for upload
-        active_deals = get_active_deals()
+        with locked(read=['deals']):
+            active_deals = get_active_deals()
         success = sync_manager.upload_deals(active_deals)
         
         if success:
@@ -2694,6 +2847,7 @@ def sync_upload_deals():
         }), 500
 
 @app.route('/api/sync/download', methods=['POST'])
+@writes('deals')
 def sync_download_deals():
     """Manually trigger download and merge of deals from FTP"""
     try:
@@ -2710,6 +2864,7 @@ def sync_download_deals():
         
         # Save merged deals
         save_deals(final_deals)
+        event_hub.publish('sync', {'source': 'download', 'report': sync_report})
         
         return jsonify({
             'success': True,
@@ -2741,6 +2896,7 @@ def get_sync_status():
         }), 500
 
 @app.route('/api/sync/auto', methods=['POST'])
+@writes('deals')
 def sync_auto():
     """Perform automatic sync (upload then download)"""
     try:
@@ -2764,6 +2920,7 @@ def sync_auto():
         deleted_deal_ids = get_deleted_deal_ids()
         final_deals = [deal for deal in merged_deals if deal.get('id') not in deleted_deal_ids]
         save_deals(final_deals)
+        event_hub.publish('sync', {'source': 'auto', 'report': sync_report})
         
         return jsonify({
             'success': True,
@@ -2841,35 +2998,22 @@ def update_sync_config():
 
 # Comments endpoints
 @app.route('/api/tasks/<task_id>/comments', methods=['POST'])
+@writes('tasks')
 def add_comment(task_id):
     comment = request.json
     comment['id'] = str(uuid.uuid4())
     comment['timestamp'] = datetime.now().isoformat()
     
-    tasks = load_tasks()
-    for task in tasks:
-        if task['id'] == task_id:
-            if 'comments' not in task:
-                task['comments'] = []
-            task['comments'].append(comment)
-            
-            # Add to history
-            if 'history' not in task:
-                task['history'] = []
-            task['history'].append({
-                'timestamp': datetime.now().isoformat(),
-                'action': 'comment_added',
-                'field': 'comments',
-                'old_value': None,
-                'new_value': comment['text']
-            })
-            
-            save_tasks(tasks)
-            return jsonify(comment), 201
+    if task_store.get(task_id):
+        comment_count = task_activity.add_comment(task_id, comment)
+        add_task_history(task_id, 'comments', None, comment['text'], action='comment_added',
+                         comment_count=comment_count)
+        return jsonify(comment), 201
     
     return jsonify({'error': 'Task not found'}), 404
 
 @app.route('/api/tasks/<task_id>/comments/<int:comment_index>', methods=['PUT'])
+@writes('tasks')
 def edit_comment(task_id, comment_index):
     data = request.json
     new_text = data.get('text')
@@ -2877,55 +3021,30 @@ def edit_comment(task_id, comment_index):
     if not new_text:
         return jsonify({'error': 'No text provided'}), 400
     
-    tasks = load_tasks()
-    for task in tasks:
-        if task['id'] == task_id:
-            if 'comments' not in task or comment_index >= len(task['comments']):
-                return jsonify({'error': 'Comment not found'}), 404
-            
-            old_text = task['comments'][comment_index].get('text', '')
-            task['comments'][comment_index]['text'] = new_text
-            task['comments'][comment_index]['edited_at'] = datetime.now().isoformat()
-            
-            # Add to history
-            if 'history' not in task:
-                task['history'] = []
-            task['history'].append({
-                'timestamp': datetime.now().isoformat(),
-                'action': 'comment_edited',
-                'field': 'comments',
-                'old_value': old_text,
-                'new_value': new_text
-            })
-            
-            save_tasks(tasks)
-            return jsonify(task['comments'][comment_index]), 200
+    task = task_store.get(task_id)
+    if task:
+        comments = task_activity.comments(task_id)
+        if comment_index >= len(comments):
+            return jsonify({'error': 'Comment not found'}), 404
+        
+        old_text = comments[comment_index].get('text', '')
+        comment = task_activity.edit_comment(task_id, comment_index, new_text, datetime.now().isoformat())
+        add_task_history(task_id, 'comments', old_text, new_text, action='comment_edited')
+        return jsonify(comment), 200
     
     return jsonify({'error': 'Task not found'}), 404
 
 @app.route('/api/tasks/<task_id>/comments/<int:comment_index>', methods=['DELETE'])
+@writes('tasks')
 def delete_comment(task_id, comment_index):
-    tasks = load_tasks()
-    for task in tasks:
-        if task['id'] == task_id:
-            if 'comments' not in task or comment_index >= len(task['comments']):
-                return jsonify({'error': 'Comment not found'}), 404
-            
-            deleted_comment = task['comments'].pop(comment_index)
-            
-            # Add to history
-            if 'history' not in task:
-                task['history'] = []
-            task['history'].append({
-                'timestamp': datetime.now().isoformat(),
-                'action': 'comment_deleted',
-                'field': 'comments',
-                'old_value': deleted_comment.get('text', ''),
-                'new_value': None
-            })
-            
-            save_tasks(tasks)
-            return jsonify({'success': True}), 200
+    task = task_store.get(task_id)
+    if task:
+        deleted_comment = task_activity.delete_comment(task_id, comment_index)
+        if deleted_comment is None:
+            return jsonify({'error': 'Comment not found'}), 404
+        add_task_history(task_id, 'comments', deleted_comment.get('text', ''), None, action='comment_deleted',
+                         comment_count=len(task_activity.comments(task_id)))
+        return jsonify({'success': True}), 200
     
     return jsonify({'error': 'Task not found'}), 404
 
@@ -2950,98 +3069,73 @@ def upload_attachment(task_id):
     file.save(file_path)
     
     # Update task with attachment info
-    tasks = load_tasks()
-    for task in tasks:
-        if task['id'] == task_id:
-            if 'attachments' not in task:
-                task['attachments'] = []
-            
+    with locked(write=['tasks']):
+        task = task_store.get(task_id)
+        if task:
             attachment = {
                 'id': file_id,
                 'filename': filename,
                 'size': os.path.getsize(file_path),
                 'uploaded_at': datetime.now().isoformat()
             }
-            task['attachments'].append(attachment)
-            
-            # Add to history
-            if 'history' not in task:
-                task['history'] = []
-            task['history'].append({
-                'timestamp': datetime.now().isoformat(),
-                'action': 'attachment_added',
-                'field': 'attachments',
-                'old_value': None,
-                'new_value': filename
-            })
-            
-            save_tasks(tasks)
+            # A new list; the stored task only changes through the update below
+            attachments = list(task.get('attachments') or []) + [attachment]
+            add_task_history(task_id, 'attachments', None, filename, action='attachment_added',
+                             changes={'attachments': attachments})
             return jsonify(attachment), 201
     
     return jsonify({'error': 'Task not found'}), 404
 
 @app.route('/api/tasks/<task_id>/attachments/<attachment_id>', methods=['GET'])
+@reads('tasks')
 def download_attachment(task_id, attachment_id):
-    tasks = load_tasks()
-    for task in tasks:
-        if task['id'] == task_id:
-            for attachment in task.get('attachments', []):
-                if attachment['id'] == attachment_id:
-                    file_path = os.path.join(ATTACHMENTS_DIR, task_id, f"{attachment_id}-{attachment['filename']}")
-                    if os.path.exists(file_path):
-                        return send_file(file_path, as_attachment=True, download_name=attachment['filename'])
+    task = task_store.get(task_id)
+    if task:
+        for attachment in task.get('attachments', []):
+            if attachment['id'] == attachment_id:
+                file_path = os.path.join(ATTACHMENTS_DIR, task_id, f"{attachment_id}-{attachment['filename']}")
+                if os.path.exists(file_path):
+                    return send_file(file_path, as_attachment=True, download_name=attachment['filename'])
     
     return jsonify({'error': 'Attachment not found'}), 404
 
 @app.route('/api/tasks/<task_id>/attachments/<attachment_id>', methods=['DELETE'])
+@writes('tasks')
 def delete_attachment(task_id, attachment_id):
     """Delete an attachment from a task"""
-    tasks = load_tasks()
-    
-    for task in tasks:
-        if task['id'] == task_id:
-            # Find and remove the attachment from the task
-            attachments = task.get('attachments', [])
-            attachment_to_delete = None
+    task = task_store.get(task_id)
+    if task:
+        # Find the attachment; the stored task only changes through the update below
+        attachments = list(task.get('attachments') or [])
+        attachment_to_delete = None
+        
+        for i, attachment in enumerate(attachments):
+            if attachment['id'] == attachment_id:
+                attachment_to_delete = attachment
+                attachments.pop(i)
+                break
+        
+        if attachment_to_delete:
+            # Delete the physical file
+            file_path = os.path.join(ATTACHMENTS_DIR, task_id, f"{attachment_id}-{attachment_to_delete['filename']}")
+            if os.path.exists(file_path):
+                try:
+                    os.remove(file_path)
+                except Exception as e:
+                    print(f"Error deleting file: {e}")
             
-            for i, attachment in enumerate(attachments):
-                if attachment['id'] == attachment_id:
-                    attachment_to_delete = attachment
-                    attachments.pop(i)
-                    break
+            add_task_history(task_id, 'attachments', attachment_to_delete['filename'], None,
+                             action='attachment_deleted', changes={'attachments': attachments})
             
-            if attachment_to_delete:
-                # Delete the physical file
-                file_path = os.path.join(ATTACHMENTS_DIR, task_id, f"{attachment_id}-{attachment_to_delete['filename']}")
-                if os.path.exists(file_path):
-                    try:
-                        os.remove(file_path)
-                    except Exception as e:
-                        print(f"Error deleting file: {e}")
-                
-                # Add to history
-                if 'history' not in task:
-                    task['history'] = []
-                
-                task['history'].append({
-                    'timestamp': datetime.now().isoformat(),
-                    'action': 'attachment_deleted',
-                    'field': 'attachments',
-                    'old_value': attachment_to_delete['filename'],
-                    'new_value': None
-                })
-                
-                # Save updated tasks
-                save_tasks(tasks)
-                
-                return jsonify({'success': True, 'message': 'Attachment deleted successfully'})
-            else:
-                return jsonify({'error': 'Attachment not found'}), 404
+            return jsonify({'success': True, 'message': 'Attachment deleted successfully'})
+        else:
+            return jsonify({'error': 'Attachment not found'}), 404
     
     return jsonify({'error': 'Task not found'}), 404
 
 # Similar tasks endpoint
 @app.route('/api/tasks/similar', methods=['POST'])
+@reads('tasks')
 def get_similar_tasks():
     data = request.json
     similar = find_similar_tasks(
@@ -3223,10 +3317,11 @@ def ai_chat():
         return jsonify({'error': 'No message provided'}), 400
     
     # Build context from all available data
-    tasks = load_tasks()
-    projects = load_projects()
-    objectives = load_objectives()
-    deals = load_deals()
+    with locked(read=['tasks', 'projects', 'objectives', 'deals']):
+        tasks = load_tasks()
+        projects = load_projects()
+        objectives = load_objectives()
+        deals = load_deals()
     
     # Filter to active items
     active_tasks = [t for t in tasks if t.get('status') not in ['Completed', 'Cancelled']]
@@ -3343,9 +3438,11 @@ def task_summary(task_id):
     data = request.json
     summary_type = data.get('type', 'executive')  # 'executive' or 'detailed'
     
-    # Load the specific task
-    tasks = load_tasks()
-    task = next((t for t in tasks if t['id'] == task_id), None)
+    # Load the specific task, with its history and comments
+    with locked(read=['tasks']):
+        task = task_store.get(task_id)
+        if task:
+            task = task_activity.with_activity(task)
     
     if not task:
         return jsonify({'error': 'Task not found'}), 404
@@ -3374,7 +3471,7 @@ def task_summary(task_id):
     if task.get('dependencies') and len(task['dependencies']) > 0:
         task_info += f"\nDependencies ({len(task['dependencies'])} tasks):\n"
         for dep_id in task['dependencies'][:5]:  # Limit to first 5
-            dep_task = next((t for t in tasks if t['id'] == dep_id), None)
+            dep_task = task_store.get(dep_id)
             if dep_task:
                 task_info += f"  - {dep_task.get('title', 'Unknown')} (Status: {dep_task.get('status', 'Unknown')})\n"
     
@@ -3382,7 +3479,7 @@ def task_summary(task_id):
     if task.get('blocks') and len(task['blocks']) > 0:
         task_info += f"\nBlocks ({len(task['blocks'])} tasks):\n"
         for block_id in task['blocks'][:5]:  # Limit to first 5
-            block_task = next((t for t in tasks if t['id'] == block_id), None)
+            block_task = task_store.get(block_id)
             if block_task:
                 task_info += f"  - {block_task.get('title', 'Unknown')}\n"
     
@@ -3579,12 +3676,14 @@ def favicon():
 # ============================
 
 @app.route('/api/meetings', methods=['GET'])
+@reads('meetings')
 def get_meetings():
     """Get all meetings"""
     meetings = load_meetings()
     return jsonify(meetings)
 
 @app.route('/api/meetings', methods=['POST'])
+@writes('meetings')
 def create_meeting():
     """Create a new meeting"""
     try:
@@ -3620,10 +3719,10 @@ def create_meeting():
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/meetings/<meeting_id>', methods=['GET'])
+@reads('meetings')
 def get_meeting(meeting_id):
     """Get a specific meeting"""
-    meetings = load_meetings()
-    meeting = next((m for m in meetings if m['id'] == meeting_id), None)
+    meeting = storage.get('meetings', meeting_id)
     
     if not meeting:
         return jsonify({'error': 'Meeting not found'}), 404
@@ -3631,29 +3730,32 @@ def get_meeting(meeting_id):
     return jsonify(meeting)
 
 @app.route('/api/meetings/<meeting_id>', methods=['PUT'])
+@writes('meetings')
 def update_meeting(meeting_id):
     """Update a specific meeting"""
     try:
         meetings = load_meetings()
         meeting_data = request.json
         
-        for i, meeting in enumerate(meetings):
-            if meeting['id'] == meeting_id:
-                meeting_data['updated_at'] = datetime.now().isoformat()
-                # Preserve created_at and id
-                meeting_data['id'] = meeting_id
-                if 'created_at' in meeting:
-                    meeting_data['created_at'] = meeting['created_at']
-                
-                meetings[i] = meeting_data
-                save_meetings(meetings)
-                return jsonify(meeting_data)
-        
+        i = meetings.index_of(meeting_id)
+        if i is not None:
+            meeting = meetings[i]
+            meeting_data['updated_at'] = datetime.now().isoformat()
+            # Preserve created_at and id
+            meeting_data['id'] = meeting_id
+            if 'created_at' in meeting:
+                meeting_data['created_at'] = meeting['created_at']
+            
+            meetings[i] = meeting_data
+            save_meetings(meetings)
+            return jsonify(meeting_data)
+    
         return jsonify({'error': 'Meeting not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/meetings/<meeting_id>', methods=['DELETE'])
+@writes('meetings')
 def delete_meeting(meeting_id):
     """Delete a specific meeting"""
     meetings = load_meetings()
@@ -3662,6 +3764,7 @@ def delete_meeting(meeting_id):
     return '', 204
 
 @app.route('/api/meetings/<meeting_id>/action-items', methods=['POST'])
+@writes('meetings')
 def add_action_item(meeting_id):
     """Add action item to a meeting"""
     try:
@@ -3670,20 +3773,21 @@ def add_action_item(meeting_id):
         action_item['id'] = str(uuid.uuid4())
         action_item['created_at'] = datetime.now().isoformat()
         
-        for meeting in meetings:
-            if meeting['id'] == meeting_id:
-                if 'action_items' not in meeting:
-                    meeting['action_items'] = []
-                meeting['action_items'].append(action_item)
-                meeting['updated_at'] = datetime.now().isoformat()
-                save_meetings(meetings)
-                return jsonify(action_item), 201
-        
+        meeting = meetings.get(meeting_id)
+        if meeting is not None:
+            if 'action_items' not in meeting:
+                meeting['action_items'] = []
+            meeting['action_items'].append(action_item)
+            meeting['updated_at'] = datetime.now().isoformat()
+            save_meetings(meetings)
+            return jsonify(action_item), 201
+    
         return jsonify({'error': 'Meeting not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/meetings/<meeting_id>/create-tasks', methods=['POST'])
+@writes('meetings', 'tasks')
 def create_tasks_from_meeting(meeting_id):
     """Create tasks from meeting action items"""
     try:
@@ -3691,11 +3795,10 @@ def create_tasks_from_meeting(meeting_id):
         data = request.json
         action_item_ids = data.get('action_item_ids', [])
         
-        meeting = next((m for m in meetings if m['id'] == meeting_id), None)
+        meeting = meetings.get(meeting_id)
         if not meeting:
             return jsonify({'error': 'Meeting not found'}), 404
         
-        tasks = load_tasks()
         created_tasks = []
         
         for action_item in meeting.get('action_items', []):
@@ -3729,7 +3832,6 @@ def create_tasks_from_meeting(meeting_id):
                     }
                 }
                 
-                tasks.append(task)
                 created_tasks.append(task)
                 
                 # Update action item with task reference
@@ -3737,7 +3839,7 @@ def create_tasks_from_meeting(meeting_id):
                 action_item['task_created'] = True
         
         # Save both tasks and meetings
-        save_tasks(tasks)
+        task_store.apply(created_tasks)
         save_meetings(meetings)
         
         return jsonify({
@@ -3748,18 +3850,15 @@ def create_tasks_from_meeting(meeting_id):
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/meetings/<meeting_id>/linked-tasks', methods=['GET'])
+@reads('tasks')
 def get_meeting_linked_tasks(meeting_id):
     """Get all tasks linked to a meeting"""
-    tasks = load_tasks()
-    linked_tasks = []
-    
-    for task in tasks:
-        if 'meeting_reference' in task and task['meeting_reference'].get('meeting_id') == meeting_id:
-            linked_tasks.append(task)
+    linked_tasks = task_store.find(meeting_id=meeting_id)
     
     return jsonify(linked_tasks)
 
 @app.route('/api/meetings/<meeting_id>/distribute', methods=['POST'])
+@writes('meetings')
 def distribute_meeting(meeting_id):
     """Email distribution of meeting minutes (placeholder for future implementation)"""
     try:
@@ -3767,7 +3866,7 @@ def distribute_meeting(meeting_id):
         data = request.json
         recipients = data.get('recipients', [])
         
-        meeting = next((m for m in meetings if m['id'] == meeting_id), None)
+        meeting = meetings.get(meeting_id)
         if not meeting:
             return jsonify({'error': 'Meeting not found'}), 404
         
@@ -3817,6 +3916,7 @@ def create_meeting_template():
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/meetings/from-template', methods=['POST'])
+@writes('meetings')
 def create_meeting_from_template():
     """Create a meeting from a template"""
     try:
@@ -3875,8 +3975,9 @@ def generate_meeting_summary(meeting_id):
         if not settings.get('api_key'):
             return jsonify({'error': 'API key not configured'}), 400
         
-        meetings = load_meetings()
-        meeting = next((m for m in meetings if m['id'] == meeting_id), None)
+        with locked(read=['meetings']):
+            meetings = load_meetings()
+            meeting = meetings.get(meeting_id)
         
         if not meeting:
             return jsonify({'error': 'Meeting not found'}), 404
@@ -3918,13 +4019,20 @@ def generate_meeting_summary(meeting_id):
         result = call_ai_api(settings, prompt, max_tokens=800)
         
         if result['success']:
-            # Store summary in meeting metadata
-            if 'metadata' not in meeting:
-                meeting['metadata'] = {}
-            meeting['metadata']['ai_summary'] = result['text']
-            meeting['metadata']['summary_generated_at'] = datetime.now().isoformat()
-            meeting['updated_at'] = datetime.now().isoformat()
-            save_meetings(meetings)
+            # Reload so edits made while the AI call was running are kept
+            with locked(write=['meetings']):
+                meetings = load_meetings()
+                meeting = meetings.get(meeting_id)
+                if not meeting:
+                    return jsonify({'error': 'Meeting not found'}), 404
+                
+                # Store summary in meeting metadata
+                if 'metadata' not in meeting:
+                    meeting['metadata'] = {}
+                meeting['metadata']['ai_summary'] = result['text']
+                meeting['metadata']['summary_generated_at'] = datetime.now().isoformat()
+                meeting['updated_at'] = datetime.now().isoformat()
+                save_meetings(meetings)
             
             return jsonify({'summary': result['text']})
         else:
@@ -3941,8 +4049,9 @@ def extract_action_items(meeting_id):
         if not settings.get('api_key'):
             return jsonify({'error': 'API key not configured'}), 400
         
-        meetings = load_meetings()
-        meeting = next((m for m in meetings if m['id'] == meeting_id), None)
+        with locked(read=['meetings']):
+            meetings = load_meetings()
+            meeting = meetings.get(meeting_id)
         
         if not meeting:
             return jsonify({'error': 'Meeting not found'}), 404
@@ -4008,11 +4117,12 @@ Format your response as a JSON array with objects containing: title, description
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/meetings/<meeting_id>/export/html', methods=['GET'])
+@reads('meetings')
 def export_meeting_html(meeting_id):
     """Export meeting as HTML"""
     try:
         meetings = load_meetings()
-        meeting = next((m for m in meetings if m['id'] == meeting_id), None)
+        meeting = meetings.get(meeting_id)
         
         if not meeting:
             return jsonify({'error': 'Meeting not found'}), 404
@@ -4028,11 +4138,12 @@ def export_meeting_html(meeting_id):
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/meetings/<meeting_id>/export/pdf', methods=['GET'])
+@reads('meetings')
 def export_meeting_pdf(meeting_id):
     """Export meeting as PDF"""
     try:
         meetings = load_meetings()
-        meeting = next((m for m in meetings if m['id'] == meeting_id), None)
+        meeting = meetings.get(meeting_id)
         
         if not meeting:
             return jsonify({'error': 'Meeting not found'}), 404
@@ -4056,11 +4167,12 @@ def export_meeting_pdf(meeting_id):
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/meetings/<meeting_id>/export/word', methods=['GET'])
+@reads('meetings')
 def export_meeting_word(meeting_id):
     """Export meeting as Word document"""
     try:
         meetings = load_meetings()
-        meeting = next((m for m in meetings if m['id'] == meeting_id), None)
+        meeting = meetings.get(meeting_id)
         
         if not meeting:
             return jsonify({'error': 'Meeting not found'}), 404
@@ -4104,9 +4216,10 @@ def upload_meeting_attachment(meeting_id):
     file.save(file_path)
     
     # Update meeting with attachment info
-    meetings = load_meetings()
-    for meeting in meetings:
-        if meeting['id'] == meeting_id:
+    with locked(write=['meetings']):
+        meetings = load_meetings()
+        meeting = meetings.get(meeting_id)
+        if meeting is not None:
             if 'attachments' not in meeting:
                 meeting['attachments'] = []
             
@@ -4121,54 +4234,56 @@ def upload_meeting_attachment(meeting_id):
             
             save_meetings(meetings)
             return jsonify(attachment)
-    
+
     return jsonify({'error': 'Meeting not found'}), 404
 
 @app.route('/api/meetings/<meeting_id>/attachments/<attachment_id>', methods=['DELETE'])
+@writes('meetings')
 def delete_meeting_attachment(meeting_id, attachment_id):
     """Delete a meeting attachment"""
     meetings = load_meetings()
     
-    for meeting in meetings:
-        if meeting['id'] == meeting_id:
-            if 'attachments' in meeting:
-                # Find and remove attachment
-                meeting['attachments'] = [
-                    a for a in meeting['attachments'] 
-                    if a['id'] != attachment_id
-                ]
-                
-                # Delete file from disk
-                meeting_dir = os.path.join(ATTACHMENTS_DIR, 'meetings', meeting_id)
-                for filename in os.listdir(meeting_dir):
-                    if filename.startswith(attachment_id):
-                        file_path = os.path.join(meeting_dir, filename)
-                        try:
-                            os.remove(file_path)
-                        except:
-                            pass
-                
-                save_meetings(meetings)
-                return '', 204
-    
+    meeting = meetings.get(meeting_id)
+    if meeting is not None:
+        if 'attachments' in meeting:
+            # Find and remove attachment
+            meeting['attachments'] = [
+                a for a in meeting['attachments'] 
+                if a['id'] != attachment_id
+            ]
+            
+            # Delete file from disk
+            meeting_dir = os.path.join(ATTACHMENTS_DIR, 'meetings', meeting_id)
+            for filename in os.listdir(meeting_dir):
+                if filename.startswith(attachment_id):
+                    file_path = os.path.join(meeting_dir, filename)
+                    try:
+                        os.remove(file_path)
+                    except:
+                        pass
+            
+            save_meetings(meetings)
+            return '', 204
+
     return jsonify({'error': 'Meeting or attachment not found'}), 404
 
 @app.route('/api/meetings/<meeting_id>/attachments/<attachment_id>', methods=['GET'])
+@reads('meetings')
 def download_meeting_attachment(meeting_id, attachment_id):
     """Download a meeting attachment"""
     meetings = load_meetings()
     
-    for meeting in meetings:
-        if meeting['id'] == meeting_id:
-            if 'attachments' in meeting:
-                attachment = next((a for a in meeting['attachments'] if a['id'] == attachment_id), None)
-                if attachment:
-                    meeting_dir = os.path.join(ATTACHMENTS_DIR, 'meetings', meeting_id)
-                    for filename in os.listdir(meeting_dir):
-                        if filename.startswith(attachment_id):
-                            file_path = os.path.join(meeting_dir, filename)
-                            return send_file(file_path, as_attachment=True, download_name=attachment['filename'])
-    
+    meeting = meetings.get(meeting_id)
+    if meeting is not None:
+        if 'attachments' in meeting:
+            attachment = next((a for a in meeting['attachments'] if a['id'] == attachment_id), None)
+            if attachment:
+                meeting_dir = os.path.join(ATTACHMENTS_DIR, 'meetings', meeting_id)
+                for filename in os.listdir(meeting_dir):
+                    if filename.startswith(attachment_id):
+                        file_path = os.path.join(meeting_dir, filename)
+                        return send_file(file_path, as_attachment=True, download_name=attachment['filename'])
+
     return jsonify({'error': 'Attachment not found'}), 404
 
 if __name__ == '__main__':
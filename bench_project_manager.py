@@ -0,0 +1,62 @@
+"""
+Critical path benchmark
+Times ProjectManager.analyze_critical_path on synthetic projects: a long
+chain, a random DAG, and a chain closed into a cycle
+
+    python bench_project_manager.py [tasks ...]
+"""
+
+import random
+import sys
+import time
+from typing import Dict, List
+
+from project_manager import ProjectManager
+
+
+def _synthetic_project(size: int, shape: str, seed: int = 42) -> List[Dict]:
+    """Tasks for the benchmark: one long chain, or a random DAG with up to 3 dependencies each"""
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(size):
+        if shape == 'chain':
+            dependencies = [f'task-{i - 1}'] if i else []
+        else:
+            dependencies = [f'task-{rng.randrange(max(0, i - 200), i)}' for _ in range(min(i, rng.randint(0, 3)))]
+        tasks.append({
+            'id': f'task-{i}',
+            'dependencies': dependencies,
+            'gantt_properties': {'duration': rng.randint(1, 10)} if i % 2 else {
+                'start_date': '2025-01-01T09:00:00', 'end_date': f'2025-01-{rng.randint(2, 28):02d}T17:00:00'
+            }
+        })
+    return tasks
+
+
+def benchmark(sizes: List[int], repeat: int = 3):
+    """Time analyze_critical_path on synthetic projects"""
+    manager = ProjectManager()
+    for size in sizes:
+        for shape in ('chain', 'dag'):
+            tasks = _synthetic_project(size, shape)
+            edges = sum(len(task['dependencies']) for task in tasks)
+            best = min(_timed(manager.analyze_critical_path, tasks) for _ in range(repeat))
+            result = manager.analyze_critical_path(tasks)
+            print(f"{shape:>5} {size:>7} tasks {edges:>7} dependencies: {best * 1000:8.1f} ms, "
+                  f"duration {result['project_duration']}, {len(result['critical_path'])} critical")
+        # Close a cycle through the last tasks of the chain
+        tasks = _synthetic_project(size, 'chain')
+        tasks[size - 100]['dependencies'].append(tasks[-1]['id'])
+        best = min(_timed(manager.analyze_critical_path, tasks) for _ in range(repeat))
+        print(f"cycle {size:>7} tasks: {best * 1000:8.1f} ms, "
+              f"cycle of {len(manager.analyze_critical_path(tasks)['cycle'])} tasks reported")
+
+
+def _timed(func, *args) -> float:
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+
+if __name__ == '__main__':
+    benchmark([int(size) for size in sys.argv[1:]] or [1000, 10000, 50000])
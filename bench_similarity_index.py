@@ -0,0 +1,137 @@
+"""
+Similarity index benchmark
+Times SimilarityIndex.find_similar against the full scan it replaces on
+synthetic tasks and checks the index still finds the scan's top results
+
+    python bench_similarity_index.py [tasks ...]
+Exits non-zero if top-5 recall at any size drops below MIN_RECALL.
+"""
+
+import difflib
+import random
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from similarity_index import (CUSTOMER_WEIGHT, DESCRIPTION_WEIGHT, MAX_RESULTS, SIMILARITY_THRESHOLD,
+                              TITLE_WEIGHT, SimilarityIndex)
+
+# Lowest acceptable share of the full scan's top results that the index also returns
+MIN_RECALL = 0.95
+
+_VOCABULARY = (
+    'follow up call email quote order invoice renewal contract proposal review meeting demo install '
+    'upgrade license support ticket payment shipment delivery pricing discount forecast report audit '
+    'onboarding training migration backup server network printer laptop firewall account password '
+    'schedule confirm send update prepare check request approve cancel return replace repair visit'
+).split()
+
+
+def exact_similar(tasks: List[Dict], title: str, description: str = '', customer: str = '') -> List[Dict]:
+    """The full scan SimilarityIndex replaces, kept as the reference"""
+    similar = []
+    for existing in tasks:
+        if existing.get('status') == 'Completed':
+            continue
+        score = 0
+        if existing.get('title'):
+            score += difflib.SequenceMatcher(None, title.lower(), existing['title'].lower()).ratio() * TITLE_WEIGHT
+        if description and existing.get('description'):
+            score += difflib.SequenceMatcher(
+                None, description.lower(), existing['description'].lower()).ratio() * DESCRIPTION_WEIGHT
+        if customer and existing.get('customer_name') == customer:
+            score += CUSTOMER_WEIGHT
+        if score > SIMILARITY_THRESHOLD:
+            similar.append({'task': existing, 'score': score})
+    similar.sort(key=lambda x: x['score'], reverse=True)
+    return similar[:MAX_RESULTS]
+
+
+class _BenchmarkStore:
+    """Just enough of TaskStore to feed an index"""
+
+    def __init__(self, tasks: List[Dict]):
+        self._tasks = {task['id']: task for task in tasks}
+
+    def add_listener(self, listener):
+        listener.tasks_reset()
+        for position, task in enumerate(self._tasks.values()):
+            listener.task_filed(task, position)
+
+    def get(self, task_id: str):
+        return self._tasks.get(task_id)
+
+
+def _synthetic_tasks(size: int, rng: random.Random) -> List[Dict]:
+    """Tasks with Zipf-like word frequencies, 1 in 5 completed"""
+    weights = [1 / rank for rank in range(1, len(_VOCABULARY) + 1)]
+    customers = [f'Customer {i}' for i in range(max(10, size // 50))]
+    tasks = []
+    for i in range(size):
+        words = rng.choices(_VOCABULARY, weights, k=rng.randint(3, 7))
+        tasks.append({
+            'id': f'task-{i}',
+            'title': f"{' '.join(words).capitalize()} #{rng.randrange(1000)}",
+            'description': ' '.join(rng.choices(_VOCABULARY, weights, k=rng.randint(5, 40))),
+            'customer_name': rng.choice(customers),
+            'status': 'Completed' if rng.random() < 0.2 else 'Open'
+        })
+    return tasks
+
+
+def _queries(tasks: List[Dict], count: int, rng: random.Random) -> List[Tuple[str, str, str]]:
+    """Half near-duplicates of existing tasks (a word dropped), half new text"""
+    queries = []
+    for i in range(count):
+        if i % 2:
+            fresh = _synthetic_tasks(1, rng)[0]
+            queries.append((fresh['title'], fresh['description'], fresh['customer_name']))
+        else:
+            task = rng.choice(tasks)
+            words = task['title'].split()
+            del words[rng.randrange(len(words))]
+            queries.append((' '.join(words), task['description'], task['customer_name']))
+    return queries
+
+
+def benchmark(sizes: List[int], queries: int = 20, seed: int = 42) -> List[str]:
+    """Time find_similar against the full scan, returning the sizes whose recall is too low"""
+    failures = []
+    for size in sizes:
+        rng = random.Random(seed)
+        tasks = _synthetic_tasks(size, rng)
+        index = SimilarityIndex(_BenchmarkStore(tasks))
+        indexed_time = exact_time = 0.0
+        identical = found = expected = 0
+        for title, description, customer in _queries(tasks, queries, rng):
+            started = time.perf_counter()
+            got = index.find_similar(title, description, customer)
+            indexed_time += time.perf_counter() - started
+            started = time.perf_counter()
+            want = exact_similar(tasks, title, description, customer)
+            exact_time += time.perf_counter() - started
+
+            got_ids = [result['task']['id'] for result in got]
+            want_ids = [result['task']['id'] for result in want]
+            identical += got_ids == want_ids
+            found += len(set(got_ids) & set(want_ids))
+            expected += len(want_ids)
+        recall = found / expected if expected else 1
+        print(f"{size:>7} tasks: index {indexed_time * 1000 / queries:8.1f} ms/query, "
+              f"full scan {exact_time * 1000 / queries:8.1f} ms/query, "
+              f"recall {recall:.3f}, identical top {MAX_RESULTS} {identical}/{queries}")
+        if recall < MIN_RECALL:
+            failures.append(f'{size} tasks: recall {recall:.3f} below {MIN_RECALL}')
+    return failures
+
+
+def main(sizes: List[int]) -> int:
+    failures = benchmark(sizes)
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    print('FAILED' if failures else f'OK: top-{MAX_RESULTS} recall at least {MIN_RECALL} at every size')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main([int(size) for size in sys.argv[1:]] or [1000, 10000, 100000]))
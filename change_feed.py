@@ -0,0 +1,122 @@
+"""
+Change Feed Module
+Per-collection change sequences with a bounded ring of recent changes,
+used to answer "what changed since version V" (/api/changes)
+"""
+
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from persistence import dump_json
+
+# Changes remembered per collection; older cursors get a full resync
+RING_SIZE = 5000
+
+
+class ChangeFeed:
+    """Monotonic change sequence and recent-change ring for each collection
+
+    Every recorded change bumps the collection's sequence number and
+    appends (seq, record id, deleted) entries to its ring. A cursor ``seq``
+    can be answered incrementally while every change after it is still in
+    the ring; once entries past it have been evicted (or the collection was
+    replaced wholesale) the caller has to resync.
+
+    Saves of a whole collection are diffed against a hash of each record as
+    of the previous save. The first save of a collection has nothing to diff
+    against, so it counts as a reset.
+    """
+
+    def __init__(self, ring_size: int = RING_SIZE):
+        self.ring_size = ring_size
+        self._lock = threading.Lock()
+        self._seq: Dict[str, int] = {}
+        # Highest seq whose changes are no longer (all) in the ring
+        self._floor: Dict[str, int] = {}
+        self._ring: Dict[str, deque] = {}
+        self._fingerprints: Dict[str, Dict[str, int]] = {}
+        self._listeners: List[Callable[[str, int], None]] = []
+
+    def add_listener(self, listener: Callable[[str, int], None]):
+        """Call listener(collection, seq) after every recorded change"""
+        self._listeners.append(listener)
+
+    def _notify(self, collection: str, seq: int):
+        for listener in self._listeners:
+            listener(collection, seq)
+
+    def seq(self, collection: str) -> int:
+        return self._seq.get(collection, 0)
+
+    def record(self, collection: str, upserted: Iterable[str] = (), deleted: Iterable[str] = ()) -> int:
+        """Record changes to individual records, returning the new seq"""
+        with self._lock:
+            seq = self._seq.get(collection, 0) + 1
+            self._seq[collection] = seq
+            ring = self._ring.setdefault(collection, deque())
+            fingerprints = self._fingerprints.get(collection)
+            for record_id in upserted:
+                ring.append((seq, record_id, False))
+                if fingerprints is not None:
+                    # Changed outside a save; make sure the next diff reports it again
+                    fingerprints.pop(record_id, None)
+            for record_id in deleted:
+                ring.append((seq, record_id, True))
+                if fingerprints is not None:
+                    fingerprints.pop(record_id, None)
+            while len(ring) > self.ring_size:
+                evicted_seq = ring.popleft()[0]
+                self._floor[collection] = max(self._floor.get(collection, 0), evicted_seq)
+        self._notify(collection, seq)
+        return seq
+
+    def reset(self, collection: str) -> int:
+        """Record that the whole collection may have changed"""
+        with self._lock:
+            seq = self._seq.get(collection, 0) + 1
+            self._seq[collection] = seq
+            self._floor[collection] = seq
+            self._ring[collection] = deque()
+            self._fingerprints.pop(collection, None)
+        self._notify(collection, seq)
+        return seq
+
+    def record_save(self, collection: str, data: Any) -> int:
+        """Record a save of the whole collection by diffing it against the last one"""
+        if not isinstance(data, list) or not all(isinstance(r, dict) and 'id' in r for r in data):
+            return self.reset(collection)
+        with self._lock:
+            previous = self._fingerprints.get(collection)
+        fingerprints = {record['id']: hash(dump_json(record, default=str)) for record in data}
+        if previous is None:
+            seq = self.reset(collection)
+        else:
+            upserted = [record_id for record_id, fingerprint in fingerprints.items()
+                        if previous.get(record_id) != fingerprint]
+            deleted = [record_id for record_id in previous if record_id not in fingerprints]
+            seq = self.record(collection, upserted, deleted)
+        with self._lock:
+            if self._seq.get(collection) == seq:
+                self._fingerprints[collection] = fingerprints
+        return seq
+
+    def since(self, collection: str, seq: int) -> Optional[Tuple[List[str], List[str], int]]:
+        """
+        Changes after seq as (upserted ids, deleted ids, current seq)
+
+        Returns None when the changes can no longer be listed and the
+        caller must resync the whole collection.
+        """
+        with self._lock:
+            current = self._seq.get(collection, 0)
+            if seq > current or seq < self._floor.get(collection, 0):
+                return None
+            latest: Dict[str, bool] = {}
+            for entry_seq, record_id, deleted in reversed(self._ring.get(collection, ())):
+                if entry_seq <= seq:
+                    break
+                latest.setdefault(record_id, deleted)
+        upserted = [record_id for record_id, deleted in latest.items() if not deleted]
+        removed = [record_id for record_id, deleted in latest.items() if deleted]
+        return upserted, removed, current
@@ -0,0 +1,82 @@
+"""
+Compression Module
+Negotiated gzip / brotli compression of larger text responses
+"""
+
+import gzip
+import logging
+
+from flask import request
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Below this the headers and CPU cost outweigh the saving
+MIN_SIZE = 1024
+GZIP_LEVEL = 6
+# Quality 4-5 is the usual trade-off for responses compressed on the fly
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+
+
+def _compressible(mimetype: str) -> bool:
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES
+
+
+def choose_encoding() -> str:
+    """Best encoding the client accepts: 'br', 'gzip' or '' for none"""
+    accept = request.accept_encodings
+    gzip_quality = accept.quality('gzip')
+    if BROTLI_AVAILABLE:
+        br_quality = accept.quality('br')
+        if br_quality and br_quality >= gzip_quality:
+            return 'br'
+    return 'gzip' if gzip_quality else ''
+
+
+def compress_response(response):
+    """after_request hook: compress the body if it is worth it and the client agrees"""
+    # Streams (the /api/events stream, exports) and file passthroughs are sent as they are
+    if (response.is_streamed or response.direct_passthrough
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or not _compressible(response.mimetype or '')):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < MIN_SIZE:
+        return response
+    encoding = choose_encoding()
+    if not encoding:
+        return response
+
+    if encoding == 'br':
+        compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        compressed = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if len(compressed) >= len(body):
+        return response
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    if response.headers.get('ETag', '').startswith('"'):
+        # Different bytes than the identity representation
+        response.set_etag(response.get_etag()[0], weak=True)
+    return response
+
+
+def init_compression(app):
+    """Compress eligible responses of this app"""
+    app.after_request(compress_response)
+    logger.info(f"Response compression enabled ({'brotli, ' if BROTLI_AVAILABLE else ''}gzip)")
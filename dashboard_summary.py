@@ -0,0 +1,308 @@
+"""
+Dashboard Summary Module
+Materialized /api/tasks/summary kept up to date by task and objective changes
+"""
+
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from due_dates import INACTIVE_STATUSES, parse_follow_up_datetime, start_of_day
+
+UPCOMING_LIMIT = 5
+DASHBOARD_OBJECTIVES = 5
+
+
+class _OrderedBucket:
+    """Task ids kept in task store order"""
+
+    def __init__(self):
+        self._entries: List[Tuple[int, str]] = []
+
+    def add(self, position: int, task_id: str):
+        insort(self._entries, (position, task_id))
+
+    def remove(self, position: int, task_id: str):
+        i = bisect_left(self._entries, (position, task_id))
+        if i < len(self._entries) and self._entries[i] == (position, task_id):
+            del self._entries[i]
+
+    def first_position(self) -> int:
+        return self._entries[0][0]
+
+    def ids(self) -> List[str]:
+        return [task_id for _, task_id in self._entries]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DashboardSummary:
+    """Dashboard summary maintained by deltas
+
+    Registered as a TaskStore listener: each time a task is filed or removed
+    its previous contribution (active, open, urgent, customer, objective) is
+    subtracted and the new one added, so counters and buckets never need a
+    full pass. Due-date sections come from the store's due-date index.
+
+    The rendered response is cached until a task or objective changes, or
+    until the clock passes the next follow-up datetime or midnight - the
+    only moments the overdue / due today / upcoming sections can change.
+    """
+
+    def __init__(self, task_store, load_objectives: Callable[[], List[Dict]]):
+        self.task_store = task_store
+        self.load_objectives = load_objectives
+        self._lock = threading.Lock()
+        self._objectives: Optional[List[Dict]] = None
+        self._version = 0
+        # Serialized response per mode (full / compact): (bytes, version, valid until)
+        self._rendered: Dict[bool, Tuple[bytes, int, Optional[datetime]]] = {}
+        self._reset()
+        task_store.add_listener(self)
+
+    def _reset(self):
+        # Task id -> (position, active, open, urgent, customer, topic_id, completed)
+        self._contributions: Dict[str, tuple] = {}
+        self._active = 0
+        self._open = 0
+        self._urgent = _OrderedBucket()
+        self._by_customer: Dict[object, _OrderedBucket] = {}
+        self._topic_active: Dict[str, int] = {}
+        self._topic_completed: Dict[str, int] = {}
+
+    # TaskStore listener interface
+    def tasks_reset(self):
+        self._reset()
+        self._version += 1
+
+    def task_filed(self, task: Dict, position: int):
+        self._retract(task['id'])
+        status = task.get('status')
+        active = status not in INACTIVE_STATUSES
+        contribution = (
+            position,
+            active,
+            status == 'Open',
+            active and task.get('priority') == 'Urgent',
+            task.get('customer_name', 'Unassigned'),
+            task.get('topic_id'),
+            status == 'Completed'
+        )
+        self._apply(task['id'], contribution, 1)
+        self._contributions[task['id']] = contribution
+        self._version += 1
+
+    def task_removed(self, task_id: str):
+        self._retract(task_id)
+        self._version += 1
+
+    def _retract(self, task_id: str):
+        contribution = self._contributions.pop(task_id, None)
+        if contribution is not None:
+            self._apply(task_id, contribution, -1)
+
+    def _apply(self, task_id: str, contribution: tuple, delta: int):
+        position, active, is_open, urgent, customer, topic_id, completed = contribution
+        self._open += delta if is_open else 0
+        if urgent:
+            if delta > 0:
+                self._urgent.add(position, task_id)
+            else:
+                self._urgent.remove(position, task_id)
+        if topic_id is not None:
+            counts = self._topic_active if active else self._topic_completed if completed else None
+            if counts is not None:
+                counts[topic_id] = counts.get(topic_id, 0) + delta
+        if not active:
+            return
+        self._active += delta
+        if delta > 0:
+            self._by_customer.setdefault(customer, _OrderedBucket()).add(position, task_id)
+        else:
+            bucket = self._by_customer.get(customer)
+            if bucket is not None:
+                bucket.remove(position, task_id)
+                if not bucket:
+                    del self._by_customer[customer]
+
+    # Objectives
+    def objectives_changed(self):
+        """Call after saving objectives; they are reloaded on the next request"""
+        with self._lock:
+            self._objectives = None
+            self._version += 1
+
+    def _objective_stats(self, objectives: List[Dict]) -> Tuple[int, List[Dict]]:
+        active_objectives = [o for o in objectives if o.get('status') not in ['Completed']]
+        stats = []
+        for obj in active_objectives[:DASHBOARD_OBJECTIVES]:
+            okr_score = 0
+            if obj.get('key_results'):
+                total_progress = sum(kr.get('progress', 0) for kr in obj['key_results'])
+                okr_score = total_progress / len(obj['key_results']) if obj['key_results'] else 0
+
+            active_tasks = self._topic_active.get(obj['id'], 0)
+            completed_tasks = self._topic_completed.get(obj['id'], 0)
+            stats.append({
+                'id': obj.get('id'),
+                'title': obj.get('title'),
+                'type': obj.get('objective_type', 'aspirational'),
+                'period': obj.get('period', 'Q1'),
+                'confidence': obj.get('confidence', 0.5),
+                'okr_score': okr_score,
+                'key_results_count': len(obj.get('key_results', [])),
+                'key_results_completed': sum(1 for kr in obj.get('key_results', []) if kr.get('progress', 0) >= 1),
+                'total_tasks': active_tasks + completed_tasks,
+                'active_tasks': active_tasks,
+                'completed_tasks': completed_tasks,
+                'status': obj.get('status', 'Active'),
+                'target_date': obj.get('target_date')
+            })
+        return len(active_objectives), stats
+
+    # Output
+    def summary(self, now: Optional[datetime] = None, compact: bool = False) -> Dict:
+        """
+        Build the summary from the materialized state
+
+        In compact mode the task sections (overdue_tasks, urgent, by_customer,
+        upcoming) hold task ids, and each referenced task appears once in a
+        ``tasks`` table keyed by id; most tasks show up in several sections.
+        """
+        now = now or datetime.now()
+        if self._objectives is None:
+            self._objectives = self.load_objectives()
+        active_objectives, objectives = self._objective_stats(self._objectives)
+
+        store = self.task_store
+        due = store.due
+        today_start = start_of_day(now.date())
+        tomorrow_start = today_start + timedelta(days=1)
+
+        upcoming_ids = due.between(tomorrow_start, None)[:UPCOMING_LIMIT]
+        if len(upcoming_ids) < UPCOMING_LIMIT:
+            upcoming_ids += due.unparsed()[:UPCOMING_LIMIT - len(upcoming_ids)]
+
+        overdue_ids = due.before(now)
+        customers = sorted(self._by_customer.items(), key=lambda item: item[1].first_position())
+        sections = {
+            'overdue_tasks': overdue_ids,
+            'urgent': self._urgent.ids(),
+            'upcoming': upcoming_ids
+        }
+        by_customer = {customer: bucket.ids() for customer, bucket in customers}
+
+        summary = {
+            'total': self._active,
+            'open': self._open,
+            'due_today': due.count_between(today_start, tomorrow_start),
+            'overdue': len(overdue_ids),
+            'active_objectives': active_objectives,
+            'objectives': objectives
+        }
+        if compact:
+            tasks = {}
+            for ids in (*sections.values(), *by_customer.values()):
+                for task_id in ids:
+                    if task_id not in tasks:
+                        tasks[task_id] = store.get(task_id)
+            summary.update(sections, by_customer=by_customer, tasks=tasks)
+        else:
+            for name, ids in sections.items():
+                summary[name] = [store.get(task_id) for task_id in ids]
+            summary['by_customer'] = {customer: [store.get(task_id) for task_id in ids]
+                                      for customer, ids in by_customer.items()}
+        return summary
+
+    def time_window(self, now: datetime) -> Tuple[datetime, datetime]:
+        """
+        The span around now in which the time-dependent sections stay the same
+
+        Overdue / due today / upcoming only change when a follow-up datetime
+        passes or at midnight, so they are constant from the last such
+        moment up to (and including) the next one.
+        """
+        due = self.task_store.due
+        today_start = start_of_day(now.date())
+        last_due = due.last_before(now)
+        next_due = due.next_at_or_after(now)
+        midnight = today_start + timedelta(days=1)
+        since = max(last_due, today_start) if last_due else today_start
+        until = min(next_due, midnight) if next_due else midnight
+        return since, until
+
+    def render(self, serialize: Callable[[Dict], bytes], compact: bool = False) -> bytes:
+        """Serialized summary, reusing the last one while nothing has changed"""
+        now = datetime.now()
+        with self._lock:
+            cached = self._rendered.get(compact)
+            if cached is not None:
+                rendered, version, valid_until = cached
+                if version == self._version and (valid_until is None or now < valid_until):
+                    return rendered
+
+            version = self._version
+            rendered = serialize(self.summary(now, compact=compact))
+            # Time-dependent sections change when the next task falls due or at midnight
+            self._rendered[compact] = (rendered, version, self.time_window(now)[1])
+            return rendered
+
+
+def full_summary(tasks: List[Dict], objectives: List[Dict], now: Optional[datetime] = None) -> Dict:
+    """Recompute the summary from scratch (the reference test_dashboard_summary.py checks DashboardSummary against)"""
+    now = now or datetime.now()
+    today = now.date()
+
+    def due(task):
+        return parse_follow_up_datetime(task.get('follow_up_date'))
+
+    active_tasks = [t for t in tasks if t.get('status') not in INACTIVE_STATUSES]
+    active_objectives = [o for o in objectives if o.get('status') not in ['Completed']]
+
+    objectives_with_stats = []
+    for obj in active_objectives:
+        okr_score = 0
+        if obj.get('key_results'):
+            total_progress = sum(kr.get('progress', 0) for kr in obj['key_results'])
+            okr_score = total_progress / len(obj['key_results']) if obj['key_results'] else 0
+        obj_tasks = [t for t in active_tasks if t.get('topic_id') == obj['id']]
+        completed_obj_tasks = [t for t in tasks if t.get('topic_id') == obj['id'] and t.get('status') == 'Completed']
+        objectives_with_stats.append({
+            'id': obj.get('id'),
+            'title': obj.get('title'),
+            'type': obj.get('objective_type', 'aspirational'),
+            'period': obj.get('period', 'Q1'),
+            'confidence': obj.get('confidence', 0.5),
+            'okr_score': okr_score,
+            'key_results_count': len(obj.get('key_results', [])),
+            'key_results_completed': sum(1 for kr in obj.get('key_results', []) if kr.get('progress', 0) >= 1),
+            'total_tasks': len(obj_tasks) + len(completed_obj_tasks),
+            'active_tasks': len(obj_tasks),
+            'completed_tasks': len(completed_obj_tasks),
+            'status': obj.get('status', 'Active'),
+            'target_date': obj.get('target_date')
+        })
+
+    overdue_tasks = sorted((t for t in active_tasks if due(t) and due(t) < now),
+                           key=lambda t: due(t))
+    summary = {
+        'total': len(active_tasks),
+        'open': len([t for t in tasks if t.get('status') == 'Open']),
+        'due_today': len([t for t in active_tasks if due(t) and due(t).date() == today]),
+        'overdue': len(overdue_tasks),
+        'overdue_tasks': overdue_tasks,
+        'urgent': [t for t in active_tasks if t.get('priority') == 'Urgent'],
+        'by_customer': {},
+        'upcoming': [],
+        'active_objectives': len(active_objectives),
+        'objectives': objectives_with_stats[:DASHBOARD_OBJECTIVES]
+    }
+    for task in active_tasks:
+        summary['by_customer'].setdefault(task.get('customer_name', 'Unassigned'), []).append(task)
+
+    upcoming = [t for t in active_tasks if t.get('follow_up_date')
+                and not (due(t) and (due(t) < now or due(t).date() == today))]
+    summary['upcoming'] = sorted(upcoming, key=lambda t: due(t) or datetime.max)[:UPCOMING_LIMIT]
+    return summary
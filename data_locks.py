@@ -0,0 +1,149 @@
+"""
+Data Locks Module
+Per-collection reader/writer locks shared by app.py, ProjectManager and TeamManager
+"""
+
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Iterable
+
+
+class ReadWriteLock:
+    """Reentrant reader/writer lock that prefers waiting writers
+
+    Any number of threads may hold the read lock at once; the write lock is
+    exclusive. A thread that already holds the lock (read or write) can
+    re-acquire it for reading, and the write holder can re-acquire it for
+    writing. Upgrading from read to write is not allowed because two readers
+    doing it at the same time would deadlock.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers: Dict[int, int] = {}
+        self._writer = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me or me in self._readers:
+                self._readers[me] = self._readers.get(me, 0) + 1
+                return
+            while self._writer is not None or self._waiting_writers:
+                self._cond.wait()
+            self._readers[me] = 1
+
+    def release_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            count = self._readers[me] - 1
+            if count:
+                self._readers[me] = count
+            else:
+                del self._readers[me]
+                if not self._readers:
+                    self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            if me in self._readers:
+                raise RuntimeError('Cannot upgrade a read lock to a write lock')
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self):
+        with self._cond:
+            self._writer_depth -= 1
+            if self._writer_depth == 0:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+_locks: Dict[str, ReadWriteLock] = {}
+_registry_lock = threading.Lock()
+
+
+def collection_lock(name: str) -> ReadWriteLock:
+    """Get the shared lock for a data collection (tasks, deals, projects, ...)"""
+    with _registry_lock:
+        lock = _locks.get(name)
+        if lock is None:
+            lock = _locks[name] = ReadWriteLock()
+        return lock
+
+
+@contextmanager
+def locked(read: Iterable[str] = (), write: Iterable[str] = ()):
+    """
+    Hold read and/or write locks on several collections
+
+    Locks are always taken in name order so two requests touching the same
+    collections can never deadlock. A collection listed in both is written.
+    """
+    write = set(write)
+    names = sorted(set(read) | write)
+    acquired = []
+    try:
+        for name in names:
+            lock = collection_lock(name)
+            if name in write:
+                lock.acquire_write()
+                acquired.append(lock.release_write)
+            else:
+                lock.acquire_read()
+                acquired.append(lock.release_read)
+        yield
+    finally:
+        for release in reversed(acquired):
+            release()
+
+
+def reads(*collections: str):
+    """Decorator holding read locks on the given collections for the call"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with locked(read=collections):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def writes(*collections: str):
+    """Decorator holding write locks on the given collections for the call"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with locked(write=collections):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
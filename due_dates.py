@@ -0,0 +1,157 @@
+"""
+Due Dates Module
+Follow-up date parsing and a sorted index of active tasks by due date
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# Tasks in these statuses are not tracked as due
+INACTIVE_STATUSES = ('Completed', 'Cancelled')
+
+
+def parse_follow_up_datetime(follow_up_value):
+    """Parse follow-up date/datetime string and return datetime object"""
+    if not follow_up_value:
+        return None
+
+    # Try parsing as datetime first (YYYY-MM-DDTHH:MM format from datetime-local input)
+    try:
+        # Handle both with and without seconds
+        if 'T' in follow_up_value:
+            if len(follow_up_value) == 16:  # YYYY-MM-DDTHH:MM
+                return datetime.fromisoformat(follow_up_value + ':00')
+            else:
+                return datetime.fromisoformat(follow_up_value)
+        elif ' ' in follow_up_value:
+            # Handle space-separated datetime
+            return datetime.strptime(follow_up_value, '%Y-%m-%d %H:%M:%S')
+    except:
+        pass
+
+    # Try parsing as date only (YYYY-MM-DD format)
+    try:
+        date_obj = datetime.strptime(follow_up_value, '%Y-%m-%d')
+        # Set to end of day for date-only values for backward compatibility
+        return date_obj.replace(hour=23, minute=59, second=59)
+    except:
+        return None
+
+
+def start_of_day(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+class DueDateIndex:
+    """Active tasks ordered by parsed follow-up datetime
+
+    Entries are (due, position, task_id) tuples kept sorted with bisect, so
+    overdue / due-today / due-soon are range queries and ties keep the task
+    store's order. Each task's follow-up string is parsed once and cached
+    until it changes. Tasks with a follow-up date that can't be parsed are
+    tracked separately, as they sort after everything else.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[datetime, int, str]] = []
+        self._entry_of: Dict[str, Tuple[datetime, int, str]] = {}
+        self._parsed: Dict[str, Tuple[str, Optional[datetime]]] = {}
+        self._unparsed: Dict[str, int] = {}
+
+    def clear(self):
+        self._entries = []
+        self._entry_of = {}
+        self._parsed = {}
+        self._unparsed = {}
+
+    def due_at(self, task_id: str) -> Optional[datetime]:
+        """Cached parsed follow-up datetime of a task"""
+        parsed = self._parsed.get(task_id)
+        return parsed[1] if parsed else None
+
+    def _parse(self, task_id: str, value) -> Optional[datetime]:
+        cached = self._parsed.get(task_id)
+        if cached is not None and cached[0] == value:
+            return cached[1]
+        try:
+            due = parse_follow_up_datetime(value)
+        except (TypeError, AttributeError):
+            due = None
+        if due is not None and due.tzinfo is not None:
+            # Keep every key naive local time so they stay comparable
+            due = due.astimezone().replace(tzinfo=None)
+        self._parsed[task_id] = (value, due)
+        return due
+
+    def update(self, task: Dict, position: int):
+        """(Re)index a task after it was added or modified"""
+        task_id = task['id']
+        self.remove(task_id, forget=False)
+        value = task.get('follow_up_date')
+        due = self._parse(task_id, value)
+        if task.get('status') in INACTIVE_STATUSES or not value:
+            return
+        if due is None:
+            self._unparsed[task_id] = position
+            return
+        entry = (due, position, task_id)
+        insort(self._entries, entry)
+        self._entry_of[task_id] = entry
+
+    def remove(self, task_id: str, forget: bool = True):
+        entry = self._entry_of.pop(task_id, None)
+        if entry is not None:
+            i = bisect_left(self._entries, entry)
+            if i < len(self._entries) and self._entries[i] == entry:
+                del self._entries[i]
+        self._unparsed.pop(task_id, None)
+        if forget:
+            self._parsed.pop(task_id, None)
+
+    # Range queries - all return task ids ordered by due datetime
+    def before(self, moment: datetime) -> List[str]:
+        """Tasks due strictly before moment"""
+        end = bisect_left(self._entries, (moment,))
+        return [entry[2] for entry in self._entries[:end]]
+
+    def between(self, start: Optional[datetime], end: Optional[datetime],
+                include_start: bool = True, include_end: bool = False) -> List[str]:
+        """Tasks due between start and end (None leaves that side open)"""
+        if start is None:
+            lo = 0
+        elif include_start:
+            lo = bisect_left(self._entries, (start,))
+        else:
+            lo = bisect_right(self._entries, (start, float('inf')))
+        if end is None:
+            hi = len(self._entries)
+        elif include_end:
+            hi = bisect_right(self._entries, (end, float('inf')))
+        else:
+            hi = bisect_left(self._entries, (end,))
+        return [entry[2] for entry in self._entries[lo:hi]]
+
+    def next_at_or_after(self, moment: datetime) -> Optional[datetime]:
+        """Earliest due datetime at or after moment"""
+        i = bisect_left(self._entries, (moment,))
+        return self._entries[i][0] if i < len(self._entries) else None
+
+    def last_before(self, moment: datetime) -> Optional[datetime]:
+        """Latest due datetime strictly before moment"""
+        i = bisect_left(self._entries, (moment,))
+        return self._entries[i - 1][0] if i else None
+
+    def count_between(self, start: datetime, end: datetime) -> int:
+        """Number of tasks due in [start, end)"""
+        return max(0, bisect_left(self._entries, (end,)) - bisect_left(self._entries, (start,)))
+
+    def due_on(self, day: date) -> List[str]:
+        return self.between(start_of_day(day), start_of_day(day + timedelta(days=1)))
+
+    def unparsed(self) -> List[str]:
+        """Active tasks whose follow-up date could not be parsed, in store order"""
+        return sorted(self._unparsed, key=self._unparsed.__getitem__)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,235 @@
+"""
+Event Hub Module
+Fan-out of server-sent events (/api/events) plus the producers feeding it:
+coalesced collection-change events and due-date transition notifications
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from data_locks import locked
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 256
+# Each open stream holds a server thread for as long as it is connected
+# (waitress runs a fixed pool, --threads=8); the rest must stay free for requests
+MAX_SUBSCRIBERS = 4
+HEARTBEAT_SECONDS = 15
+CHANGE_COALESCE_SECONDS = 0.25
+# Longest the due watcher sleeps without re-checking (guards against clock changes)
+MAX_WATCH_SECONDS = 300
+
+
+def format_event(event: str, data, event_id: Optional[int] = None) -> bytes:
+    """Encode one server-sent event frame"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.extend(f'data: {line}' for line in json.dumps(data, default=str).splitlines())
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+class Subscription:
+    """One connected client; frames are queued by the hub and drained by stream()"""
+
+    def __init__(self, hub: 'EventHub'):
+        self.hub = hub
+        self.queue: queue.Queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.closed = False
+
+    def stream(self) -> Iterator[bytes]:
+        try:
+            while not self.closed:
+                try:
+                    yield self.queue.get(timeout=HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    # Comment line; also how a vanished client gets noticed
+                    yield b': keepalive\n\n'
+        finally:
+            self.hub.unsubscribe(self)
+
+
+class EventHub:
+    """Serialize each event once and hand the same frame to every subscriber
+
+    A subscriber that falls SUBSCRIBER_QUEUE_SIZE frames behind is dropped;
+    its EventSource reconnects on its own. At most ``max_subscribers``
+    streams are open at once; further clients are refused and poll instead.
+    """
+
+    def __init__(self, max_subscribers: int = MAX_SUBSCRIBERS):
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._next_id = 1
+        self._listeners = []
+
+    def subscribe(self) -> Optional[Subscription]:
+        """A new subscription, or None when max_subscribers streams are already open"""
+        subscription = Subscription(self)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            self._subscribers.add(subscription)
+        for listener in self._listeners:
+            listener(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.closed = True
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def on_subscribe(self, listener: Callable[[Subscription], None]):
+        """Call listener(subscription) whenever a client connects"""
+        self._listeners.append(listener)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: str, data, to: Optional[Iterable[Subscription]] = None):
+        """Send an event to every subscriber, or only to those in ``to``"""
+        with self._lock:
+            frame = format_event(event, data, self._next_id)
+            self._next_id += 1
+            subscribers = list(self._subscribers)
+            if to is not None:
+                subscribers = [subscription for subscription in to if subscription in self._subscribers]
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(frame)
+            except queue.Full:
+                logger.warning('Dropping a slow event stream subscriber')
+                self.unsubscribe(subscription)
+
+
+class ChangeNotifier:
+    """Turn change-feed activity into at most one 'change' event per collection per interval
+
+    Bursts (imports, batch edits) collapse into a single event carrying the
+    latest sequence number; clients follow up with /api/changes.
+    """
+
+    def __init__(self, hub: EventHub, version: Callable[[str], str],
+                 interval: float = CHANGE_COALESCE_SECONDS):
+        self.hub = hub
+        self.version = version
+        self.interval = interval
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._callbacks = []
+        self._thread = threading.Thread(target=self._run, name='change-notifier', daemon=True)
+        self._thread.start()
+
+    def on_change(self, callback: Callable[[str], None]):
+        """Also call callback(collection) from the notifier thread for every change"""
+        self._callbacks.append(callback)
+
+    def changed(self, collection: str, seq: int):
+        """ChangeFeed listener"""
+        with self._lock:
+            self._pending.add(collection)
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            self._wake.clear()
+            with self._lock:
+                pending, self._pending = self._pending, set()
+            for collection in sorted(pending):
+                for callback in self._callbacks:
+                    try:
+                        callback(collection)
+                    except Exception as e:
+                        logger.error(f"Error in change callback: {str(e)}")
+                if self.hub.subscriber_count():
+                    self.hub.publish('change', {'collection': collection, 'version': self.version(collection)})
+
+
+class DueWatcher:
+    """Publish the notification state whenever a task becomes due soon or overdue
+
+    Instead of clients polling, one thread sleeps until the next moment the
+    state can change - the next follow-up datetime passing, one entering the
+    one-hour due-soon window, or midnight - and publishes a 'notifications'
+    event (the /api/tasks/notification-check payload) if the set of tasks
+    in any section changed. Task changes wake it early, and new subscribers
+    are sent the current state right away. It idles while nobody is
+    subscribed.
+    """
+
+    def __init__(self, hub: EventHub, due_index, payload: Callable[[datetime], Dict],
+                 due_soon: timedelta = timedelta(hours=1)):
+        self.hub = hub
+        self.due = due_index
+        self.payload = payload
+        self.due_soon = due_soon
+        self._last_state = None
+        self._newcomers = set()
+        self._newcomers_lock = threading.Lock()
+        self._wake = threading.Event()
+        hub.on_subscribe(self.welcome)
+        self._thread = threading.Thread(target=self._run, name='due-watcher', daemon=True)
+        self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def welcome(self, subscription):
+        """EventHub listener: queue the current state for a new subscriber"""
+        with self._newcomers_lock:
+            self._newcomers.add(subscription)
+        self._wake.set()
+
+    def next_transition(self, now: datetime) -> datetime:
+        """Next moment a task can enter the due-soon or overdue section, or midnight"""
+        candidates = [datetime.combine(now.date() + timedelta(days=1), datetime.min.time())]
+        next_due = self.due.next_at_or_after(now)
+        if next_due is not None:
+            # Overdue means strictly past the follow-up datetime
+            candidates.append(next_due + timedelta(microseconds=1))
+        entering = self.due.next_at_or_after(now + self.due_soon + timedelta(microseconds=1))
+        if entering is not None:
+            candidates.append(entering - self.due_soon)
+        return min(candidates)
+
+    @staticmethod
+    def _state(payload: Dict):
+        return tuple(tuple(item['id'] for item in payload[section]) for section in sorted(payload))
+
+    def _run(self):
+        while True:
+            if not self.hub.subscriber_count():
+                self._last_state = None
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            now = datetime.now()
+            try:
+                with locked(read=['tasks']):
+                    payload = self.payload(now)
+                    next_transition = self.next_transition(now)
+                state = self._state(payload)
+                with self._newcomers_lock:
+                    newcomers, self._newcomers = self._newcomers, set()
+                if state != self._last_state:
+                    self._last_state = state
+                    self.hub.publish('notifications', payload)
+                elif newcomers:
+                    self.hub.publish('notifications', payload, to=newcomers)
+                delay = (next_transition - datetime.now()).total_seconds()
+            except Exception as e:
+                logger.error(f"Error checking due tasks: {str(e)}")
+                delay = MAX_WATCH_SECONDS
+            self._wake.wait(timeout=min(max(delay, 0.05), MAX_WATCH_SECONDS))
+            self._wake.clear()
@@ -13,6 +13,7 @@ from typing import Dict, List, Optional, Tuple
 import hashlib
 import tempfile
 from pathlib import Path
+from persistence import atomic_write_json
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -596,9 +597,7 @@ class FTPSyncManager:
         sync_log = sync_log[-100:]
         
         # Save log
-        os.makedirs(os.path.dirname(self.sync_log_file), exist_ok=True)
-        with open(self.sync_log_file, 'w') as f:
-            json.dump(sync_log, f, indent=2)
+        atomic_write_json(self.sync_log_file, sync_log)
     
     def _get_synced_files(self) -> set:
         """Get list of previously synced files"""
@@ -631,9 +630,7 @@ class FTPSyncManager:
             except:
                 filtered.add(f)  # Keep if can't parse date
         
-        os.makedirs('data', exist_ok=True)
-        with open(synced_files_path, 'w') as f:
-            json.dump(list(filtered), f, indent=2)
+        atomic_write_json(synced_files_path, list(filtered))
     
     def _get_deleted_deals(self) -> List[Dict]:
         """Get list of deleted deals with timestamps"""
@@ -664,9 +661,7 @@ class FTPSyncManager:
                         if datetime.fromisoformat(d['deleted_at']) > cutoff]
         
         # Save the updated list
-        os.makedirs('data', exist_ok=True)
-        with open(deleted_deals_file, 'w') as f:
-            json.dump(deleted_deals, f, indent=2)
+        atomic_write_json(deleted_deals_file, deleted_deals)
     
     def get_sync_status(self) -> Dict:
         """Get current sync status and statistics"""
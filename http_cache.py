@@ -0,0 +1,94 @@
+"""
+HTTP Cache Module
+Conditional GET support (ETag / If-None-Match, Last-Modified / If-Modified-Since)
+driven by the storage layer's collection version counters, and per-record
+ETags checked against If-Match on updates
+"""
+
+import hashlib
+import zlib
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import jsonify, make_response, request
+
+from persistence import dump_json
+
+# Pollers must revalidate every time, but may reuse their copy on a 304
+CACHE_CONTROL = 'no-cache'
+
+
+def conditional(validators: Callable[[], Optional[Tuple[str, float]]]):
+    """
+    Answer unchanged GETs with 304 before the view runs
+
+    ``validators()`` returns (version tag, last-modified timestamp) describing
+    the current state of everything the response depends on, or None when
+    the response can't be validated this time (it is then served normally).
+    Place it below @reads so the versions are read under the same lock as
+    the data.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            state = validators()
+            if state is None:
+                return view(*args, **kwargs)
+            tag, modified = state
+            # Responses differ by query string, so it is part of the tag
+            etag = f'{tag}.{zlib.crc32(request.query_string):08x}'
+            last_modified = datetime.fromtimestamp(int(modified), tz=timezone.utc)
+
+            if _not_modified(etag, last_modified):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            # Weak: compression and JSON key order may change the bytes, not the content
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            response.headers['Cache-Control'] = CACHE_CONTROL
+            return response
+        return wrapper
+    return decorator
+
+
+def _not_modified(etag: str, last_modified: datetime) -> bool:
+    if request.if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    return since is not None and last_modified <= since
+
+
+def record_etag(record: Dict) -> str:
+    """Content hash of one record (task, deal), so any edit changes it"""
+    payload = dump_json(record, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+
+def with_record_etag(response, record: Dict):
+    """Attach the record's ETag to a response, for a later If-Match"""
+    response = make_response(response)
+    response.set_etag(record_etag(record))
+    return response
+
+
+def check_if_match(record: Dict, what: str):
+    """
+    412 response if the request's If-Match names another version of record
+
+    Requests without If-Match always pass. Compared weakly: compression
+    marks the tag weak on the way out, but it still identifies the content.
+    """
+    if not request.if_match:
+        return None
+    etag = record_etag(record)
+    if request.if_match.contains_weak(etag):
+        return None
+    response = jsonify({'error': f'{what} was changed by someone else; reload and try again', 'current': record})
+    response.status_code = 412
+    response.set_etag(etag)
+    return response
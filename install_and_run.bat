@@ -205,7 +205,7 @@ start "" http://localhost:%PORT%
 
 :: Try Waitress first, then fall back to Flask if it fails
 echo Starting server...
-python -m waitress --port=%PORT% --threads=4 app:app
+python -m waitress --port=%PORT% --threads=8 app:app
 if %errorlevel% neq 0 (
     echo.
     echo Waitress failed to start. Using Flask development server...
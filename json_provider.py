@@ -0,0 +1,67 @@
+"""
+JSON Provider Module
+Faster jsonify() through orjson when it is installed, with the standard
+provider's output conventions and the standard library as fallback
+"""
+
+import logging
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """DefaultJSONProvider that serializes with orjson
+
+    Keys stay sorted, datetimes keep Flask's HTTP-date format (they are
+    handed to the default hook rather than orjson's ISO encoder) and
+    non-string dict keys are converted instead of raising. Anything orjson
+    refuses (ints beyond 64 bits, unusual keys) or any json.dumps option
+    without an orjson equivalent goes through the standard provider.
+    Non-ASCII text is written as UTF-8 rather than escaped.
+    """
+
+    OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if ORJSON_AVAILABLE else 0
+
+    def _encode(self, obj: Any, indent: bool = False) -> bytes:
+        options = self.OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=self.default, option=options)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        indent = kwargs.pop('indent', None)
+        kwargs.pop('separators', None)
+        if kwargs or indent not in (None, 2):
+            return super().dumps(obj, indent=indent, **kwargs)
+        try:
+            return self._encode(obj, indent=bool(indent)).decode('utf-8')
+        except TypeError:
+            return super().dumps(obj, indent=indent)
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = self._encode(obj, indent=indent) + b'\n'
+        except TypeError:
+            return super().response(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """Use orjson for the app's JSON when available"""
+    if ORJSON_AVAILABLE:
+        app.json = OrjsonProvider(app)
+        logger.info('Using orjson for JSON responses')
@@ -0,0 +1,90 @@
+"""
+Keyed Collection Module
+List of records that can also be looked up by id in constant time
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+
+class KeyedCollection(list):
+    """List of dict records with O(1) lookup by id
+
+    It is still a plain list to callers and to json.dumps, so loaders can
+    return it without changing the on-disk format or any list handling.
+    The id -> position map is built on the first lookup and kept current
+    by append(); any other structural change just drops it to be rebuilt
+    on the next lookup.
+    """
+
+    def __init__(self, records: Iterable[Dict] = (), key: str = 'id'):
+        super().__init__(records)
+        self.key = key
+        self._positions: Optional[Dict[Any, int]] = None
+
+    def _position_map(self) -> Dict[Any, int]:
+        if self._positions is None:
+            positions = {}
+            for i, record in enumerate(self):
+                if isinstance(record, dict) and self.key in record:
+                    # First occurrence wins, like the scans this replaces
+                    positions.setdefault(record[self.key], i)
+            self._positions = positions
+        return self._positions
+
+    def index_of(self, record_id) -> Optional[int]:
+        """Get the position of the record with this id, or None"""
+        i = self._position_map().get(record_id)
+        if i is None or self[i].get(self.key) == record_id:
+            return i
+        # Stale entry (the record's id was changed in place) - rebuild and retry
+        self._positions = None
+        return self._position_map().get(record_id)
+
+    def get(self, record_id, default: Optional[Dict] = None) -> Optional[Dict]:
+        """Get the record with this id"""
+        i = self.index_of(record_id)
+        return self[i] if i is not None else default
+
+    def has(self, record_id) -> bool:
+        return self.index_of(record_id) is not None
+
+    # Mutations that keep or invalidate the position map
+    def append(self, record):
+        super().append(record)
+        if self._positions is not None and isinstance(record, dict) and self.key in record:
+            self._positions.setdefault(record[self.key], len(self) - 1)
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._positions = None
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._positions = None
+
+    def __iadd__(self, other):
+        result = super().__iadd__(other)
+        self._positions = None
+        return result
+
+    def __imul__(self, n):
+        result = super().__imul__(n)
+        self._positions = None
+        return result
+
+    def _invalidating(name):
+        def method(self, *args, **kwargs):
+            result = getattr(super(KeyedCollection, self), name)(*args, **kwargs)
+            self._positions = None
+            return result
+        method.__name__ = name
+        return method
+
+    insert = _invalidating('insert')
+    extend = _invalidating('extend')
+    pop = _invalidating('pop')
+    remove = _invalidating('remove')
+    clear = _invalidating('clear')
+    sort = _invalidating('sort')
+    reverse = _invalidating('reverse')
+    del _invalidating
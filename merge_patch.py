@@ -0,0 +1,25 @@
+"""
+Merge Patch Module
+JSON Merge Patch (RFC 7386) for PATCH endpoints
+"""
+
+from typing import Any
+
+
+def apply_merge_patch(target: Any, patch: Any) -> Any:
+    """
+    Return target with patch applied, leaving both unchanged
+
+    Objects merge member by member (recursively), a null member removes
+    that member, and any other value - including arrays - replaces the
+    target value outright.
+    """
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
@@ -0,0 +1,127 @@
+"""
+NDJSON Module
+Streaming newline-delimited JSON export and batched, deduplicating import
+"""
+
+import json
+import logging
+import uuid
+from typing import Any, BinaryIO, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from persistence import dump_json
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+# Records serialized per yielded chunk (and per hold of the collection lock)
+EXPORT_CHUNK_RECORDS = 500
+IMPORT_BATCH_SIZE = 1000
+READ_CHUNK_BYTES = 64 * 1024
+MAX_REPORTED_ERRORS = 20
+
+# (line / index, record, parse error)
+ImportItem = Tuple[int, Any, Optional[str]]
+
+
+def export_ndjson(records: Sequence[Dict], lock: Callable[[], ContextManager],
+                  dumps: Optional[Callable[[Any], str]] = None) -> Iterator[bytes]:
+    """
+    Yield records as NDJSON, one chunk of EXPORT_CHUNK_RECORDS at a time
+
+    ``records`` is a snapshot of the collection (references, not copies);
+    each chunk is serialized under ``lock()`` so a record is never read
+    while a request is modifying it, without blocking writers for the
+    whole download.
+    """
+    dumps = dumps or (lambda record: dump_json(record, default=str))
+    for start in range(0, len(records), EXPORT_CHUNK_RECORDS):
+        with lock():
+            chunk = ''.join(dumps(record) + '\n' for record in records[start:start + EXPORT_CHUNK_RECORDS])
+        yield chunk.encode('utf-8')
+
+
+def iter_lines(stream: BinaryIO, chunk_size: int = READ_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Lines of a binary stream, read a chunk at a time
+
+    Iterating the WSGI input directly would read it a byte at a time.
+    """
+    pending = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def read_ndjson(stream: BinaryIO) -> Iterator[ImportItem]:
+    """Parse NDJSON line by line; blank lines are skipped, bad ones reported"""
+    for line_number, line in enumerate(iter_lines(stream), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except ValueError as e:
+            yield line_number, None, f'Invalid JSON: {e}'
+
+
+def read_json_array(records: List) -> Iterator[ImportItem]:
+    """Items of an already parsed JSON array, numbered from 1"""
+    for index, record in enumerate(records, start=1):
+        yield index, record, None
+
+
+def import_records(items: Iterable[ImportItem], commit: Callable[[List[Dict]], int],
+                   batch_size: int = IMPORT_BATCH_SIZE) -> Dict:
+    """
+    Import records that are not already present, in batches
+
+    Records without an id get one. Duplicates within the input are dropped
+    through a set of the ids seen so far; ``commit(batch)`` takes the lock,
+    adds the records whose ids the collection doesn't have yet and returns
+    how many it added.
+    """
+    seen = set()
+    batch: List[Dict] = []
+    report = {'imported': 0, 'skipped': 0, 'failed': 0, 'errors': []}
+
+    def fail(position: int, message: str):
+        report['failed'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'line': position, 'error': message})
+
+    def flush():
+        if batch:
+            added = commit(batch)
+            report['imported'] += added
+            report['skipped'] += len(batch) - added
+            batch.clear()
+
+    for position, record, error in items:
+        if error is not None:
+            fail(position, error)
+            continue
+        if not isinstance(record, dict):
+            fail(position, 'Expected a JSON object')
+            continue
+        if 'id' not in record:
+            record['id'] = str(uuid.uuid4())
+        elif not isinstance(record['id'], (str, int)):
+            fail(position, 'id must be a string')
+            continue
+        if record['id'] in seen:
+            report['skipped'] += 1
+            continue
+        seen.add(record['id'])
+        batch.append(record)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    if report['failed']:
+        logger.warning(f"Import skipped {report['failed']} invalid record(s)")
+    return report
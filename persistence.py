@@ -0,0 +1,111 @@
+"""
+Persistence Module
+Crash-safe JSON file writes shared by the app, the manager modules and FTP sync
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from typing import Any
+
+# Compact output is roughly half the size of indent=2 and much faster to produce
+COMPACT_SEPARATORS = (',', ':')
+SNAPSHOT_DIR_NAME = 'snapshots'
+
+
+def dump_json(data: Any, **kwargs) -> str:
+    """Serialize data using the compact on-disk format"""
+    kwargs.setdefault('separators', COMPACT_SEPARATORS)
+    return json.dumps(data, **kwargs)
+
+
+def atomic_write_json(path: str, data: Any, snapshots: int = 0, **kwargs):
+    """
+    Write data as JSON so readers only ever see the old or the new file
+
+    Args:
+        path: Target file
+        data: JSON-serializable data
+        snapshots: Number of previous versions to keep in data/snapshots (0 disables)
+        **kwargs: Extra arguments for json.dumps (e.g. default=str)
+    """
+    atomic_write_text(path, dump_json(data, **kwargs), snapshots=snapshots)
+
+
+def atomic_write_text(path: str, text: str, snapshots: int = 0):
+    """Write text to a temp file, fsync it and rename it over the target"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f'.{os.path.basename(path)}.', suffix='.tmp', dir=directory
+    )
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+
+        if snapshots > 0 and os.path.exists(path):
+            _snapshot(path, snapshots)
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    _fsync_directory(directory)
+
+
+def _snapshot(path: str, keep: int):
+    """Preserve the current version of a file and prune old snapshots"""
+    directory = os.path.dirname(path) or '.'
+    snapshot_dir = os.path.join(directory, SNAPSHOT_DIR_NAME)
+    os.makedirs(snapshot_dir, exist_ok=True)
+
+    name, ext = os.path.splitext(os.path.basename(path))
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    snapshot_path = os.path.join(snapshot_dir, f"{name}.{timestamp}{ext}")
+
+    # The file is about to be replaced, not modified, so a hard link is a
+    # free snapshot; fall back to copying where links are unsupported
+    try:
+        os.link(path, snapshot_path)
+    except OSError:
+        shutil.copy2(path, snapshot_path)
+
+    # Timestamps sort chronologically, so the oldest snapshots come first
+    existing = []
+    for filename in os.listdir(snapshot_dir):
+        stem, file_ext = os.path.splitext(filename)
+        snapshot_name, _, stamp = stem.rpartition('.')
+        if snapshot_name == name and file_ext == ext and stamp.replace('_', '').isdigit():
+            existing.append(filename)
+    existing.sort()
+
+    for old in existing[:-keep]:
+        try:
+            os.remove(os.path.join(snapshot_dir, old))
+        except OSError:
+            pass
+
+
+def _fsync_directory(directory: str):
+    """Persist the rename itself (not supported on Windows)"""
+    if os.name == 'nt':
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
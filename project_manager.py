@@ -5,20 +5,51 @@ Provides critical path analysis, resource management, and project analytics
 
 import json
 import os
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, timedelta, timezone
 from typing import List, Dict, Optional, Tuple, Set
 import uuid
 from collections import defaultdict, deque
 import heapq
+from analytics_cache import AnalyticsCache, memoized
+from persistence import atomic_write_json
+from working_calendar import WorkingCalendar
+from data_locks import reads, writes
+from keyed_collection import KeyedCollection
+
+def _parse_datetime(value) -> Optional[datetime]:
+    """An ISO date / datetime string as a naive datetime (UTC if it had an offset), or None"""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
 
 class ProjectManager:
-    def __init__(self):
+    def __init__(self, task_store=None, storage=None):
         self.projects_file = 'data/projects.json'
         self.tasks_file = 'data/tasks.json'
         self.resources_file = 'data/resources.json'
-        
+        # When the app keeps tasks in memory, read them from there instead of the file
+        self.task_store = task_store
+        # The app's storage backend (storage.py); without one, use the JSON files
+        self.storage = storage
+        # Analyses by project and data version (see analytics_cache.py)
+        self.analytics_cache = AnalyticsCache()
+        # Only the latest portfolio snapshot is worth keeping
+        self.portfolio_cache = AnalyticsCache(maxsize=1)
+        # Monday-Friday; projects and resources may set their own working_days / holidays
+        self.calendar = WorkingCalendar()
+        
+    @reads('projects')
     def load_projects(self):
         """Load projects from JSON file"""
+        if self.storage is not None:
+            return self.storage.load('projects')
         if os.path.exists(self.projects_file):
             with open(self.projects_file, 'r') as f:
                 return json.load(f)
@@ -26,10 +57,13 @@ class ProjectManager:
     
     def save_projects(self, projects):
         """Save projects to JSON file"""
-        os.makedirs('data', exist_ok=True)
-        with open(self.projects_file, 'w') as f:
-            json.dump(projects, f, indent=2, default=str)
+        if self.storage is not None:
+            self.storage.save('projects', projects)
+            return
+        atomic_write_json(self.projects_file, projects, default=str)
     
+    @reads('projects', 'tasks')
+    @memoized('projects', 'tasks')
     def calculate_critical_path(self, project_id: str) -> Dict:
         """
         Calculate the critical path for a project using the Critical Path Method (CPM)
@@ -43,6 +77,18 @@ class ProjectManager:
         if not tasks:
             return {"critical_path": [], "project_duration": 0, "slack_times": {}}
         
+        return self.analyze_critical_path(tasks, self.calendar.for_record(project))
+    
+    def analyze_critical_path(self, tasks: List[Dict], calendar: Optional[WorkingCalendar] = None) -> Dict:
+        """
+        CPM over a list of tasks, in O(tasks + dependencies)
+        
+        Tasks are put in topological order with Kahn's algorithm, then the
+        forward and backward passes each walk that order once. If the
+        dependencies contain a cycle, the result has an "error" and the
+        ids of one cycle under "cycle", each task depending on the one
+        before it.
+        """
         # Build task dependency graph
         task_map = {task['id']: task for task in tasks}
         dependencies = defaultdict(list)
@@ -61,97 +107,54 @@ class ProjectManager:
             else:
                 depends_on = []
             
-            for dep_id in depends_on:
+            # A dependency listed twice is still one edge
+            for dep_id in dict.fromkeys(depends_on):
                 if dep_id in task_map:
                     dependencies[task['id']].append(dep_id)
                     dependents[dep_id].append(task['id'])
         
-        # Calculate early start and early finish times
-        early_times = {}
-        visited = set()
+        order = self._topological_order(task_map, dependencies, dependents)
+        if len(order) < len(task_map):
+            cycle = self._find_cycle(set(task_map) - set(order), dependencies)
+            return {"error": "Task dependencies contain a cycle", "cycle": cycle}
         
-        def calculate_early_times(task_id):
-            if task_id in visited:
-                return early_times.get(task_id, {})
-            
-            visited.add(task_id)
-            task = task_map[task_id]
-            duration = self._get_task_duration(task)
-            
-            deps = dependencies[task_id]
-            if not deps:
-                # No dependencies, can start immediately
-                early_start = 0
-            else:
-                # Must wait for all dependencies to finish
-                early_start = 0
-                for dep_id in deps:
-                    dep_times = calculate_early_times(dep_id)
-                    early_start = max(early_start, dep_times.get('early_finish', 0))
-            
-            early_finish = early_start + duration
+        # Durations are parsed once and shared by both passes
+        durations = {task_id: self._get_task_duration(task_map[task_id], calendar) for task_id in order}
+        
+        # Forward pass: early start and early finish times
+        early_times = {}
+        for task_id in order:
+            # Must wait for all dependencies to finish
+            early_start = max((early_times[dep_id]['early_finish'] for dep_id in dependencies[task_id]), default=0)
             early_times[task_id] = {
                 'early_start': early_start,
-                'early_finish': early_finish,
-                'duration': duration
+                'early_finish': early_start + durations[task_id],
+                'duration': durations[task_id]
             }
-            
-            return early_times[task_id]
-        
-        # Calculate early times for all tasks
-        for task_id in task_map:
-            calculate_early_times(task_id)
         
         # Find project duration (maximum early finish time)
         project_duration = max(
             times['early_finish'] for times in early_times.values()
         ) if early_times else 0
         
-        # Calculate late start and late finish times (backward pass)
+        # Backward pass: late start and late finish times
         late_times = {}
-        visited_late = set()
-        
-        def calculate_late_times(task_id):
-            if task_id in visited_late:
-                return late_times.get(task_id, {})
-            
-            visited_late.add(task_id)
-            task = task_map[task_id]
-            duration = self._get_task_duration(task)
-            
-            deps = dependents[task_id]
-            if not deps:
-                # No dependent tasks, can finish at project end
-                late_finish = project_duration
-            else:
-                # Must finish before any dependent task needs to start
-                late_finish = project_duration
-                for dep_id in deps:
-                    dep_times = calculate_late_times(dep_id)
-                    late_finish = min(late_finish, dep_times.get('late_start', project_duration))
-            
-            late_start = late_finish - duration
+        for task_id in reversed(order):
+            # Must finish before any dependent task needs to start (or at project end)
+            late_finish = min((late_times[dep_id]['late_start'] for dep_id in dependents[task_id]),
+                              default=project_duration)
             late_times[task_id] = {
-                'late_start': late_start,
+                'late_start': late_finish - durations[task_id],
                 'late_finish': late_finish,
-                'duration': duration
+                'duration': durations[task_id]
             }
-            
-            return late_times[task_id]
-        
-        # Calculate late times for all tasks
-        for task_id in task_map:
-            calculate_late_times(task_id)
         
         # Calculate slack times and identify critical path
         slack_times = {}
         critical_tasks = []
         
         for task_id in task_map:
-            early = early_times.get(task_id, {})
-            late = late_times.get(task_id, {})
-            
-            slack = late.get('late_start', 0) - early.get('early_start', 0)
+            slack = late_times[task_id]['late_start'] - early_times[task_id]['early_start']
             slack_times[task_id] = slack
             
             if slack == 0:
@@ -159,7 +162,7 @@ class ProjectManager:
         
         # Build the critical path sequence
         critical_path = self._build_critical_path_sequence(
-            critical_tasks, dependencies, task_map
+            critical_tasks, dependencies, dependents
         )
         
         return {
@@ -170,69 +173,82 @@ class ProjectManager:
             "late_times": late_times
         }
     
-    def _get_task_duration(self, task: Dict) -> int:
-        """Calculate task duration in days"""
+    @staticmethod
+    def _topological_order(task_ids, dependencies: Dict, dependents: Dict) -> List[str]:
+        """Kahn's algorithm; tasks on or after a cycle are left out of the result"""
+        remaining = {task_id: len(dependencies[task_id]) for task_id in task_ids}
+        queue = deque(task_id for task_id, count in remaining.items() if count == 0)
+        order = []
+        while queue:
+            task_id = queue.popleft()
+            order.append(task_id)
+            for dependent_id in dependents[task_id]:
+                remaining[dependent_id] -= 1
+                if remaining[dependent_id] == 0:
+                    queue.append(dependent_id)
+        return order
+    
+    @staticmethod
+    def _find_cycle(unordered: Set[str], dependencies: Dict) -> List[str]:
+        """One dependency cycle among the tasks Kahn's algorithm could not order"""
+        # Each of them still waits on an unordered dependency, so following
+        # those from any of them must come back to a task already seen
+        task_id = next(iter(unordered))
+        seen = {}
+        path = []
+        while task_id not in seen:
+            seen[task_id] = len(path)
+            path.append(task_id)
+            task_id = next(dep_id for dep_id in dependencies[task_id] if dep_id in unordered)
+        # path runs from dependents to dependencies; report it the other way round
+        return path[seen[task_id]:][::-1]
+    
+    def _get_task_duration(self, task: Dict, calendar: Optional[WorkingCalendar] = None) -> int:
+        """Calculate task duration in working days"""
         gantt_props = task.get('gantt_properties', {})
         
         if gantt_props.get('duration'):
             return gantt_props['duration']
         
         # Try to calculate from dates
-        start_date = gantt_props.get('start_date') or task.get('created_date')
-        end_date = gantt_props.get('end_date') or task.get('follow_up_date')
+        start = _parse_datetime(gantt_props.get('start_date') or task.get('created_date'))
+        end = _parse_datetime(gantt_props.get('end_date') or task.get('follow_up_date'))
         
-        if start_date and end_date:
-            try:
-                start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-                end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-                duration = (end - start).days
-                return max(1, duration)  # Minimum 1 day duration
-            except:
-                pass
+        if start and end:
+            duration = (calendar or self.calendar).working_days(start, end)
+            return max(1, duration)  # Minimum 1 day duration
         
         return 5  # Default duration
     
     def _build_critical_path_sequence(self, critical_tasks: List[str], 
-                                     dependencies: Dict, task_map: Dict) -> List[str]:
+                                     dependencies: Dict, dependents: Dict) -> List[str]:
         """Build the ordered sequence of critical path tasks"""
         if not critical_tasks:
             return []
         
-        # Find tasks with no dependencies in critical path
-        start_tasks = []
-        for task_id in critical_tasks:
-            deps = dependencies[task_id]
-            if not deps or not any(dep in critical_tasks for dep in deps):
-                start_tasks.append(task_id)
-        
-        if not start_tasks:
-            # Circular dependency or error, return unordered list
-            return critical_tasks
-        
-        # Build path using BFS
+        # Topological order of the critical tasks, starting from those with no critical dependencies
+        critical = set(critical_tasks)
+        remaining = {
+            task_id: sum(1 for dep in dependencies[task_id] if dep in critical) for task_id in critical_tasks
+        }
+        queue = deque(task_id for task_id in critical_tasks if remaining[task_id] == 0)
         path = []
-        visited = set()
-        queue = deque(start_tasks)
         
         while queue:
             task_id = queue.popleft()
-            if task_id in visited:
-                continue
-            
-            visited.add(task_id)
             path.append(task_id)
             
-            # Add dependent critical tasks
-            for dependent_id in task_map:
-                if dependent_id in critical_tasks and dependent_id not in visited:
-                    deps = dependencies[dependent_id]
-                    if task_id in deps:
-                        # Check if all dependencies are visited
-                        if all(dep in visited or dep not in critical_tasks for dep in deps):
-                            queue.append(dependent_id)
+            # Add dependent critical tasks once all their critical dependencies are in the path
+            for dependent_id in dependents[task_id]:
+                if dependent_id in critical:
+                    remaining[dependent_id] -= 1
+                    if remaining[dependent_id] == 0:
+                        queue.append(dependent_id)
         
         return path
     
+    @reads('projects', 'tasks')
+    @memoized('projects', 'tasks')
     def calculate_resource_utilization(self, project_id: str, 
                                       start_date: Optional[str] = None,
                                       end_date: Optional[str] = None) -> Dict:
@@ -244,8 +260,13 @@ class ProjectManager:
         if not project:
             return {"error": "Project not found"}
         
+        return self._resource_utilization(project, self.get_project_tasks(project_id), start_date, end_date)
+    
+    def _resource_utilization(self, project: Dict, tasks: List[Dict],
+                              start_date: Optional[str] = None,
+                              end_date: Optional[str] = None) -> Dict:
         resources = project.get('resources', [])
-        tasks = self.get_project_tasks(project_id)
+        calendar = self.calendar.for_record(project)
         
         # Build resource allocation timeline
         resource_timeline = defaultdict(list)
@@ -277,21 +298,21 @@ class ProjectManager:
                     'utilization_percentage': 0,
                     'allocated_hours': 0,
                     'available_hours': self._calculate_available_hours(
-                        resource, start_date, end_date
+                        resource, start_date, end_date, calendar.for_record(resource)
                     ),
-                    'tasks': []
+                    'tasks': [],
+                    'is_overallocated': False,
+                    'daily_load': {},
+                    'peak_load': None
                 }
                 continue
             
-            # Check for overlapping assignments
-            sorted_allocations = sorted(
-                allocations, 
-                key=lambda x: x.get('start_date', '')
-            )
+            # Parse each allocation's dates once
+            intervals = self._allocation_intervals(allocations)
             
             total_hours = sum(a['allocation_hours'] for a in allocations)
             available_hours = self._calculate_available_hours(
-                resource, start_date, end_date
+                resource, start_date, end_date, calendar.for_record(resource)
             )
             
             utilization_percentage = (
@@ -299,18 +320,21 @@ class ProjectManager:
             )
             
             # Check for conflicts (overlapping assignments)
-            for i in range(len(sorted_allocations)):
-                for j in range(i + 1, len(sorted_allocations)):
-                    if self._check_overlap(sorted_allocations[i], sorted_allocations[j]):
-                        conflicts.append({
-                            'resource_id': resource_id,
-                            'resource_name': resource_name,
-                            'task1': sorted_allocations[i]['task_name'],
-                            'task2': sorted_allocations[j]['task_name'],
-                            'overlap_period': self._get_overlap_period(
-                                sorted_allocations[i], sorted_allocations[j]
-                            )
-                        })
+            for first, second, overlap_start, overlap_end in self._overlapping_intervals(intervals):
+                conflicts.append({
+                    'resource_id': resource_id,
+                    'resource_name': resource_name,
+                    'task1': first['task_name'],
+                    'task2': second['task_name'],
+                    'overlap_period': {
+                        'start': overlap_start.isoformat(),
+                        'end': overlap_end.isoformat(),
+                        'days': (overlap_end - overlap_start).days + 1
+                    }
+                })
+            
+            daily_load = self._daily_load(intervals)
+            peak_day = max(daily_load, key=daily_load.get) if daily_load else None
             
             utilization_report[resource_id] = {
                 'name': resource_name,
@@ -318,7 +342,9 @@ class ProjectManager:
                 'allocated_hours': total_hours,
                 'available_hours': available_hours,
                 'tasks': allocations,
-                'is_overallocated': utilization_percentage > 100
+                'is_overallocated': utilization_percentage > 100,
+                'daily_load': daily_load,
+                'peak_load': {'date': peak_day, 'hours': daily_load[peak_day]} if peak_day else None
             }
         
         return {
@@ -338,11 +364,12 @@ class ProjectManager:
     
     def _calculate_available_hours(self, resource: Dict, 
                                   start_date: Optional[str], 
-                                  end_date: Optional[str]) -> float:
-        """Calculate available working hours for a resource in a period"""
+                                  end_date: Optional[str],
+                                  calendar: Optional[WorkingCalendar] = None) -> float:
+        """Calculate available working hours for a resource in a period (both ends included)"""
         allocation_percentage = resource.get('allocation_percentage', 100)
         
-        # Default to 8 hours per day, 5 days per week
+        # Default to 8 hours per working day
         hours_per_day = 8 * (allocation_percentage / 100)
         
         if not start_date or not end_date:
@@ -350,81 +377,81 @@ class ProjectManager:
             start_date = resource.get('start_date')
             end_date = resource.get('end_date')
         
-        if start_date and end_date:
-            try:
-                start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-                end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-                
-                # Calculate working days (excluding weekends)
-                total_days = (end - start).days + 1
-                weeks = total_days // 7
-                remaining_days = total_days % 7
-                
-                working_days = weeks * 5
-                
-                # Add remaining days (excluding weekends)
-                for i in range(remaining_days):
-                    day = start + timedelta(days=weeks * 7 + i)
-                    if day.weekday() < 5:  # Monday = 0, Friday = 4
-                        working_days += 1
-                
-                return working_days * hours_per_day
-            except:
-                pass
+        start = _parse_datetime(start_date)
+        end = _parse_datetime(end_date)
+        if start and end:
+            working_days = (calendar or self.calendar).working_days(start, end + timedelta(days=1))
+            return working_days * hours_per_day
         
         # Default to 160 hours per month
         return 160 * (allocation_percentage / 100)
     
-    def _check_overlap(self, alloc1: Dict, alloc2: Dict) -> bool:
-        """Check if two allocations overlap in time"""
-        start1 = alloc1.get('start_date')
-        end1 = alloc1.get('end_date')
-        start2 = alloc2.get('start_date')
-        end2 = alloc2.get('end_date')
-        
-        if not all([start1, end1, start2, end2]):
-            return False
-        
-        try:
-            s1 = datetime.fromisoformat(start1.replace('Z', '+00:00'))
-            e1 = datetime.fromisoformat(end1.replace('Z', '+00:00'))
-            s2 = datetime.fromisoformat(start2.replace('Z', '+00:00'))
-            e2 = datetime.fromisoformat(end2.replace('Z', '+00:00'))
-            
-            return not (e1 < s2 or e2 < s1)
-        except:
-            return False
+    @staticmethod
+    def _allocation_intervals(allocations: List[Dict]) -> List[Tuple[datetime, datetime, int, Dict]]:
+        """(start, end, position, allocation) of the dated allocations, sorted by start"""
+        intervals = []
+        for position, allocation in enumerate(allocations):
+            start = _parse_datetime(allocation.get('start_date'))
+            end = _parse_datetime(allocation.get('end_date'))
+            # Allocations without (valid) dates can't conflict
+            if start is not None and end is not None and start <= end:
+                intervals.append((start, end, position, allocation))
+        intervals.sort(key=lambda interval: (interval[0], interval[2]))
+        return intervals
     
-    def _get_overlap_period(self, alloc1: Dict, alloc2: Dict) -> Dict:
-        """Get the overlapping period between two allocations"""
-        start1 = alloc1.get('start_date')
-        end1 = alloc1.get('end_date')
-        start2 = alloc2.get('start_date')
-        end2 = alloc2.get('end_date')
-        
-        if not all([start1, end1, start2, end2]):
-            return {}
+    @staticmethod
+    def _overlapping_intervals(intervals: List[Tuple[datetime, datetime, int, Dict]]):
+        """
+        Sweep line over intervals sorted by start: yield (first, second,
+        overlap start, overlap end) for every overlapping pair, in
+        O(k log k + overlaps)
         
-        try:
-            s1 = datetime.fromisoformat(start1.replace('Z', '+00:00'))
-            e1 = datetime.fromisoformat(end1.replace('Z', '+00:00'))
-            s2 = datetime.fromisoformat(start2.replace('Z', '+00:00'))
-            e2 = datetime.fromisoformat(end2.replace('Z', '+00:00'))
-            
-            overlap_start = max(s1, s2)
-            overlap_end = min(e1, e2)
-            
-            if overlap_start <= overlap_end:
-                return {
-                    'start': overlap_start.isoformat(),
-                    'end': overlap_end.isoformat(),
-                    'days': (overlap_end - overlap_start).days + 1
-                }
-        except:
-            pass
+        Intervals are closed, so one ending the day another starts overlaps
+        it. Pairs come out ordered by the earlier allocation, then the later.
+        """
+        # Intervals still open at the current start, as a heap by end
+        active = []
+        pairs = []
+        for index, (start, end, _, allocation) in enumerate(intervals):
+            while active and active[0][0] < start:
+                heapq.heappop(active)
+            # Every open interval started no later than this one and ends at or after its start
+            for other_end, other_index in active:
+                pairs.append((other_index, index, start, min(end, other_end)))
+            heapq.heappush(active, (end, index))
+        pairs.sort(key=lambda pair: (pair[0], pair[1]))
+        for first, second, overlap_start, overlap_end in pairs:
+            yield intervals[first][3], intervals[second][3], overlap_start, overlap_end
+    
+    @staticmethod
+    def _daily_load(intervals: List[Tuple[datetime, datetime, int, Dict]]) -> Dict[str, float]:
+        """
+        Allocated hours per calendar day, each allocation spread evenly over its days
         
-        return {}
+        Built from +rate / -rate events at the day an allocation starts and
+        the day after it ends, so overlapping allocations add up without
+        comparing them.
+        """
+        changes = defaultdict(float)
+        for start, end, _, allocation in intervals:
+            days = (end.date() - start.date()).days + 1
+            rate = (allocation.get('allocation_hours') or 0) / days
+            changes[start.date()] += rate
+            changes[end.date() + timedelta(days=1)] -= rate
+        
+        daily_load = {}
+        load = 0.0
+        days = sorted(changes)
+        for day, next_day in zip(days, days[1:]):
+            load += changes[day]
+            if round(load, 2) > 0:
+                while day < next_day:
+                    daily_load[day.isoformat()] = round(load, 2)
+                    day += timedelta(days=1)
+        return daily_load
     
+    @reads('projects')
+    @memoized('projects')
     def calculate_budget_forecast(self, project_id: str) -> Dict:
         """
         Calculate budget forecast and burn rate for a project
@@ -433,6 +460,9 @@ class ProjectManager:
         if not project:
             return {"error": "Project not found"}
         
+        return self._budget_forecast(project)
+    
+    def _budget_forecast(self, project: Dict) -> Dict:
         budget = project.get('budget', {})
         total_budget = budget.get('total_budget', 0)
         budget_breakdown = budget.get('budget_breakdown', [])
@@ -533,31 +563,78 @@ class ProjectManager:
             'categories': category_analysis
         }
     
+    @reads('projects')
     def get_project(self, project_id: str) -> Optional[Dict]:
         """Get a specific project by ID"""
         projects = self.load_projects()
-        for project in projects:
-            if project['id'] == project_id:
-                return project
-        return None
+        if isinstance(projects, dict):
+            projects = projects.get('projects', [])
+        return KeyedCollection(projects).get(project_id)
     
+    @reads('tasks')
     def get_project_tasks(self, project_id: str) -> List[Dict]:
         """Get all tasks associated with a project"""
-        if os.path.exists(self.tasks_file):
+        if self.task_store is not None:
+            all_tasks = self.task_store.find(project_id=project_id)
+        elif os.path.exists(self.tasks_file):
             with open(self.tasks_file, 'r') as f:
                 all_tasks = json.load(f)
-                project_tasks = []
-                for task in all_tasks:
-                    if task.get('project_id') == project_id:
-                        # Ensure dependencies structure is correct
-                        if 'dependencies' not in task:
-                            task['dependencies'] = []
-                        if 'blocks' not in task:
-                            task['blocks'] = []
-                        project_tasks.append(task)
-                return project_tasks
-        return []
+        else:
+            return []
+        
+        return [self._with_links(task) for task in all_tasks if task.get('project_id') == project_id]
+    
+    @staticmethod
+    def _with_links(task: Dict) -> Dict:
+        # A copy with the dependency lists filled in; the stored task is shared
+        # with other readers and must not be modified here
+        return dict(task, dependencies=task.get('dependencies') or [], blocks=task.get('blocks') or [])
     
+    @reads('projects', 'tasks')
+    @memoized('projects', 'tasks', cache='portfolio_cache')
+    def portfolio_snapshot(self) -> Dict:
+        """
+        Health, budget forecast and resource utilization of every project
+        
+        Projects and tasks are read once and tasks grouped by project in a
+        single pass, instead of every per-project analysis loading them
+        again. The latest snapshot is kept until the data (or the day)
+        changes and is shared by the portfolio endpoints; treat it as
+        read-only. It is built from copies of the tasks and holds no
+        references into the task store, so later writes cannot change a
+        cached snapshot. Returns {project id: {'health', 'budget', 'resources'}}.
+        """
+        projects = self.load_projects()
+        if isinstance(projects, dict):
+            projects = projects.get('projects', [])
+        project_ids = {project['id'] for project in projects}
+
+        if self.task_store is not None:
+            all_tasks = self.task_store.all()
+        elif os.path.exists(self.tasks_file):
+            with open(self.tasks_file, 'r') as f:
+                all_tasks = json.load(f)
+        else:
+            all_tasks = []
+        tasks_by_project = defaultdict(list)
+        for task in all_tasks:
+            # Only tasks of known projects are copied; the rest are never analysed
+            if task.get('project_id') in project_ids:
+                tasks_by_project[task['project_id']].append(self._with_links(task))
+        
+        snapshot = {}
+        for project in projects:
+            tasks = tasks_by_project.get(project['id'], [])
+            budget = self._budget_forecast(project)
+            resources = self._resource_utilization(project, tasks)
+            snapshot[project['id']] = {
+                'health': self._health_score(project, tasks, budget, resources),
+                'budget': budget,
+                'resources': resources
+            }
+        return snapshot
+    
+    @writes('projects')
     def create_project_from_template(self, template_id: str, project_data: Dict) -> Dict:
         """Create a new project from a template"""
         templates = self.load_templates()
@@ -677,6 +754,7 @@ class ProjectManager:
         
         return project
     
+    @reads('projects')
     def load_templates(self) -> List[Dict]:
         """Load project templates"""
         projects = self.load_projects()
@@ -684,6 +762,8 @@ class ProjectManager:
             return projects['templates']
         return []
     
+    @reads('projects', 'tasks')
+    @memoized('projects', 'tasks')
     def calculate_project_health_score(self, project_id: str) -> Dict:
         """
         Calculate overall project health score based on multiple factors
@@ -692,6 +772,12 @@ class ProjectManager:
         if not project:
             return {"error": "Project not found"}
         
+        tasks = self.get_project_tasks(project_id)
+        return self._health_score(project, tasks, self._budget_forecast(project),
+                                  self._resource_utilization(project, tasks))
+    
+    def _health_score(self, project: Dict, tasks: List[Dict],
+                      budget_forecast: Dict, resource_utilization: Dict) -> Dict:
         scores = {}
         weights = {
             'schedule': 0.3,
@@ -703,7 +789,7 @@ class ProjectManager:
         
         # Schedule health - wrap in try/except to handle potential errors
         try:
-            critical_path_data = self.calculate_critical_path(project_id)
+            critical_path_data = self.analyze_critical_path(tasks, self.calendar.for_record(project)) if tasks else {}
         except Exception as e:
             # If critical path calculation fails, use default score
             critical_path_data = {'error': str(e)}
@@ -732,7 +818,6 @@ class ProjectManager:
             scores['schedule'] = 50
         
         # Budget health
-        budget_forecast = self.calculate_budget_forecast(project_id)
         if 'error' not in budget_forecast:
             utilization = budget_forecast['summary']['budget_utilization']
             if utilization < 80:
@@ -747,7 +832,6 @@ class ProjectManager:
             scores['budget'] = 50
         
         # Resource health
-        resource_utilization = self.calculate_resource_utilization(project_id)
         if 'error' not in resource_utilization:
             avg_utilization = resource_utilization['summary']['average_utilization']
             overallocated = resource_utilization['summary']['overallocated_resources']
@@ -829,4 +913,4 @@ class ProjectManager:
         if scores.get('progress', 100) < 30:
             recommendations.append("Project progress is behind schedule - review blockers and accelerate critical tasks")
         
-        return recommendations
\ No newline at end of file
+        return recommendations
@@ -142,7 +142,7 @@ if "%1"=="--debug" (
     echo Starting Waitress production server...
     echo NOTE: Run with --debug flag to use Flask development server
     echo.
-    python -m waitress --port=%PORT% --threads=4 app:app
+    python -m waitress --port=%PORT% --threads=8 app:app
     
     :: Check if Waitress failed to start (not user termination)
     if %errorlevel% neq 0 (
@@ -0,0 +1,189 @@
+"""
+Similarity Index Module
+Inverted index used to find tasks similar to a new one without comparing against every task
+"""
+
+import difflib
+import re
+from typing import Dict, List, Set, Tuple
+
+# Score weights and threshold (unchanged from the original full scan)
+TITLE_WEIGHT = 50
+DESCRIPTION_WEIGHT = 30
+CUSTOMER_WEIGHT = 20
+SIMILARITY_THRESHOLD = 40
+MAX_RESULTS = 5
+
+# Candidate generation limits. Results can differ from the full scan: a task
+# sharing only common grams/words with the query may not become a candidate.
+# bench_similarity_index.py measures top-5 recall against the full scan and
+# fails below its MIN_RECALL; larger limits cost time without reliably
+# raising it.
+POSTINGS_BUDGET = 20000      # Posting entries walked per query, rarest grams first
+MAX_CANDIDATES = 200         # Candidates ranked by overlap that go on to exact scoring
+DESCRIPTION_INDEX_CHARS = 2000
+
+_WORD_RE = re.compile(r'\w{2,}')
+
+
+def title_grams(text: str) -> Set[str]:
+    """Character trigrams of a lowercased, space-padded title"""
+    padded = f' {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def description_words(text: str) -> Set[str]:
+    return set(_WORD_RE.findall(text[:DESCRIPTION_INDEX_CHARS]))
+
+
+class _Entry:
+    __slots__ = ('position', 'title', 'description', 'customer', 'grams', 'words')
+
+    def __init__(self, task: Dict, position: int):
+        self.position = position
+        self.title = (task.get('title') or '').lower()
+        self.description = (task.get('description') or '').lower()
+        self.customer = task.get('customer_name')
+        self.grams = title_grams(self.title) if self.title else set()
+        self.words = description_words(self.description) if self.description else set()
+
+
+class SimilarityIndex:
+    """Near-duplicate search over open tasks (anything not Completed)
+
+    Titles are indexed by character trigram, descriptions by word and tasks
+    by customer, with postings kept current through TaskStore listener
+    callbacks. A query walks the rarest postings first (within
+    POSTINGS_BUDGET) plus every task of the same customer, ranks tasks
+    by an overlap estimate of the final score, and only runs
+    difflib.SequenceMatcher on the best MAX_CANDIDATES - skipping any whose
+    quick_ratio upper bound cannot reach the threshold or the current top 5.
+    Scores use the same 50/30/20 title/description/customer weighting, but
+    the result is approximate: the scan's top 5 is usually, not always,
+    found (see the limits above).
+    """
+
+    def __init__(self, task_store):
+        self.task_store = task_store
+        self._reset()
+        task_store.add_listener(self)
+
+    def _reset(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._gram_postings: Dict[str, Set[str]] = {}
+        self._word_postings: Dict[str, Set[str]] = {}
+        self._customer_postings: Dict[str, Set[str]] = {}
+
+    # TaskStore listener interface
+    def tasks_reset(self):
+        self._reset()
+
+    def task_filed(self, task: Dict, position: int):
+        self.task_removed(task['id'])
+        if task.get('status') == 'Completed':
+            return
+        entry = _Entry(task, position)
+        self._entries[task['id']] = entry
+        for gram in entry.grams:
+            self._gram_postings.setdefault(gram, set()).add(task['id'])
+        for word in entry.words:
+            self._word_postings.setdefault(word, set()).add(task['id'])
+        if entry.customer:
+            self._customer_postings.setdefault(entry.customer, set()).add(task['id'])
+
+    def task_removed(self, task_id: str):
+        entry = self._entries.pop(task_id, None)
+        if entry is None:
+            return
+        for postings, keys in ((self._gram_postings, entry.grams), (self._word_postings, entry.words)):
+            for key in keys:
+                ids = postings.get(key)
+                if ids is not None:
+                    ids.discard(task_id)
+                    if not ids:
+                        del postings[key]
+        customer_ids = self._customer_postings.get(entry.customer)
+        if customer_ids is not None:
+            customer_ids.discard(task_id)
+            if not customer_ids:
+                del self._customer_postings[entry.customer]
+
+    # Queries
+    def _overlaps(self, grams: Set[str], words: Set[str]) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Count shared title grams and description words per task, rarest first"""
+        keys = [(len(self._gram_postings[g]), 0, g) for g in grams if g in self._gram_postings]
+        keys += [(len(self._word_postings[w]), 1, w) for w in words if w in self._word_postings]
+        keys.sort()
+
+        gram_hits: Dict[str, int] = {}
+        word_hits: Dict[str, int] = {}
+        walked = 0
+        for size, kind, key in keys:
+            if walked and walked + size > POSTINGS_BUDGET:
+                break
+            walked += size
+            hits = gram_hits if kind == 0 else word_hits
+            for task_id in (self._gram_postings[key] if kind == 0 else self._word_postings[key]):
+                hits[task_id] = hits.get(task_id, 0) + 1
+        return gram_hits, word_hits
+
+    def find_similar(self, title: str, description: str = '', customer: str = '') -> List[Dict]:
+        """Top similar open tasks as [{'task': ..., 'score': ...}], best first"""
+        title = (title or '').lower()
+        description = (description or '').lower()
+        grams = title_grams(title) if title else set()
+        words = description_words(description) if description else set()
+        gram_hits, word_hits = self._overlaps(grams, words)
+        # A customer match is worth a flat CUSTOMER_WEIGHT, so those tasks are always candidates
+        same_customer = self._customer_postings.get(customer, set()) if customer else set()
+
+        # Rank by an estimate of the score: Dice overlap in place of each ratio
+        estimates = []
+        for task_id in set(gram_hits) | set(word_hits) | same_customer:
+            entry = self._entries[task_id]
+            estimate = 0.0
+            if grams and entry.grams:
+                estimate += TITLE_WEIGHT * 2 * gram_hits.get(task_id, 0) / (len(grams) + len(entry.grams))
+            if words and entry.words:
+                estimate += DESCRIPTION_WEIGHT * 2 * word_hits.get(task_id, 0) / (len(words) + len(entry.words))
+            if task_id in same_customer:
+                estimate += CUSTOMER_WEIGHT
+            estimates.append((-estimate, entry.position, task_id))
+        estimates.sort()
+
+        # Same argument order as the original scan: new task first, existing second
+        title_matcher = difflib.SequenceMatcher(None, title)
+        description_matcher = difflib.SequenceMatcher(None, description)
+        results = []
+        fifth_best = None
+        for _, position, task_id in estimates[:MAX_CANDIDATES]:
+            entry = self._entries[task_id]
+            use_title = bool(entry.title)
+            use_description = bool(description and entry.description)
+            if use_title:
+                title_matcher.set_seq2(entry.title)
+            if use_description:
+                description_matcher.set_seq2(entry.description)
+
+            # quick_ratio() is an upper bound on ratio() and much cheaper
+            score = CUSTOMER_WEIGHT if customer and entry.customer == customer else 0
+            bound = (score
+                     + (title_matcher.quick_ratio() * TITLE_WEIGHT if use_title else 0)
+                     + (description_matcher.quick_ratio() * DESCRIPTION_WEIGHT if use_description else 0))
+            if bound <= SIMILARITY_THRESHOLD or (fifth_best is not None and bound < fifth_best):
+                continue
+
+            if use_title:
+                score += title_matcher.ratio() * TITLE_WEIGHT
+            if use_description:
+                score += description_matcher.ratio() * DESCRIPTION_WEIGHT
+            if score > SIMILARITY_THRESHOLD:
+                results.append((-score, position, task_id, score))
+                if len(results) >= MAX_RESULTS:
+                    fifth_best = sorted(results)[MAX_RESULTS - 1][3]
+
+        results.sort()
+        return [
+            {'task': self.task_store.get(task_id), 'score': score}
+            for _, _, task_id, score in results[:MAX_RESULTS]
+        ]
@@ -128,7 +128,12 @@ function updateNotificationButton() {
 }
 
 function startNotificationChecking() {
-    // Start checking for notifications every 30 seconds
+    if (window.liveEvents && liveEvents.supported) {
+        // Pushed by the server on connect and whenever a task becomes due soon or overdue
+        liveEvents.on('notifications', handleNotificationData);
+        return;
+    }
+    // No EventSource support - fall back to checking every 30 seconds
     setInterval(checkBrowserNotifications, 30000);
     // Also check immediately
     checkBrowserNotifications();
@@ -143,7 +148,16 @@ async function checkBrowserNotifications() {
             console.error('Notification check failed:', response.status, response.statusText);
             return;
         }
-        const data = await response.json();
+        handleNotificationData(await response.json());
+    } catch (error) {
+        console.error('Error checking browser notifications:', error);
+    }
+}
+
+function handleNotificationData(data) {
+    if (Notification.permission !== 'granted') return;
+    
+    try {
         console.log('Notification check:', data);  // Debug log
         
         // Check for new overdue tasks
@@ -194,7 +208,7 @@ async function checkBrowserNotifications() {
             data.dueToday.some(t => t.id === id)));
             
     } catch (error) {
-        console.error('Error checking browser notifications:', error);
+        console.error('Error handling browser notifications:', error);
     }
 }
 
@@ -234,6 +248,15 @@ function showBrowserNotification(title, body, taskId) {
 document.addEventListener('DOMContentLoaded', function() {
     loadDashboard();
     
+    // Refresh when tasks or objectives change (in this or any other tab)
+    if (window.liveEvents) {
+        liveEvents.on('change', (event) => {
+            if (event.collection === 'tasks' || event.collection === 'objectives') {
+                loadDashboard();
+            }
+        });
+    }
+    
     // Check for API key and setup AI features
     checkApiKeyAndSetupAI();
     
@@ -249,10 +272,26 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 });
 
+// The compact summary lists task ids per section plus one table of the tasks
+function expandSummary(summary) {
+    const lookup = ids => (ids || []).map(id => summary.tasks[id]);
+    const byCustomer = {};
+    Object.entries(summary.by_customer || {}).forEach(([customer, ids]) => {
+        byCustomer[customer] = lookup(ids);
+    });
+    return {
+        ...summary,
+        overdue_tasks: lookup(summary.overdue_tasks),
+        urgent: lookup(summary.urgent),
+        upcoming: lookup(summary.upcoming),
+        by_customer: byCustomer
+    };
+}
+
 async function loadDashboard() {
     try {
-        const response = await fetch('/api/tasks/summary');
-        const summary = await response.json();
+        const response = await fetch('/api/tasks/summary?format=compact');
+        const summary = expandSummary(await response.json());
         
         // Fetch projects to count open ones (Active, Planning, On Hold - not Completed)
         const projectsResponse = await fetch('/api/projects');
@@ -1,9 +1,13 @@
 let allDeals = [];
 let currentDealId = null;
+let editingDeal = null; // Deal as loaded into the edit form, to send only changed fields
+let editingDealEtag = null; // Its version, sent as If-Match so concurrent edits are caught
 let currentUser = null;
 let dealSummaryEditor = null; // SimpleEditor instance
 let noteEditor = null; // SimpleEditor instance
 let autoSyncInterval = null;
+let autoSyncIntervalMs = null;
+let lastSyncEventAt = 0;
 let hiddenDeals = [];
 let dealConfig = {
     dealCustomerTypes: ['New Customer', 'Existing Customer'],
@@ -29,6 +33,18 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeSyncUI();
     startAutoSync();
     
+    // Pushed by the server: deal edits from any tab and completed syncs
+    if (window.liveEvents) {
+        liveEvents.on('change', (event) => {
+            if (event.collection === 'deals') {
+                loadDeals();
+            }
+        });
+        liveEvents.on('sync', () => {
+            lastSyncEventAt = Date.now();
+        });
+    }
+    
     // Listen for configuration updates
     window.addEventListener('configUpdated', loadConfiguration);
     
@@ -760,6 +776,14 @@ async function editDeal(dealId) {
         return;
     }
     
+    editingDeal = deal;
+    editingDealEtag = null;
+    fetch(`/api/deals/${dealId}`).then(response => {
+        if (response.ok && editingDeal === deal) {
+            editingDealEtag = response.headers.get('ETag');
+        }
+    }).catch(() => {});
+    
     // Re-enable all form fields for editing
     const formFields = document.querySelectorAll('#dealForm input, #dealForm select, #dealForm textarea');
     formFields.forEach(field => field.disabled = false);
@@ -998,6 +1022,22 @@ function escapeHtml(text) {
     return div.innerHTML;
 }
 
+// Merge patch with the form fields that differ from the deal as loaded
+function dealPatch(original, dealData) {
+    const patch = {};
+    Object.entries(dealData).forEach(([field, value]) => {
+        if ((original[field] ?? '') !== value) {
+            patch[field] = value;
+        }
+    });
+    // A deal that is no longer Won loses its win date (null removes a field)
+    if (dealData.dealStatus !== 'Won' && original.date_won) {
+        patch.date_won = null;
+        patch.financial_year = null;
+    }
+    return patch;
+}
+
 async function saveDeal() {
     // Get HTML content from Quill editor
     const dealSummaryContent = dealSummaryEditor ? dealSummaryEditor.getContent() : '';
@@ -1029,7 +1069,21 @@ async function saveDeal() {
     
     try {
         let response;
-        if (currentDealId) {
+        if (currentDealId && editingDeal && editingDeal.id === currentDealId) {
+            // Update existing deal - only the fields edited in the form
+            const headers = { 'Content-Type': 'application/merge-patch+json' };
+            if (editingDealEtag) headers['If-Match'] = editingDealEtag;
+            response = await fetch(`/api/deals/${currentDealId}`, {
+                method: 'PATCH',
+                headers,
+                body: JSON.stringify(dealPatch(editingDeal, dealData))
+            });
+            if (response.status === 412) {
+                showNotification('This deal was changed by someone else. Reopen it to see the latest version.', 'error');
+                loadDeals();
+                return;
+            }
+        } else if (currentDealId) {
             // Update existing deal
             response = await fetch(`/api/deals/${currentDealId}`, {
                 method: 'PUT',
@@ -1317,6 +1371,7 @@ async function startAutoSync() {
         
         if (config.sync_enabled && config.sync_settings?.auto_sync_interval) {
             const intervalMs = config.sync_settings.auto_sync_interval * 1000; // Convert seconds to milliseconds
+            autoSyncIntervalMs = intervalMs;
             
             console.log(`Starting auto-sync with interval: ${config.sync_settings.auto_sync_interval} seconds`);
             
@@ -1337,6 +1392,11 @@ async function startAutoSync() {
 }
 
 async function performAutoSync() {
+    // Another tab (or a manual sync) finished one recently - its sync event already reloaded us
+    if (autoSyncIntervalMs && Date.now() - lastSyncEventAt < autoSyncIntervalMs / 2) {
+        console.log('Skipping auto-sync, a sync just completed');
+        return;
+    }
     try {
         console.log('Performing auto-sync...');
         const response = await fetch('/api/sync/auto', {
@@ -144,6 +144,23 @@ function hideSimilarTasksWarning() {
     document.getElementById('similarTasksWarning').style.display = 'none';
 }
 
+// Task lists don't carry comments and history; fetch them from the task's detail view
+async function loadTaskActivity(taskId) {
+    const task = allTasks.find(t => t.id === taskId);
+    if (!task) return null;
+    try {
+        const response = await fetch(`/api/tasks/${taskId}`);
+        if (response.ok) {
+            const detail = await response.json();
+            task.comments = detail.comments || [];
+            task.history = detail.history || [];
+        }
+    } catch (error) {
+        console.error('Error loading task activity:', error);
+    }
+    return task;
+}
+
 // Comments System
 function loadComments(taskId) {
     const container = document.getElementById('commentsContainer');
@@ -237,6 +254,7 @@ async function addComment(taskId, text) {
         if (response.ok) {
             // Reload comments
             await loadTasks();
+            await loadTaskActivity(taskId);
             loadComments(taskId);
             
             // Clear comment input
@@ -762,10 +780,11 @@ async function deleteComment(taskId, commentIndex) {
             const task = allTasks.find(t => t.id === taskId);
             if (task && task.comments) {
                 task.comments.splice(commentIndex, 1);
+                task.comment_count = task.comments.length;
             }
             
             // Update comment count badge
-            const commentCount = (task?.comments || []).length;
+            const commentCount = task?.comment_count || 0;
             document.getElementById('commentCount').textContent = commentCount > 0 ? commentCount : '';
             
             // Reload comments display
@@ -780,6 +799,7 @@ async function deleteComment(taskId, commentIndex) {
 // Export functions for use in main tasks.js
 window.enhancedFeatures = {
     loadTemplates,
+    loadTaskActivity,
     populateTemplateSelector,
     applyTemplate,
     checkSimilarTasks,
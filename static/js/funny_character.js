@@ -2,6 +2,7 @@
 let characterData = null;
 let characterTimer = null;
 let overdueCheckTimer = null;
+let overdueEventsSubscribed = false;
 let lastShownCommentId = null;
 let characterEnabled = true;
 let shownComments = [];
@@ -948,8 +949,25 @@ async function checkForOverdueTasks() {
         if (!response.ok) return;
         
         const data = await response.json();
-        const overdueTasks = data.overdue_tasks || [];
-        
+        handleOverdueTasks(data.overdue_tasks || []);
+    } catch (error) {
+        console.log('Error checking overdue tasks:', error);
+    }
+}
+
+// Overdue tasks pushed by the server (notification-check payload)
+function handleOverdueNotifications(data) {
+    if (!characterEnabled || isCharacterVisible) return;
+    
+    // Oldest first, like the summary's overdue list
+    const overdueTasks = [...(data.overdue || [])].sort(
+        (a, b) => new Date(a.follow_up_date) - new Date(b.follow_up_date)
+    );
+    handleOverdueTasks(overdueTasks);
+}
+
+function handleOverdueTasks(overdueTasks) {
+    try {
         if (overdueTasks.length === 0) {
             // Clear notified tasks if no overdue tasks
             notifiedTasks.clear();
@@ -1023,6 +1041,17 @@ function startOverdueTaskChecker() {
         clearInterval(overdueCheckTimer);
     }
     
+    if (window.liveEvents && liveEvents.supported) {
+        // The server pushes the overdue list as tasks become overdue
+        if (!overdueEventsSubscribed) {
+            overdueEventsSubscribed = true;
+            setTimeout(() => {
+                liveEvents.on('notifications', handleOverdueNotifications, { replay: true });
+            }, 10000); // Wait 10 seconds after init
+        }
+        return;
+    }
+    
     // Check immediately on start
     setTimeout(() => {
         checkForOverdueTasks();
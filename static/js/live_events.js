@@ -0,0 +1,122 @@
+// Live Events - one shared server-sent event stream (/api/events) per page
+//
+// Pages subscribe with liveEvents.on(type, handler) instead of polling:
+//   change        {collection, version}   - a collection changed
+//   notifications {overdue, dueSoon, dueToday} - sent on connect and on due-date transitions
+//   sync          {source, report}        - a deal sync finished
+// The browser reconnects the stream by itself if it drops. Pass {replay: true}
+// to also get the last event of that type received before subscribing.
+//
+// The server only keeps a few streams open (each holds one of its threads).
+// When it refuses one, change and notifications events are produced by polling
+// instead, and the stream is retried every minute; sync events are not polled.
+
+const liveEvents = (() => {
+    const POLL_INTERVAL_MS = 30000;
+    const STREAM_RETRY_MS = 60000;
+    const handlers = {};
+    const latest = {};
+    let source = null;
+    let pollTimer = null;
+    let versions = null;
+
+    function dispatch(type, data) {
+        latest[type] = data;
+        (handlers[type] || []).forEach(handler => {
+            try {
+                handler(data);
+            } catch (error) {
+                console.error(`Error handling ${type} event:`, error);
+            }
+        });
+    }
+
+    function listen(type) {
+        source.addEventListener(type, (event) => {
+            let data;
+            try {
+                data = JSON.parse(event.data);
+            } catch (error) {
+                console.error('Bad live event payload:', error);
+                return;
+            }
+            dispatch(type, data);
+        });
+    }
+
+    function connect() {
+        if (source || typeof EventSource === 'undefined') return;
+        source = new EventSource('/api/events');
+        Object.keys(handlers).forEach(listen);
+        source.addEventListener('open', stopPolling);
+        source.addEventListener('error', () => {
+            // CLOSED (rather than reconnecting) means the server refused the stream
+            if (source && source.readyState === EventSource.CLOSED) {
+                source = null;
+                startPolling();
+                setTimeout(connect, STREAM_RETRY_MS);
+            }
+        });
+    }
+
+    async function poll() {
+        try {
+            const response = await fetch('/api/events/versions');
+            if (response.ok) {
+                const current = await response.json();
+                if (versions) {
+                    Object.keys(current).forEach(collection => {
+                        if (current[collection] !== versions[collection]) {
+                            dispatch('change', { collection, version: current[collection] });
+                        }
+                    });
+                }
+                versions = current;
+            }
+            if (handlers.notifications) {
+                const notifications = await fetch('/api/tasks/notification-check');
+                if (notifications.ok) {
+                    dispatch('notifications', await notifications.json());
+                }
+            }
+        } catch (error) {
+            console.error('Error polling for live events:', error);
+        }
+    }
+
+    function startPolling() {
+        if (pollTimer) return;
+        poll();
+        pollTimer = setInterval(poll, POLL_INTERVAL_MS);
+    }
+
+    function stopPolling() {
+        if (!pollTimer) return;
+        clearInterval(pollTimer);
+        pollTimer = null;
+        versions = null;
+    }
+
+    return {
+        supported: typeof EventSource !== 'undefined',
+
+        on(type, handler, options = {}) {
+            if (!handlers[type]) {
+                handlers[type] = [];
+                if (source) listen(type);
+            }
+            handlers[type].push(handler);
+            if (pollTimer) {
+                // Polling until the stream can be retried; don't wait for the next round
+                if (type === 'notifications') poll();
+            } else {
+                connect();
+            }
+            if (options.replay && type in latest) {
+                handler(latest[type]);
+            }
+        }
+    };
+})();
+
+window.liveEvents = liveEvents;
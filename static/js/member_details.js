@@ -5,6 +5,9 @@ let allTasks = [];
 let assignedTasks = [];
 let relatedTasks = [];
 
+// Task list views don't need history, comments or descriptions
+const MEMBER_TASKS_URL = '/api/tasks?fields=title,status,priority,customer_name,follow_up_date,assigned_to,assigned_to_id,related_to';
+
 document.addEventListener('DOMContentLoaded', function() {
     // Load member data
     loadMemberData();
@@ -42,7 +45,7 @@ async function loadMemberData() {
         displayMemberInfo();
         
         // Load all tasks
-        const tasksResponse = await fetch('/api/tasks');
+        const tasksResponse = await fetch(MEMBER_TASKS_URL);
         if (!tasksResponse.ok) {
             throw new Error('Failed to load tasks');
         }
@@ -438,7 +441,7 @@ async function saveTask() {
 async function reloadTasks() {
     try {
         // Reload all tasks
-        const tasksResponse = await fetch('/api/tasks');
+        const tasksResponse = await fetch(MEMBER_TASKS_URL);
         if (!tasksResponse.ok) {
             throw new Error('Failed to reload tasks');
         }
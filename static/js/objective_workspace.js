@@ -316,20 +316,13 @@ async function removeTaskFromObjective(taskId) {
     }
     
     try {
-        // Get the task
-        const taskResponse = await fetch(`/api/tasks/${taskId}`);
-        const task = await taskResponse.json();
-        
-        // Remove objective association
-        delete task.topic_id;
-        
-        // Update the task
+        // Remove objective association (null deletes the field)
         const updateResponse = await fetch(`/api/tasks/${taskId}`, {
-            method: 'PUT',
+            method: 'PATCH',
             headers: {
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/merge-patch+json'
             },
-            body: JSON.stringify(task)
+            body: JSON.stringify({ topic_id: null })
         });
         
         if (updateResponse.ok) {
@@ -1890,8 +1890,8 @@ class ProjectManager {
     async updateTaskDates(taskId, start, end) {
         try {
             const response = await fetch(`/api/tasks/${taskId}`, {
-                method: 'PUT',
-                headers: { 'Content-Type': 'application/json' },
+                method: 'PATCH',
+                headers: { 'Content-Type': 'application/merge-patch+json' },
                 body: JSON.stringify({
                     start_date: start.toISOString().split('T')[0],
                     end_date: end.toISOString().split('T')[0],
@@ -1915,8 +1915,8 @@ class ProjectManager {
     async updateTaskProgress(taskId, progress) {
         try {
             const response = await fetch(`/api/tasks/${taskId}`, {
-                method: 'PUT',
-                headers: { 'Content-Type': 'application/json' },
+                method: 'PATCH',
+                headers: { 'Content-Type': 'application/merge-patch+json' },
                 body: JSON.stringify({
                     gantt_properties: { progress: progress }
                 })
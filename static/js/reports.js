@@ -22,7 +22,8 @@ document.addEventListener('DOMContentLoaded', function() {
 async function loadInitialData() {
     try {
         // Load tasks
-        const tasksResponse = await fetch('/api/tasks');
+        // Reports list comments, which task lists leave out by default
+        const tasksResponse = await fetch('/api/tasks?include=activity');
         allTasks = await tasksResponse.json();
         
         // Load objectives
@@ -323,6 +323,10 @@ function getTimeAgeClass(dateString) {
 }
 
 function getLastUpdateTime(task) {
+    // The server keeps the time of the last update (history is only loaded for the open task)
+    if (task.last_updated) {
+        return task.last_updated;
+    }
     // Get the last update from history, excluding creation
     if (task.history && task.history.length > 1) {
         // Get the most recent history entry that's not the creation
@@ -1190,56 +1194,44 @@ function copyMessage() {
     }
 }
 
-async function exportTasks() {
-    try {
-        const response = await fetch('/api/export');
-        const tasks = await response.json();
-        
-        const dataStr = JSON.stringify(tasks, null, 2);
-        const dataUri = 'data:application/json;charset=utf-8,' + encodeURIComponent(dataStr);
-        
-        const exportFileDefaultName = `tasks_export_${new Date().toISOString().split('T')[0]}.json`;
-        
-        const linkElement = document.createElement('a');
-        linkElement.setAttribute('href', dataUri);
-        linkElement.setAttribute('download', exportFileDefaultName);
-        linkElement.click();
-    } catch (error) {
-        console.error('Error exporting tasks:', error);
-    }
+function exportTasks() {
+    // Streamed by the server as NDJSON (one task per line) straight to a file
+    const linkElement = document.createElement('a');
+    linkElement.setAttribute('href', '/api/export?format=ndjson');
+    linkElement.setAttribute('download', `tasks_export_${new Date().toISOString().split('T')[0]}.ndjson`);
+    linkElement.click();
 }
 
 async function importTasks(e) {
     const file = e.target.files[0];
     if (!file) return;
     
-    const reader = new FileReader();
-    reader.onload = async function(event) {
-        try {
-            const tasks = JSON.parse(event.target.result);
-            
-            const response = await fetch('/api/import', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify(tasks)
-            });
-            
-            const result = await response.json();
-            
-            if (response.ok) {
-                alert(`Successfully imported ${result.imported} tasks`);
-                loadTasks();
-            } else {
-                alert(`Error importing: ${result.error}`);
-            }
-        } catch (error) {
-            alert('Error reading file: ' + error.message);
+    // The file is uploaded as it is; the server parses NDJSON line by line
+    const isNdjson = /\.(ndjson|jsonl)$/i.test(file.name);
+    try {
+        const response = await fetch('/api/import', {
+            method: 'POST',
+            headers: {
+                'Content-Type': isNdjson ? 'application/x-ndjson' : 'application/json'
+            },
+            body: file
+        });
+        
+        const result = await response.json();
+        
+        if (response.ok) {
+            let message = `Successfully imported ${result.imported} tasks`;
+            if (result.skipped) message += ` (${result.skipped} already present)`;
+            if (result.failed) message += `\n${result.failed} invalid line(s) were skipped`;
+            alert(message);
+            loadTasks();
+        } else {
+            alert(`Error importing: ${result.error}`);
         }
-    };
+    } catch (error) {
+        alert('Error reading file: ' + error.message);
+    }
     
-    reader.readAsText(file);
     e.target.value = '';
 }
 
@@ -1363,13 +1355,13 @@ async function handleDrop(e) {
             showUpdateIndicator(draggedElement);
             
             try {
-                // Send update to server
+                // Send only the changed field to the server
                 const response = await fetch(`/api/tasks/${draggedTask.id}`, {
-                    method: 'PUT',
+                    method: 'PATCH',
                     headers: {
-                        'Content-Type': 'application/json'
+                        'Content-Type': 'application/merge-patch+json'
                     },
-                    body: JSON.stringify(draggedTask)
+                    body: JSON.stringify({ [groupBy]: newGroupValue })
                 });
                 
                 if (response.ok) {
@@ -1768,7 +1760,7 @@ function htmlToPlainText(html) {
 
 // Copy task to clipboard with all details
 async function copyTaskToClipboard(taskId) {
-    const task = allTasks.find(t => t.id === taskId);
+    const task = await window.enhancedFeatures.loadTaskActivity(taskId);
     if (!task) return;
     
     // Format task details as structured text
@@ -653,7 +653,7 @@ function clearEnhancedData() {
     }
 }
 
-function loadEnhancedTaskData(taskId) {
+async function loadEnhancedTaskData(taskId) {
     console.log('loadEnhancedTaskData called with taskId:', taskId, new Date().toISOString());
     console.trace('Called from:');
     
@@ -681,7 +681,7 @@ function loadEnhancedTaskData(taskId) {
         return;
     }
     
-    const task = allTasks.find(t => t.id === taskId);
+    const task = await window.enhancedFeatures.loadTaskActivity(taskId);
     if (!task) {
         console.log('Task not found, clearing enhanced data');
         clearEnhancedData();
@@ -705,7 +705,7 @@ function loadEnhancedTaskData(taskId) {
     // Load comments - only if we're still loading
     if (isLoadingEnhancedData) {
         window.enhancedFeatures.loadComments(taskId);
-        const commentCount = (task.comments || []).length;
+        const commentCount = task.comment_count ?? (task.comments || []).length;
         document.getElementById('commentCount').textContent = commentCount > 0 ? commentCount : '';
     }
     
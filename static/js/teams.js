@@ -92,7 +92,8 @@ async function loadMembers() {
 
 async function loadTasks() {
     try {
-        const response = await fetch('/api/tasks');
+        // Only the fields used for member workload counts
+        const response = await fetch('/api/tasks?fields=assigned_to,status');
         tasks = await response.json();
         updateStats();
         // Re-render members if they're already displayed to update task counts
@@ -0,0 +1,660 @@
+"""
+Storage Module
+Pluggable persistence backends for the list-shaped data collections
+(tasks, deals, meetings, projects, objectives)
+
+JSON files remain the default. The SQLite backend keeps one row per record
+with the full document in a JSON1 column plus indexed columns for the
+fields the app filters on. Run ``python storage.py migrate`` to import the
+existing data/*.json files and switch the app over.
+
+The journal backend keeps the JSON files but appends task and deal changes
+to an NDJSON operation log, compacting it into the JSON file in the
+background. It needs no migration.
+"""
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from change_feed import ChangeFeed
+from persistence import atomic_write_text, dump_json
+
+logger = logging.getLogger(__name__)
+
+COLLECTIONS = ['tasks', 'deals', 'meetings', 'projects', 'objectives']
+
+# Data file for each collection (objectives keep their historical file name)
+COLLECTION_FILES = {
+    'tasks': 'tasks.json',
+    'deals': 'deals.json',
+    'meetings': 'meetings.json',
+    'projects': 'projects.json',
+    'objectives': 'objectives.json'
+}
+
+# Indexed columns and the record field each one is read from
+INDEXED_FIELDS = {
+    'status': 'status',
+    'project_id': 'project_id',
+    'topic_id': 'topic_id',
+    'customer_name': 'customer_name',
+    'assigned_to_id': 'assigned_to_id',
+    'follow_up_date': 'follow_up_date'
+}
+
+# Deals use their own field names for the same concepts
+FIELD_OVERRIDES = {
+    'deals': {'status': 'dealStatus', 'customer_name': 'customerName'}
+}
+
+SQLITE_FILE = 'taskmanager.db'
+
+# Collections the journal backend logs incrementally, and when it compacts them
+JOURNALED_COLLECTIONS = ('tasks', 'deals')
+COMPACT_AFTER_OPS = 1000
+COMPACT_AFTER_BYTES = 4 * 1024 * 1024
+
+
+def record_field(collection: str, column: str) -> str:
+    """Get the record field backing an indexed column"""
+    return FIELD_OVERRIDES.get(collection, {}).get(column, INDEXED_FIELDS.get(column, column))
+
+
+def diff_records(records: List[Dict], fingerprints: Dict[str, int],
+                 changed: Optional[Set[str]] = None) -> Tuple[Dict[str, int], List, List[str]]:
+    """
+    Find the records that differ from what was last stored
+
+    Args:
+        records: The full collection about to be saved
+        fingerprints: Hash of each stored record's document, by id
+        changed: Ids known to have changed since the last save; when given,
+            only those (and new records) are serialized
+
+    Returns:
+        (new fingerprints, [(id, document, record) to write], [ids to delete])
+    """
+    new_fingerprints = {} if changed is None else dict(fingerprints)
+    upserts = []
+    present = set()
+    for record in records:
+        if 'id' not in record:
+            record['id'] = str(uuid.uuid4())
+        record_id = record['id']
+        present.add(record_id)
+        if changed is not None and record_id not in changed and record_id in fingerprints:
+            continue
+        doc = dump_json(record, default=str)
+        fingerprint = hash(doc)
+        new_fingerprints[record_id] = fingerprint
+        if fingerprints.get(record_id) != fingerprint:
+            upserts.append((record_id, doc, record))
+
+    deleted = [record_id for record_id in fingerprints if record_id not in present]
+    for record_id in deleted:
+        new_fingerprints.pop(record_id, None)
+    return new_fingerprints, upserts, deleted
+
+class JsonBackend:
+    """Default backend - one JSON document per collection in the data directory"""
+
+    name = 'json'
+
+    def __init__(self, data_dir: str = 'data', snapshots: int = 0):
+        self.data_dir = data_dir
+        self.snapshots = snapshots
+        # Per-collection change sequences; the instance id keeps versions unique across restarts
+        self.instance = uuid.uuid4().hex[:8]
+        self.changes = ChangeFeed()
+        self._modified: Dict[str, float] = {}
+        self._started = time.time()
+        # Collection -> (_file_state, {id: serialized record}) for get()
+        self._id_maps: Dict[str, Tuple[Tuple, Dict[str, str]]] = {}
+
+    def path(self, collection: str) -> str:
+        return os.path.join(self.data_dir, COLLECTION_FILES.get(collection, f'{collection}.json'))
+
+    def load(self, collection: str, default: Any = None) -> Any:
+        """Load a collection, returning default (an empty list) if it does not exist"""
+        path = self.path(collection)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return [] if default is None else default
+
+    def prepare_save(self, collection: str, data: Any,
+                     changed: Optional[Set[str]] = None) -> Callable[[], None]:
+        """
+        Serialize a collection and return a function that writes it
+
+        Splitting the two lets callers serialize under a lock and do the
+        disk I/O after releasing it. ``changed`` optionally names the ids
+        modified since the last save, for backends that write incrementally.
+        """
+        payload = dump_json(data, default=str)
+        path = self.path(collection)
+        return lambda: atomic_write_text(path, payload, snapshots=self.snapshots)
+
+    def save(self, collection: str, data: Any):
+        self.prepare_save(collection, data)()
+        self.changes.record_save(collection, data)
+        self._modified[collection] = time.time()
+
+    # Change tracking
+    def touch(self, collection: str, upserted: Optional[List[str]] = None,
+              deleted: Optional[List[str]] = None):
+        """
+        Record that a collection changed
+
+        save() does this itself; callers that hold a collection in memory
+        and save it later (TaskStore) call it when the change happens,
+        naming the records involved. Without ids the whole collection is
+        treated as changed.
+        """
+        if upserted is None and deleted is None:
+            self.changes.reset(collection)
+        else:
+            self.changes.record(collection, upserted or (), deleted or ())
+        self._modified[collection] = time.time()
+
+    def version(self, collection: str) -> str:
+        """Opaque token that changes whenever the collection does"""
+        return f'{self.instance}.{self.changes.seq(collection)}'
+
+    def last_modified(self, collection: str) -> float:
+        """Time of the last change (the startup time if none since)"""
+        return self._modified.get(collection, self._started)
+
+    def _file_state(self, collection: str) -> Tuple:
+        """What get()'s id map is valid for: the version, and the file in case it was edited outside the app"""
+        try:
+            stat = os.stat(self.path(collection))
+            return self.version(collection), stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return self.version(collection), None, None
+
+    def get(self, collection: str, record_id: str) -> Optional[Dict]:
+        """
+        Get a single record by id
+
+        The collection is parsed once per change into a map of id to
+        serialized record, so lookups between changes decode one record.
+        Each call returns a fresh copy.
+        """
+        state = self._file_state(collection)
+        cached = self._id_maps.get(collection)
+        if cached is None or cached[0] != state:
+            data = self.load(collection)
+            documents = {}
+            if isinstance(data, list):
+                documents = {r['id']: dump_json(r, default=str) for r in data
+                             if isinstance(r, dict) and 'id' in r}
+            cached = (state, documents)
+            self._id_maps[collection] = cached
+        document = cached[1].get(record_id)
+        return json.loads(document) if document is not None else None
+
+    def close(self):
+        pass
+
+
+class SqliteBackend(JsonBackend):
+    """SQLite backend (WAL mode) with one row per record
+
+    Saving a collection only writes the rows whose documents changed since
+    the last load or save, and deletes rows for records that disappeared.
+    Collections that are not lists (e.g. projects.json in its dict format)
+    are stored whole in the documents table.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, data_dir: str = 'data', snapshots: int = 0, db_file: str = SQLITE_FILE):
+        super().__init__(data_dir, snapshots)
+        self.db_path = os.path.join(data_dir, db_file)
+        os.makedirs(data_dir, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._db_lock = threading.Lock()
+        # Hash of each stored document, used to find the rows a save must touch
+        self._fingerprints: Dict[str, Dict[str, int]] = {}
+        self._positions: Dict[str, Dict[str, int]] = {}
+        self._create_schema()
+
+    def _create_schema(self):
+        columns = ''.join(f',\n                {column} TEXT' for column in INDEXED_FIELDS)
+        with self._db_lock:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS documents (collection TEXT PRIMARY KEY, doc TEXT NOT NULL)'
+            )
+            for collection in COLLECTIONS:
+                self._conn.execute(f'''
+                    CREATE TABLE IF NOT EXISTS {collection} (
+                        id TEXT PRIMARY KEY,
+                        position INTEGER NOT NULL,
+                        doc TEXT NOT NULL{columns}
+                    )''')
+                self._conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS idx_{collection}_position ON {collection}(position)'
+                )
+                for column in INDEXED_FIELDS:
+                    self._conn.execute(
+                        f'CREATE INDEX IF NOT EXISTS idx_{collection}_{column} ON {collection}({column})'
+                    )
+            try:
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_tasks_meeting_id "
+                    "ON tasks(json_extract(doc, '$.meeting_reference.meeting_id'))"
+                )
+            except sqlite3.OperationalError as e:
+                # SQLite built without JSON1 - meeting lookups fall back to a scan
+                logger.warning(f"JSON1 expression index unavailable: {str(e)}")
+
+    def _row_values(self, collection: str, record: Dict) -> List[Any]:
+        values = []
+        for column in INDEXED_FIELDS:
+            value = record.get(record_field(collection, column))
+            values.append(value if value is None or isinstance(value, str) else str(value))
+        return values
+
+    def load(self, collection: str, default: Any = None) -> Any:
+        with self._db_lock:
+            row = self._conn.execute(
+                'SELECT doc FROM documents WHERE collection = ?', (collection,)
+            ).fetchone()
+            if row:
+                self._fingerprints[collection] = {}
+                self._positions[collection] = {}
+                return json.loads(row[0])
+
+            rows = self._conn.execute(
+                f'SELECT id, position, doc FROM {collection} ORDER BY position'
+            ).fetchall()
+
+        if not rows and default is not None:
+            return default
+
+        records = []
+        fingerprints = {}
+        positions = {}
+        for record_id, position, doc in rows:
+            records.append(json.loads(doc))
+            fingerprints[record_id] = hash(doc)
+            positions[record_id] = position
+        self._fingerprints[collection] = fingerprints
+        self._positions[collection] = positions
+        return records
+
+    def prepare_save(self, collection: str, data: Any,
+                     changed: Optional[Set[str]] = None) -> Callable[[], None]:
+        if not isinstance(data, list):
+            payload = dump_json(data, default=str)
+            return lambda: self._commit_document(collection, payload)
+
+        if collection not in self._fingerprints:
+            self.load(collection)
+        old_positions = self._positions.get(collection, {})
+        fingerprints, upserts, deleted = diff_records(
+            data, self._fingerprints.get(collection, {}), changed
+        )
+        upserts = [(record_id, doc, self._row_values(collection, record))
+                   for record_id, doc, record in upserts]
+
+        # Keep stored positions unless the relative order of existing records changed
+        positions = {}
+        last = -1
+        in_order = True
+        for record in data:
+            position = old_positions.get(record['id'])
+            if position is not None:
+                if position <= last:
+                    in_order = False
+                    break
+                last = position
+        if in_order:
+            next_position = max(old_positions.values(), default=-1) + 1
+            for record in data:
+                if record['id'] in old_positions:
+                    positions[record['id']] = old_positions[record['id']]
+                else:
+                    positions[record['id']] = next_position
+                    next_position += 1
+        else:
+            positions = {record['id']: i for i, record in enumerate(data)}
+            changed_ids = {record_id for record_id, _, _ in upserts}
+            upserts.extend(
+                (record['id'], dump_json(record, default=str), self._row_values(collection, record))
+                for record in data if record['id'] not in changed_ids
+            )
+
+        def commit():
+            self._commit_rows(collection, upserts, deleted, positions)
+            self._fingerprints[collection] = fingerprints
+            self._positions[collection] = positions
+
+        return commit
+
+    def _commit_rows(self, collection, upserts, deleted, positions):
+        column_names = ', '.join(INDEXED_FIELDS)
+        placeholders = ', '.join('?' for _ in INDEXED_FIELDS)
+        updates = ', '.join(f'{column} = excluded.{column}' for column in INDEXED_FIELDS)
+        with self._db_lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute('DELETE FROM documents WHERE collection = ?', (collection,))
+                self._conn.executemany(
+                    f'DELETE FROM {collection} WHERE id = ?', [(record_id,) for record_id in deleted]
+                )
+                self._conn.executemany(
+                    f'''INSERT INTO {collection} (id, position, doc, {column_names})
+                        VALUES (?, ?, ?, {placeholders})
+                        ON CONFLICT(id) DO UPDATE SET
+                            position = excluded.position, doc = excluded.doc, {updates}''',
+                    [(record_id, positions[record_id], doc, *values) for record_id, doc, values in upserts]
+                )
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def _commit_document(self, collection, payload):
+        with self._db_lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute(f'DELETE FROM {collection}')
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO documents (collection, doc) VALUES (?, ?)',
+                    (collection, payload)
+                )
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+        self._fingerprints[collection] = {}
+        self._positions[collection] = {}
+
+    def get(self, collection: str, record_id: str) -> Optional[Dict]:
+        with self._db_lock:
+            row = self._conn.execute(
+                f'SELECT doc FROM {collection} WHERE id = ?', (record_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self):
+        with self._db_lock:
+            self._conn.close()
+
+
+class JournalBackend(JsonBackend):
+    """JSON snapshots plus an append-only NDJSON operation log
+
+    Saving a journaled collection appends one line per changed record
+    (``put``), removed record (``del``) or reordering (``order``) to
+    data/<collection>.journal.ndjson, so the bytes written follow the size
+    of the change rather than the size of the collection. A background
+    compactor folds the log into the collection's JSON file once it holds
+    ``compact_ops`` operations or ``compact_bytes`` bytes. Loading replays
+    the log tail over the JSON file.
+
+    Compaction first renames the log aside (``.compacting``) so saves never
+    wait on it; replaying that file again after a crash is harmless because
+    every operation is idempotent.
+    """
+
+    name = 'journal'
+
+    def __init__(self, data_dir: str = 'data', snapshots: int = 0,
+                 collections=JOURNALED_COLLECTIONS,
+                 compact_ops: int = COMPACT_AFTER_OPS,
+                 compact_bytes: int = COMPACT_AFTER_BYTES):
+        super().__init__(data_dir, snapshots)
+        self.collections = set(collections)
+        self.compact_ops = compact_ops
+        self.compact_bytes = compact_bytes
+        self._journal_locks = {collection: threading.Lock() for collection in self.collections}
+        self._fingerprints: Dict[str, Dict[str, int]] = {}
+        self._order: Dict[str, List[str]] = {}
+        self._journal_ops: Dict[str, int] = {}
+        self._journal_bytes: Dict[str, int] = {}
+        self._compact_wanted = threading.Event()
+        self._stopped = False
+
+        self._compactor = threading.Thread(
+            target=self._compact_loop, name='journal-compactor', daemon=True
+        )
+        self._compactor.start()
+        atexit.register(self.close)
+
+    def journal_path(self, collection: str) -> str:
+        return os.path.join(self.data_dir, f'{collection}.journal.ndjson')
+
+    def load(self, collection: str, default: Any = None) -> Any:
+        if collection not in self.collections:
+            return super().load(collection, default)
+
+        journal = self.journal_path(collection)
+        # Held across the whole read so a compaction cannot swap the JSON
+        # file and drop the log it folded in between the two
+        with self._journal_locks[collection]:
+            data = super().load(collection, default)
+            if not isinstance(data, list):
+                return data
+            records = self._keyed(data)
+            if self._replay(journal + '.compacting', records):
+                self._compact_wanted.set()
+            ops = self._replay(journal, records, repair=True)
+            if collection not in self._fingerprints:
+                self._journal_ops[collection] = ops
+                self._journal_bytes[collection] = (
+                    os.path.getsize(journal) if os.path.exists(journal) else 0
+                )
+
+        data = list(records.values())
+        # Saves keep the fingerprints current, so they only need computing once
+        if collection not in self._fingerprints:
+            self._fingerprints[collection] = {
+                record['id']: hash(dump_json(record, default=str)) for record in data
+            }
+            self._order[collection] = list(records)
+        return data
+
+    @staticmethod
+    def _keyed(data: List[Dict]) -> Dict[str, Dict]:
+        records = {}
+        for record in data:
+            if 'id' not in record:
+                record['id'] = str(uuid.uuid4())
+            records[record['id']] = record
+        return records
+
+    def _replay(self, path: str, records: Dict[str, Dict], repair: bool = False) -> int:
+        """Apply a log file to records (id -> record), returning the number of operations"""
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            content = f.read()
+
+        ops = 0
+        offset = 0
+        for line in content.splitlines(keepends=True):
+            if not line.endswith(b'\n'):
+                # Torn final write - drop it so later appends start on a clean line
+                logger.warning(f"Discarding incomplete entry at the end of {path}")
+                if repair:
+                    with open(path, 'r+b') as f:
+                        f.truncate(offset)
+                break
+            offset += len(line)
+            try:
+                op = json.loads(line)
+            except ValueError:
+                logger.error(f"Skipping unreadable entry in {path}")
+                continue
+
+            ops += 1
+            if op['op'] == 'put':
+                records[op['id']] = op['doc']
+            elif op['op'] == 'del':
+                records.pop(op['id'], None)
+            elif op['op'] == 'order':
+                reordered = {record_id: records[record_id] for record_id in op['ids'] if record_id in records}
+                reordered.update(records)
+                records.clear()
+                records.update(reordered)
+        return ops
+
+    def prepare_save(self, collection: str, data: Any,
+                     changed: Optional[Set[str]] = None) -> Callable[[], None]:
+        if collection not in self.collections or not isinstance(data, list):
+            return super().prepare_save(collection, data, changed)
+
+        if collection not in self._fingerprints:
+            self.load(collection)
+        fingerprints, upserts, deleted = diff_records(data, self._fingerprints[collection], changed)
+
+        # Replay appends new records and drops deleted ones; log an explicit
+        # order only when the list was rearranged some other way
+        deleted_ids = set(deleted)
+        known = set(self._order[collection])
+        expected = [record_id for record_id in self._order[collection] if record_id not in deleted_ids]
+        expected.extend(record_id for record_id, _, _ in upserts if record_id not in known)
+        order = [record['id'] for record in data]
+
+        lines = [f'{{"op":"put","id":{json.dumps(record_id)},"doc":{doc}}}\n'
+                 for record_id, doc, _ in upserts]
+        lines.extend(dump_json({'op': 'del', 'id': record_id}) + '\n' for record_id in deleted)
+        if order != expected:
+            lines.append(dump_json({'op': 'order', 'ids': order}) + '\n')
+
+        def commit():
+            if lines:
+                self._append(collection, ''.join(lines), len(lines))
+            self._fingerprints[collection] = fingerprints
+            self._order[collection] = order
+
+        return commit
+
+    def _append(self, collection: str, text: str, ops: int):
+        payload = text.encode('utf-8')
+        with self._journal_locks[collection]:
+            with open(self.journal_path(collection), 'ab') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_ops[collection] = self._journal_ops.get(collection, 0) + ops
+            self._journal_bytes[collection] = self._journal_bytes.get(collection, 0) + len(payload)
+            if (self._journal_ops[collection] >= self.compact_ops
+                    or self._journal_bytes[collection] >= self.compact_bytes):
+                self._compact_wanted.set()
+
+    # Compaction
+    def _compact_loop(self):
+        while not self._stopped:
+            self._compact_wanted.wait()
+            if self._stopped:
+                break
+            self._compact_wanted.clear()
+            for collection in self.collections:
+                if (self._journal_ops.get(collection, 0) >= self.compact_ops
+                        or self._journal_bytes.get(collection, 0) >= self.compact_bytes
+                        or os.path.exists(self.journal_path(collection) + '.compacting')):
+                    try:
+                        self.compact(collection)
+                    except Exception as e:
+                        logger.error(f"Error compacting {collection} journal: {str(e)}")
+
+    def compact(self, collection: str):
+        """Fold the collection's log into its JSON file"""
+        journal = self.journal_path(collection)
+        compacting = journal + '.compacting'
+        with self._journal_locks[collection]:
+            # A leftover file from an interrupted compaction is folded first
+            if not os.path.exists(compacting):
+                if not os.path.exists(journal) or os.path.getsize(journal) == 0:
+                    return
+                os.replace(journal, compacting)
+                self._journal_ops[collection] = 0
+                self._journal_bytes[collection] = 0
+
+        records = self._keyed(JsonBackend.load(self, collection))
+        self._replay(compacting, records)
+        payload = '[' + ','.join(dump_json(record, default=str) for record in records.values()) + ']'
+        atomic_write_text(self.path(collection), payload, snapshots=self.snapshots)
+        with self._journal_locks[collection]:
+            os.remove(compacting)
+
+    def close(self):
+        """Stop the compactor and fold every log into its JSON file"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._compact_wanted.set()
+        self._compactor.join(timeout=5)
+        for collection in self.collections:
+            try:
+                # Twice: a leftover .compacting file is folded before the live log
+                self.compact(collection)
+                self.compact(collection)
+            except Exception as e:
+                logger.error(f"Error compacting {collection} journal: {str(e)}")
+
+
+BACKENDS = {
+    JsonBackend.name: JsonBackend,
+    SqliteBackend.name: SqliteBackend,
+    JournalBackend.name: JournalBackend
+}
+
+
+def create_backend(kind: str = 'json', data_dir: str = 'data', snapshots: int = 0):
+    """Create the storage backend named in settings ('json', 'sqlite' or 'journal')"""
+    backend_class = BACKENDS.get(kind)
+    if backend_class is None:
+        logger.warning(f"Unknown storage backend '{kind}', using JSON files")
+        backend_class = JsonBackend
+    return backend_class(data_dir, snapshots=snapshots)
+
+
+def migrate_json_to_sqlite(data_dir: str = 'data') -> Dict[str, int]:
+    """Import every collection's JSON file into the SQLite database"""
+    source = JsonBackend(data_dir)
+    target = SqliteBackend(data_dir)
+    counts = {}
+    try:
+        for collection in COLLECTIONS:
+            data = source.load(collection)
+            target.save(collection, data)
+            counts[collection] = len(data) if isinstance(data, list) else 1
+    finally:
+        target.close()
+    return counts
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] != 'migrate':
+        print("Usage: python storage.py migrate [data_dir]")
+        sys.exit(1)
+
+    data_dir = sys.argv[2] if len(sys.argv) > 2 else 'data'
+    counts = migrate_json_to_sqlite(data_dir)
+    for collection, count in counts.items():
+        print(f"Imported {count} {collection}")
+
+    # Switch the app over to the database
+    settings_file = os.path.join(data_dir, 'settings.json')
+    settings = {}
+    if os.path.exists(settings_file):
+        with open(settings_file, 'r', encoding='utf-8') as f:
+            settings = json.load(f)
+    settings['storage_backend'] = SqliteBackend.name
+    atomic_write_text(settings_file, dump_json(settings))
+    print(f"Storage backend set to sqlite in {settings_file}")
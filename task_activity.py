@@ -0,0 +1,320 @@
+"""
+Task Activity Module
+Task history and comments kept out of the task documents, in one append-only
+NDJSON log per task (data/task_activity/<task id>.ndjson) written behind a
+buffered queue
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from persistence import atomic_write_text, dump_json
+
+logger = logging.getLogger(__name__)
+
+# Fields moved out of the task documents
+ACTIVITY_FIELDS = ('history', 'comments')
+# Fields of the task documents maintained from the logs
+SUMMARY_FIELDS = ('comment_count', 'last_updated')
+# Task activity kept in memory for detail views
+CACHE_SIZE = 256
+# Comment edits / deletes in a log before it is rewritten as plain appends
+COMPACT_AFTER_CHANGES = 50
+# Seconds the writer lets queued events pile up before appending them
+FLUSH_INTERVAL = 0.5
+
+_SAFE_NAME = re.compile(r'[A-Za-z0-9][A-Za-z0-9_.-]*')
+
+
+class TaskActivityStore:
+    """Per-task history and comment logs, loaded only when a detail view asks
+
+    Registered as a TaskStore listener. Whenever a task is filed carrying
+    ``history`` or ``comments`` lists, those entries are appended to the
+    task's log and the fields are removed from the document, leaving two
+    small summary fields list views use: ``comment_count`` and
+    ``last_updated`` (time of the last history entry after creation).
+    Imports and task edits can therefore keep appending to task['history']
+    and calling task_store.update(). Endpoints that only add activity call
+    record_history() and the comment methods instead, and save just the
+    summary fields, so the task document is not re-filed with the lists.
+
+    Log lines are {"op": "history", "entry": ...}, {"op": "comment",
+    "comment": ...}, {"op": "edit_comment", "index": ..., "text": ...,
+    "edited_at": ...} and {"op": "delete_comment", "index": ...}.
+
+    Events are not written by the request that produces them: they are
+    queued per task, in order, and a writer thread appends each task's
+    queue with one write every ``flush_interval`` seconds (and on exit).
+    Reads replay the queue after the log, so they always see every event.
+    Appends are flushed but not fsynced.
+
+    On startup, tasks still holding the fields (older data files) are
+    migrated and saved without them. If such a task already has a log,
+    a previous migration was interrupted before the tasks were saved, and
+    the inline copy is dropped instead of appended twice. When the whole
+    collection is replaced later, the logs of tasks it no longer has are
+    removed.
+    """
+
+    def __init__(self, directory: str, task_store, cache_size: int = CACHE_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL):
+        self.directory = directory
+        self.task_store = task_store
+        self.cache_size = cache_size
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._cache: 'OrderedDict[str, Tuple[List[Dict], List[Dict]]]' = OrderedDict()
+        # Task id -> events not written yet, in order
+        self._pending: Dict[str, List[Dict]] = {}
+        self._wake = threading.Event()
+        self._stopped = False
+        os.makedirs(directory, exist_ok=True)
+        self._logged = {name[:-len('.ndjson')] for name in os.listdir(directory) if name.endswith('.ndjson')}
+
+        self._migrating = True
+        self._migrated: List[str] = []
+        task_store.add_listener(self)
+        self._migrating = False
+        if self._migrated:
+            logger.info(f"Moved history and comments of {len(self._migrated)} tasks to {directory}")
+            # Logs first, so an interrupted migration leaves nothing only in memory
+            self.flush()
+            task_store.apply([task_store.get(task_id) for task_id in self._migrated])
+            self._migrated = []
+
+        self._writer = threading.Thread(
+            target=self._write_behind_loop, name='task-activity-writer', daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
+    @staticmethod
+    def _name(task_id) -> str:
+        """File name stem for a task; ids that aren't safe file names are hashed"""
+        if isinstance(task_id, str) and _SAFE_NAME.fullmatch(task_id):
+            return task_id
+        return hashlib.sha1(str(task_id).encode('utf-8')).hexdigest()
+
+    def _path(self, task_id) -> str:
+        return os.path.join(self.directory, f'{self._name(task_id)}.ndjson')
+
+    def _has_log(self, task_id) -> bool:
+        return task_id in self._pending or self._name(task_id) in self._logged
+
+    def _remove_log(self, name: str):
+        if name in self._logged:
+            try:
+                os.remove(os.path.join(self.directory, f'{name}.ndjson'))
+            except OSError as e:
+                logger.warning(f"Could not remove activity log {name}: {e}")
+            self._logged.discard(name)
+
+    # TaskStore listener interface
+    def tasks_reset(self):
+        # Skipped when registering: the store then holds whatever was loaded,
+        # and a task file that failed to load must not cost every log
+        if self._migrating:
+            return
+        # The collection was replaced; forget the tasks it no longer has
+        with self._lock:
+            kept = {self._name(task['id']) for task in self.task_store.all()}
+            for task_id in [task_id for task_id in list(self._cache) + list(self._pending)
+                            if self._name(task_id) not in kept]:
+                self._cache.pop(task_id, None)
+                self._pending.pop(task_id, None)
+            for name in self._logged - kept:
+                self._remove_log(name)
+
+    def task_filed(self, task: Dict, position: int):
+        if not any(field in task for field in ACTIVITY_FIELDS):
+            return
+        history = task.pop('history', None) or []
+        comments = task.pop('comments', None) or []
+        task_id = task['id']
+        has_log = self._has_log(task_id)
+
+        if self._migrating:
+            self._migrated.append(task_id)
+            if has_log:
+                # Already migrated; the task file was not saved afterwards
+                logged_history, logged_comments = self.load(task_id)
+                task['comment_count'] = len(logged_comments)
+                self._set_last_updated(task, logged_history)
+                return
+        if has_log and 'comment_count' in task:
+            task['comment_count'] += len(comments)
+        else:
+            # Full lists from an older data file or an import
+            task['comment_count'] = len(comments)
+        self._set_last_updated(task, history)
+
+        events = [{'op': 'history', 'entry': entry} for entry in history]
+        events += [{'op': 'comment', 'comment': comment} for comment in comments]
+        if events:
+            self._enqueue(task_id, events)
+
+    def task_removed(self, task_id: str):
+        with self._lock:
+            self._cache.pop(task_id, None)
+            self._pending.pop(task_id, None)
+            self._remove_log(self._name(task_id))
+
+    @staticmethod
+    def _set_last_updated(task: Dict, history: Iterable[Dict]):
+        for entry in reversed(list(history)):
+            if isinstance(entry, dict) and entry.get('action') != 'created' and entry.get('timestamp'):
+                task['last_updated'] = entry['timestamp']
+                return
+
+    # Queue
+    def _enqueue(self, task_id: str, events: List[Dict]):
+        with self._lock:
+            self._pending.setdefault(task_id, []).extend(events)
+            cached = self._cache.get(task_id)
+            if cached is not None:
+                self._replay(events, *cached)
+        self._wake.set()
+
+    def record_history(self, task_id: str, entries: List[Dict]):
+        """Queue history entries for a task without touching the task document"""
+        self._enqueue(task_id, [{'op': 'history', 'entry': entry} for entry in entries])
+
+    def _write_behind_loop(self):
+        while not self._stopped:
+            self._wake.wait()
+            if self._stopped:
+                break
+            # Coalescing window - let further events pile up before writing
+            time.sleep(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error writing task activity: {str(e)}")
+                self._wake.set()
+
+    def flush(self) -> int:
+        """Append every queued event to its task's log, returning the number of tasks written"""
+        # Held throughout so a read never misses events taken off the queue but not yet written
+        with self._lock:
+            written = 0
+            for task_id in list(self._pending):
+                events = self._pending[task_id]
+                with open(self._path(task_id), 'a', encoding='utf-8') as f:
+                    f.write(''.join(dump_json(event, default=str) + '\n' for event in events))
+                self._logged.add(self._name(task_id))
+                del self._pending[task_id]
+                written += 1
+            return written
+
+    def close(self):
+        """Stop the writer thread and write anything still queued"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._wake.set()
+        self._writer.join(timeout=5)
+        self.flush()
+
+    # Log
+
+    @staticmethod
+    def _replay(events: Iterable[Dict], history: List[Dict], comments: List[Dict]) -> int:
+        """Apply log events to the lists, returning the number of comment edits/deletes"""
+        changes = 0
+        for event in events:
+            op = event.get('op')
+            if op == 'history':
+                history.append(event['entry'])
+            elif op == 'comment':
+                comments.append(event['comment'])
+            elif op == 'edit_comment' and 0 <= event['index'] < len(comments):
+                comments[event['index']] = dict(comments[event['index']], text=event['text'],
+                                                edited_at=event['edited_at'])
+                changes += 1
+            elif op == 'delete_comment' and 0 <= event['index'] < len(comments):
+                del comments[event['index']]
+                changes += 1
+        return changes
+
+    def _read(self, task_id: str) -> Tuple[List[Dict], List[Dict]]:
+        history: List[Dict] = []
+        comments: List[Dict] = []
+        if self._name(task_id) in self._logged:
+            path = self._path(task_id)
+            events = []
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            events.append(json.loads(line))
+                        except ValueError:
+                            # A torn last line after a crash
+                            logger.warning(f"Skipping a bad line in {path}")
+            except FileNotFoundError:
+                pass
+            # Compact what is on disk; queued events are appended afterwards as usual
+            if self._replay(events, history, comments) >= COMPACT_AFTER_CHANGES:
+                compacted = [{'op': 'history', 'entry': entry} for entry in history]
+                compacted += [{'op': 'comment', 'comment': comment} for comment in comments]
+                atomic_write_text(path, ''.join(dump_json(event, default=str) + '\n' for event in compacted))
+        self._replay(self._pending.get(task_id, ()), history, comments)
+        return history, comments
+
+    def load(self, task_id: str) -> Tuple[List[Dict], List[Dict]]:
+        """(history, comments) of a task; treat the lists as read-only"""
+        with self._lock:
+            cached = self._cache.get(task_id)
+            if cached is None:
+                cached = self._read(task_id)
+                self._cache[task_id] = cached
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            else:
+                self._cache.move_to_end(task_id)
+            return cached
+
+    def history(self, task_id: str) -> List[Dict]:
+        return self.load(task_id)[0]
+
+    def comments(self, task_id: str) -> List[Dict]:
+        return self.load(task_id)[1]
+
+    def with_activity(self, task: Dict) -> Dict:
+        """Copy of a task with its history and comments filled back in"""
+        history, comments = self.load(task['id'])
+        return dict(task, history=list(history), comments=list(comments))
+
+    # Comment changes
+    def add_comment(self, task_id: str, comment: Dict) -> int:
+        """Queue a new comment, returning the task's comment count including it"""
+        with self._lock:
+            self._enqueue(task_id, [{'op': 'comment', 'comment': comment}])
+            return len(self.comments(task_id))
+
+    def edit_comment(self, task_id: str, index: int, text: str, edited_at: str) -> Optional[Dict]:
+        """Change a comment's text, returning the edited comment (None if there is no such comment)"""
+        with self._lock:
+            if not 0 <= index < len(self.comments(task_id)):
+                return None
+            self._enqueue(task_id, [{'op': 'edit_comment', 'index': index, 'text': text, 'edited_at': edited_at}])
+            return self.comments(task_id)[index]
+
+    def delete_comment(self, task_id: str, index: int) -> Optional[Dict]:
+        """Remove a comment, returning it (None if there is no such comment)"""
+        with self._lock:
+            comments = self.comments(task_id)
+            if not 0 <= index < len(comments):
+                return None
+            deleted = comments[index]
+            self._enqueue(task_id, [{'op': 'delete_comment', 'index': index}])
+            return deleted
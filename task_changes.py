@@ -0,0 +1,219 @@
+"""
+Task Changes Module
+Task creation / update rules shared by the single-task endpoints and
+POST /api/tasks/batch, which applies many changes as one transaction
+"""
+
+import copy
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from merge_patch import apply_merge_patch
+from task_activity import ACTIVITY_FIELDS, SUMMARY_FIELDS
+
+MAX_OPERATIONS = 1000
+
+# Kept by TaskActivityStore rather than set by clients
+DERIVED_FIELDS = ACTIVITY_FIELDS + SUMMARY_FIELDS
+
+# Fields an update keeps unless the client sends them explicitly
+PRESERVED_FIELDS = ('history', 'comments', 'attachments', 'dependencies', 'blocks', 'created_date')
+
+
+class BatchError(ValueError):
+    """An operation of a batch could not be applied; nothing was changed"""
+
+    def __init__(self, message: str, index: Optional[int] = None, status: int = 400):
+        super().__init__(message)
+        self.index = index
+        self.status = status
+
+
+def new_task(data: Dict, now: Optional[datetime] = None) -> Dict:
+    """Fill in the id, creation history and empty collections of a new task"""
+    timestamp = (now or datetime.now()).isoformat()
+    task = data
+    task['id'] = str(uuid.uuid4())
+    task['created_date'] = timestamp
+    task['history'] = [{
+        'timestamp': timestamp,
+        'action': 'created',
+        'field': 'task',
+        'old_value': None,
+        'new_value': 'Task created'
+    }]
+    task['comments'] = []
+    task['attachments'] = []
+    task['dependencies'] = []
+    task['blocks'] = []
+    return task
+
+
+def _record_change(task: Dict, field: str, new_value: Any, timestamp: str):
+    task.setdefault('history', []).append({
+        'timestamp': timestamp,
+        'action': 'modified',
+        'field': field,
+        'old_value': task.get(field),
+        'new_value': new_value
+    })
+
+
+def apply_task_changes(task: Dict, changes: Dict, now: Optional[datetime] = None) -> Dict:
+    """Update a task with the given fields, adding a history entry per changed field"""
+    timestamp = (now or datetime.now()).isoformat()
+    # History, comments and their summaries are kept by TaskActivityStore; a client echoing them back changes nothing
+    changes = {field: value for field, value in changes.items() if field not in DERIVED_FIELDS}
+    if 'history' not in task:
+        task['history'] = []
+    for field, new_value in changes.items():
+        if field not in PRESERVED_FIELDS and task.get(field) != new_value:
+            _record_change(task, field, new_value, timestamp)
+    # Fields not sent (including PRESERVED_FIELDS) keep their current values
+    task.update(changes)
+    return task
+
+
+def apply_task_patch(task: Dict, patch: Dict, now: Optional[datetime] = None) -> Dict:
+    """
+    Apply a JSON Merge Patch to a task
+
+    Only the top-level fields named in the patch are compared, so history
+    gets one entry per field the patch actually changes; null removes a field.
+    """
+    timestamp = (now or datetime.now()).isoformat()
+    patch = {field: value for field, value in patch.items() if field not in DERIVED_FIELDS}
+    merged = apply_merge_patch(task, patch)
+    apply_task_changes(task, {field: merged[field] for field in patch if field in merged}, now)
+    for field in patch:
+        if field not in merged and field in task:
+            if field not in PRESERVED_FIELDS:
+                _record_change(task, field, None, timestamp)
+            del task[field]
+    return task
+
+
+class TaskBatch:
+    """Create / update / delete / re-link many tasks in one transaction
+
+    Operations are applied in order to copies of the tasks involved; if any
+    of them fails a BatchError is raised and the store is left untouched.
+    commit() then hands every change to TaskStore.apply(), so the batch is
+    one change-feed entry, one change event and one write. Run it under the
+    tasks write lock.
+
+    Operations (a list of objects):
+      {"op": "create", "task": {...}}
+      {"op": "update", "id": ..., "changes": {...}}
+      {"op": "delete", "id": ...}
+      {"op": "dependencies", "id": ..., "dependencies": [...]}
+    """
+
+    OPERATIONS = ('create', 'update', 'delete', 'dependencies')
+
+    def __init__(self, task_store, now: Optional[datetime] = None):
+        self.task_store = task_store
+        self.now = now or datetime.now()
+        # Task id -> working copy, or None once deleted in this batch
+        self._staged: Dict[str, Optional[Dict]] = {}
+        # Task id -> ids of the tasks listing it in 'blocks' (built on first use)
+        self._blockers: Optional[Dict[str, Set[str]]] = None
+
+    def _get(self, task_id) -> Optional[Dict]:
+        if task_id in self._staged:
+            return self._staged[task_id]
+        return self.task_store.get(task_id)
+
+    def _edit(self, task_id, index: int) -> Dict:
+        """Working copy of a task, made on first change"""
+        if task_id in self._staged:
+            task = self._staged[task_id]
+        else:
+            original = self.task_store.get(task_id)
+            task = copy.deepcopy(original) if original is not None else None
+            if task is not None:
+                self._staged[task_id] = task
+        if task is None:
+            raise BatchError(f'Task not found: {task_id}', index, status=404)
+        return task
+
+    def _blocked_by(self) -> Dict[str, Set[str]]:
+        if self._blockers is None:
+            self._blockers = {}
+            tasks = [task for task in self.task_store.all() if task['id'] not in self._staged]
+            tasks += [task for task in self._staged.values() if task is not None]
+            for task in tasks:
+                for blocked in task.get('blocks') or []:
+                    self._blockers.setdefault(blocked, set()).add(task['id'])
+        return self._blockers
+
+    # Operations
+    def create(self, index: int, op: Dict) -> Dict:
+        data = op.get('task')
+        if not isinstance(data, dict):
+            raise BatchError('create needs a "task" object', index)
+        task = new_task(dict(data), self.now)
+        self._staged[task['id']] = task
+        return {'op': 'create', 'id': task['id'], 'task': task}
+
+    def update(self, index: int, op: Dict) -> Dict:
+        changes = op.get('changes')
+        if not isinstance(changes, dict):
+            raise BatchError('update needs a "changes" object', index)
+        task_id = op['id']
+        if changes.get('id', task_id) != task_id:
+            raise BatchError('A task id cannot be changed', index)
+        task = apply_task_changes(self._edit(task_id, index), changes, self.now)
+        if 'blocks' in changes:
+            self._blockers = None
+        return {'op': 'update', 'id': task_id, 'task': task}
+
+    def delete(self, index: int, op: Dict) -> Dict:
+        # Like DELETE /api/tasks/<id>, deleting a missing task is not an error
+        task_id = op['id']
+        if self._get(task_id) is not None:
+            self._staged[task_id] = None
+            self._blockers = None
+        return {'op': 'delete', 'id': task_id}
+
+    def dependencies(self, index: int, op: Dict) -> Dict:
+        """Same as PUT /api/tasks/<id>/dependencies: set the list and fix up 'blocks'"""
+        dependencies = op.get('dependencies')
+        if not isinstance(dependencies, list):
+            raise BatchError('dependencies needs a "dependencies" list', index)
+        task_id = op['id']
+        self._edit(task_id, index)['dependencies'] = dependencies
+
+        blockers = self._blocked_by()
+        current = blockers.setdefault(task_id, set())
+        for other_id in current | set(dependencies):
+            if other_id in current and other_id not in dependencies:
+                blocks = self._edit(other_id, index).setdefault('blocks', [])
+                blocks.remove(task_id)
+                current.discard(other_id)
+            elif other_id in dependencies and other_id not in current and self._get(other_id) is not None:
+                self._edit(other_id, index).setdefault('blocks', []).append(task_id)
+                current.add(other_id)
+        return {'op': 'dependencies', 'id': task_id, 'dependencies': dependencies}
+
+    def run(self, operations: List[Dict]) -> List[Dict]:
+        """Apply the operations to working copies, returning one result per operation"""
+        if not isinstance(operations, list) or not operations:
+            raise BatchError('"operations" must be a non-empty list')
+        if len(operations) > MAX_OPERATIONS:
+            raise BatchError(f'At most {MAX_OPERATIONS} operations per batch')
+        results = []
+        for index, op in enumerate(operations):
+            if not isinstance(op, dict) or op.get('op') not in self.OPERATIONS:
+                raise BatchError(f"Unknown operation; expected one of {', '.join(self.OPERATIONS)}", index)
+            if op['op'] != 'create' and not isinstance(op.get('id'), str):
+                raise BatchError(f"{op['op']} needs a task \"id\"", index)
+            results.append(getattr(self, op['op'])(index, op))
+        return results
+
+    def commit(self):
+        """Store every change made by run() as one TaskStore change"""
+        upserted = [task for task in self._staged.values() if task is not None]
+        deleted = [task_id for task_id, task in self._staged.items() if task is None]
+        self.task_store.apply(upserted, deleted)
@@ -0,0 +1,207 @@
+"""
+Task Query Module
+Server-side filtering, sorting, keyset pagination and field projection for GET /api/tasks
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from due_dates import parse_follow_up_datetime, start_of_day
+
+DEFAULT_LIMIT = None         # No limit unless the caller asks for one
+MAX_LIMIT = 1000
+
+# Query parameter -> TaskStore index used to narrow the candidates
+INDEXED_FILTERS = {
+    'status': 'status',
+    'customer': 'customer_name',
+    'project_id': 'project_id',
+    'assigned_to_id': 'assigned_to_id'
+}
+
+PRIORITY_RANK = {'Urgent': 0, 'High': 1, 'Medium': 2, 'Low': 3}
+
+# Fields searched by the full-text q parameter
+TEXT_FIELDS = ('title', 'description', 'customer_name', 'notes')
+
+SORT_FIELDS = ('created_date', 'follow_up_date', 'priority', 'title', 'status', 'customer_name')
+
+
+class QueryError(ValueError):
+    """A query parameter could not be understood"""
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [part.strip() for part in value.split(',') if part.strip()] if value else []
+
+
+def _parse_bound(name: str, value: Optional[str]) -> Optional[datetime]:
+    """Parse a due-before / due-after value; a bare date means the start of that day"""
+    if not value:
+        return None
+    if len(value) == 10:
+        try:
+            return start_of_day(datetime.strptime(value, '%Y-%m-%d').date())
+        except ValueError:
+            raise QueryError(f"{name} must be a date (YYYY-MM-DD) or datetime")
+    moment = parse_follow_up_datetime(value)
+    if moment is None:
+        raise QueryError(f"{name} must be a date (YYYY-MM-DD) or datetime")
+    return moment.astimezone().replace(tzinfo=None) if moment.tzinfo else moment
+
+
+def encode_cursor(sort: str, key: tuple) -> str:
+    """Opaque cursor holding the sort order and the last key of a page"""
+    payload = json.dumps([sort, list(key)]).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, tuple]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort, key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        raise QueryError('Invalid cursor')
+    if not isinstance(sort, str) or not isinstance(key, list):
+        raise QueryError('Invalid cursor')
+    return sort, tuple(key)
+
+
+class TaskQuery:
+    """Parsed GET /api/tasks query string
+
+    Supported parameters (all optional, combined with AND):
+      status, priority, customer, project_id, assigned_to_id
+          exact match; comma separated values match any of them
+      due_before, due_after (or due-before / due-after)
+          follow-up date < due_before and >= due_after
+      q        case-insensitive text search over title, description, customer, notes
+      sort     one of SORT_FIELDS, prefixed with '-' for descending (default: store order)
+      limit    page size (max MAX_LIMIT); cursor continues from X-Next-Cursor
+      fields   comma separated fields to return ('id' is always included)
+    """
+
+    def __init__(self, args):
+        self.filters: Dict[str, List[str]] = {
+            param: _split(args.get(param)) for param in INDEXED_FILTERS if args.get(param)
+        }
+        self.priorities = _split(args.get('priority'))
+        self.due_before = _parse_bound('due_before', args.get('due_before') or args.get('due-before'))
+        self.due_after = _parse_bound('due_after', args.get('due_after') or args.get('due-after'))
+        self.text = (args.get('q') or '').strip().lower()
+
+        sort = args.get('sort') or ''
+        self.descending = sort.startswith('-')
+        self.sort = sort.lstrip('-') or None
+        self.sort_spec = sort
+        if self.sort is not None and self.sort not in SORT_FIELDS:
+            raise QueryError(f"sort must be one of: {', '.join(SORT_FIELDS)}")
+
+        limit = args.get('limit')
+        if limit in (None, ''):
+            self.limit = DEFAULT_LIMIT
+        else:
+            try:
+                self.limit = int(limit)
+            except ValueError:
+                raise QueryError('limit must be an integer')
+            if self.limit < 1:
+                raise QueryError('limit must be at least 1')
+            self.limit = min(self.limit, MAX_LIMIT)
+        self.cursor = None
+        if args.get('cursor'):
+            cursor_sort, self.cursor = decode_cursor(args['cursor'])
+            if cursor_sort != self.sort_spec:
+                raise QueryError('Cursor does not belong to this sort order')
+
+        fields = _split(args.get('fields'))
+        self.fields = ['id'] + [f for f in fields if f != 'id'] if fields else None
+
+    @property
+    def is_plain(self) -> bool:
+        """True when the query asks for the whole, unmodified collection"""
+        return not (self.filters or self.priorities or self.due_before or self.due_after or self.text
+                    or self.sort or self.limit or self.cursor or self.fields)
+
+    # Filtering
+    def _candidates(self, task_store) -> List[Dict]:
+        """Tasks passing the indexed filters, in store order"""
+        if not self.filters:
+            return task_store.all()
+        matched = None
+        for param, values in self.filters.items():
+            ids = set()
+            for value in values:
+                ids.update(task['id'] for task in task_store.find(**{INDEXED_FILTERS[param]: value}))
+            matched = ids if matched is None else matched & ids
+        return [task_store.get(task_id) for task_id in sorted(matched, key=task_store.position)]
+
+    def _matches(self, task: Dict, due) -> bool:
+        if self.priorities and task.get('priority') not in self.priorities:
+            return False
+        if self.due_before or self.due_after:
+            moment = due.due_at(task['id'])
+            if moment is None:
+                return False
+            if self.due_before and not moment < self.due_before:
+                return False
+            if self.due_after and not moment >= self.due_after:
+                return False
+        if self.text:
+            haystack = ' '.join(str(task.get(field) or '') for field in TEXT_FIELDS).lower()
+            if self.text not in haystack:
+                return False
+        return True
+
+    # Ordering
+    def _sort_key(self, task: Dict, task_store) -> tuple:
+        """Sort key ending in the store position, so every key is unique"""
+        position = task_store.position(task['id'])
+        if self.sort is None:
+            return (position,)
+        if self.sort == 'priority':
+            value = PRIORITY_RANK.get(task.get('priority'), len(PRIORITY_RANK))
+        elif self.sort == 'follow_up_date':
+            moment = task_store.due.due_at(task['id'])
+            value = moment.isoformat() if moment else None
+        else:
+            value = task.get(self.sort)
+            value = value.lower() if isinstance(value, str) else value
+        if value is None or value == '' or not isinstance(value, (str, int, float)):
+            # Missing values sort last either way round
+            return (int(not self.descending), '', position)
+        return (int(self.descending), value, position) if isinstance(value, str) \
+            else (int(self.descending), '', value, position)
+
+    def _project(self, task: Dict) -> Dict:
+        if self.fields is None:
+            return task
+        return {field: task[field] for field in self.fields if field in task}
+
+    def run(self, task_store) -> Tuple[List[Dict], int, Optional[str]]:
+        """Return (page of tasks, total matching, next cursor or None)"""
+        due = task_store.due
+        matched = [task for task in self._candidates(task_store) if self._matches(task, due)]
+        total = len(matched)
+
+        keyed = [(self._sort_key(task, task_store), task) for task in matched]
+        if self.sort is not None:
+            keyed.sort(key=lambda item: item[0], reverse=self.descending)
+        if self.cursor is not None:
+            # Keyset pagination: resume strictly after the last key of the previous page
+            try:
+                if self.descending:
+                    keyed = [item for item in keyed if item[0] < self.cursor]
+                else:
+                    keyed = [item for item in keyed if item[0] > self.cursor]
+            except TypeError:
+                raise QueryError('Invalid cursor')
+
+        next_cursor = None
+        if self.limit is not None and len(keyed) > self.limit:
+            keyed = keyed[:self.limit]
+            next_cursor = encode_cursor(self.sort_spec, keyed[-1][0])
+        return [self._project(task) for _, task in keyed], total, next_cursor
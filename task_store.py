@@ -0,0 +1,359 @@
+"""
+Task Store Module
+Keeps the task collection in memory and persists it through a write-behind thread
+"""
+
+import atexit
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from data_locks import collection_lock
+from due_dates import DueDateIndex
+from keyed_collection import KeyedCollection
+
+logger = logging.getLogger(__name__)
+
+
+def _meeting_id(task: Dict):
+    reference = task.get('meeting_reference')
+    return reference.get('meeting_id') if isinstance(reference, dict) else None
+
+
+# Secondary indexes (lookups by id use the store itself): name -> key of a task
+TASK_INDEXES = {
+    'project_id': lambda task: task.get('project_id'),
+    'topic_id': lambda task: task.get('topic_id'),
+    'meeting_id': _meeting_id,
+    'assigned_to_id': lambda task: task.get('assigned_to_id'),
+    'status': lambda task: task.get('status'),
+    'customer_name': lambda task: task.get('customer_name')
+}
+
+
+class TaskStore:
+    """In-memory task collection with coalesced background persistence
+
+    Tasks are loaded once at startup and served from memory. Mutations only
+    mark the store dirty; a writer thread waits ``flush_interval`` seconds so
+    bursts of changes are coalesced into a single save through the storage
+    backend (see storage.py).
+
+    Hash indexes on the TASK_INDEXES fields and a due-date index (``due``)
+    are updated on every mutation, so ``find()`` costs O(result size). Code
+    that modifies a task dict must pass it to ``update()`` to keep them in
+    sync.
+    """
+
+    def __init__(self, storage, flush_interval: float = 0.5, collection: str = 'tasks'):
+        self.storage = storage
+        self.collection = collection
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._tasks: Dict[str, Dict] = {}
+        # Index name -> key -> ids of the tasks with that key
+        self._indexes: Dict[str, Dict[Any, Set[str]]] = {name: {} for name in TASK_INDEXES}
+        # Task id -> the keys it is currently filed under, and its position in the store
+        self._index_keys: Dict[str, tuple] = {}
+        self._positions: Dict[str, int] = {}
+        self._next_position = 0
+        # Active tasks sorted by follow-up datetime
+        self.due = DueDateIndex()
+        # Objects told about every change (see add_listener)
+        self._listeners = []
+        # Ids modified since the last flush; None means the whole collection
+        self._changed: Optional[Set[str]] = set()
+        self._generation = 0
+        self._flushed_generation = 0
+        self._wake = threading.Event()
+        self._stopped = False
+
+        self._load()
+
+        self._writer = threading.Thread(
+            target=self._write_behind_loop, name='task-store-writer', daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _load(self):
+        """Read the collection into memory"""
+        self._tasks = self._index(self.storage.load(self.collection))
+        self._rebuild_indexes()
+
+    def _index(self, tasks: List[Dict]) -> Dict[str, Dict]:
+        """Key tasks by id, keeping their original order"""
+        indexed = {}
+        for task in tasks:
+            if 'id' not in task:
+                task['id'] = str(uuid.uuid4())
+            if task['id'] in indexed:
+                logger.warning(f"Duplicate task id {task['id']} - keeping the last occurrence")
+            indexed[task['id']] = task
+        return indexed
+
+    # Secondary indexes
+    @staticmethod
+    def _index_key(value):
+        # Lists or dicts in an indexed field can't be hashed; such tasks are not indexed
+        try:
+            hash(value)
+        except TypeError:
+            return None
+        return value
+
+    def _file(self, task: Dict):
+        """Add a task to the indexes (removing any previous entries)"""
+        task_id = task['id']
+        self._unfile(task_id)
+        keys = tuple(self._index_key(key_of(task)) for key_of in TASK_INDEXES.values())
+        for name, key in zip(TASK_INDEXES, keys):
+            if key is not None:
+                self._indexes[name].setdefault(key, set()).add(task_id)
+        self._index_keys[task_id] = keys
+        if task_id not in self._positions:
+            self._positions[task_id] = self._next_position
+            self._next_position += 1
+        self.due.update(task, self._positions[task_id])
+        for listener in self._listeners:
+            listener.task_filed(task, self._positions[task_id])
+
+    def _unfile(self, task_id: str, forget: bool = False):
+        keys = self._index_keys.pop(task_id, None)
+        if keys is not None:
+            for name, key in zip(TASK_INDEXES, keys):
+                if key is None:
+                    continue
+                bucket = self._indexes[name].get(key)
+                if bucket is not None:
+                    bucket.discard(task_id)
+                    if not bucket:
+                        del self._indexes[name][key]
+        if forget:
+            self._positions.pop(task_id, None)
+            self.due.remove(task_id)
+            for listener in self._listeners:
+                listener.task_removed(task_id)
+
+    def _rebuild_indexes(self):
+        self._indexes = {name: {} for name in TASK_INDEXES}
+        self._index_keys = {}
+        self._positions = {}
+        self._next_position = 0
+        self.due.clear()
+        for listener in self._listeners:
+            listener.tasks_reset()
+        for task in self._tasks.values():
+            self._file(task)
+
+    def add_listener(self, listener):
+        """
+        Keep a derived view in step with the store
+
+        The listener's task_filed(task, position) is called whenever a task
+        is added or updated, task_removed(task_id) when one is deleted and
+        tasks_reset() before the whole collection is replaced. It is first
+        fed every current task.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+            listener.tasks_reset()
+            for task_id, task in self._tasks.items():
+                listener.task_filed(task, self._positions[task_id])
+
+    def find(self, **criteria) -> List[Dict]:
+        """
+        Get the tasks matching all criteria, in store order
+
+        Criteria are TASK_INDEXES names, e.g. find(project_id='p1', status='Open')
+        """
+        unknown = set(criteria) - set(TASK_INDEXES)
+        if unknown:
+            raise ValueError(f"Not an indexed task field: {', '.join(sorted(unknown))}")
+        with self._lock:
+            buckets = [self._indexes[name].get(self._index_key(value), ()) for name, value in criteria.items()]
+            if not buckets:
+                return list(self._tasks.values())
+            ids = set(min(buckets, key=len))
+            for bucket in buckets:
+                ids.intersection_update(bucket)
+            return [self._tasks[task_id] for task_id in sorted(ids, key=self._positions.__getitem__)]
+
+    def check_indexes(self) -> List[str]:
+        """Compare the indexes against a full scan, returning any inconsistencies"""
+        problems = []
+        with self._lock:
+            for name, key_of in TASK_INDEXES.items():
+                expected: Dict[Any, Set[str]] = {}
+                for task_id, task in self._tasks.items():
+                    key = self._index_key(key_of(task))
+                    if key is not None:
+                        expected.setdefault(key, set()).add(task_id)
+                if expected != self._indexes[name]:
+                    for key in set(expected) | set(self._indexes[name]):
+                        have = self._indexes[name].get(key, set())
+                        want = expected.get(key, set())
+                        if have != want:
+                            problems.append(
+                                f"{name}={key!r}: missing {sorted(want - have)}, stale {sorted(have - want)}"
+                            )
+            if set(self._positions) != set(self._tasks):
+                problems.append('positions out of sync with tasks')
+            else:
+                expected_due = DueDateIndex()
+                for task_id, task in self._tasks.items():
+                    expected_due.update(task, self._positions[task_id])
+                if (expected_due.between(None, None) != self.due.between(None, None)
+                        or expected_due.unparsed() != self.due.unparsed()):
+                    problems.append('due-date index out of sync with tasks')
+        return problems
+
+    # Reads
+    def all(self) -> List[Dict]:
+        """Get all tasks in insertion order"""
+        with self._lock:
+            return KeyedCollection(self._tasks.values())
+
+    def get(self, task_id: str) -> Optional[Dict]:
+        """Get a specific task"""
+        return self._tasks.get(task_id)
+
+    def position(self, task_id: str) -> int:
+        """Sort key that puts tasks in store order"""
+        return self._positions[task_id]
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    # Mutations
+    def add(self, task: Dict) -> Dict:
+        """Add a new task"""
+        with self._lock:
+            self._tasks[task['id']] = task
+            self._file(task)
+            self._mark_dirty(upserted=[task['id']])
+        return task
+
+    def update(self, task: Dict) -> Dict:
+        """Store a task after it has been modified"""
+        with self._lock:
+            self._tasks[task['id']] = task
+            self._file(task)
+            self._mark_dirty(upserted=[task['id']])
+        return task
+
+    def delete(self, task_id: str) -> bool:
+        """Delete a task, returning False if it did not exist"""
+        with self._lock:
+            if self._tasks.pop(task_id, None) is None:
+                return False
+            self._unfile(task_id, forget=True)
+            self._mark_dirty(deleted=[task_id])
+            return True
+
+    def apply(self, upserted: Iterable[Dict] = (), deleted: Iterable[str] = ()):
+        """
+        Store several added/modified tasks and delete others as one change
+
+        Listeners see each task, but the change feed gets a single entry and
+        the writer a single generation, so the batch is flushed together.
+        """
+        with self._lock:
+            upserted_ids = []
+            for task in upserted:
+                self._tasks[task['id']] = task
+                self._file(task)
+                upserted_ids.append(task['id'])
+            deleted_ids = []
+            for task_id in deleted:
+                if self._tasks.pop(task_id, None) is not None:
+                    self._unfile(task_id, forget=True)
+                    deleted_ids.append(task_id)
+            if upserted_ids or deleted_ids:
+                self._mark_dirty(upserted=upserted_ids, deleted=deleted_ids)
+
+    def replace_all(self, tasks: List[Dict]):
+        """Replace the whole collection"""
+        with self._lock:
+            self._tasks = self._index(tasks)
+            self._rebuild_indexes()
+            self._mark_dirty(reset=True)
+
+    def _mark_dirty(self, upserted: List[str] = (), deleted: List[str] = (), reset: bool = False):
+        if reset:
+            self._changed = None
+            self.storage.touch(self.collection)
+        else:
+            if self._changed is not None:
+                self._changed.update(upserted)
+                self._changed.update(deleted)
+            self.storage.touch(self.collection, upserted=list(upserted), deleted=list(deleted))
+        self._generation += 1
+        self._wake.set()
+
+    def _restore_changed(self, changed: Optional[Set[str]]):
+        """Put back the changed ids of a flush that did not complete"""
+        if changed is None or self._changed is None:
+            self._changed = None
+        else:
+            self._changed |= changed
+
+    # Persistence
+    def _write_behind_loop(self):
+        while not self._stopped:
+            self._wake.wait()
+            if self._stopped:
+                break
+            # Coalescing window - let further mutations pile up before writing
+            time.sleep(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing tasks: {str(e)}")
+                self._wake.set()
+
+    def flush(self) -> bool:
+        """Write pending changes to storage, returning True if anything was written"""
+        with self._flush_lock:
+            # Requests mutate task dicts in place under the tasks write lock,
+            # so serialize under the read lock to get a consistent snapshot
+            with collection_lock(self.collection).read():
+                with self._lock:
+                    generation = self._generation
+                    if generation == self._flushed_generation:
+                        return False
+                    snapshot = list(self._tasks.values())
+                    changed, self._changed = self._changed, set()
+
+                try:
+                    commit = self.storage.prepare_save(self.collection, snapshot, changed)
+                except RuntimeError:
+                    # Something changed a task outside the lock; retry on the next pass
+                    with self._lock:
+                        self._restore_changed(changed)
+                    self._wake.set()
+                    return False
+
+            try:
+                commit()
+            except Exception:
+                with self._lock:
+                    self._restore_changed(changed)
+                raise
+
+            with self._lock:
+                self._flushed_generation = generation
+            return True
+
+    def close(self):
+        """Stop the writer thread and flush anything still pending"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._wake.set()
+        self._writer.join(timeout=5)
+        self.flush()
@@ -8,13 +8,19 @@ import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import uuid
+from persistence import atomic_write_json
+from data_locks import reads, writes
+from keyed_collection import KeyedCollection
 
 class TeamManager:
-    def __init__(self, data_dir: str = 'data'):
+    def __init__(self, data_dir: str = 'data', task_store=None):
         self.data_dir = data_dir
         self.teams_file = os.path.join(data_dir, 'teams.json')
+        # The app's TaskStore, used for workload when no task list is passed in
+        self.task_store = task_store
         self.ensure_data_files()
         
+    @writes('teams')
     def ensure_data_files(self):
         """Ensure all required data files exist"""
         os.makedirs(self.data_dir, exist_ok=True)
@@ -30,18 +36,23 @@ class TeamManager:
     
     def save_teams_data(self, data: Dict):
         """Save teams data to file"""
-        with open(self.teams_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        atomic_write_json(self.teams_file, data, ensure_ascii=False)
     
+    @reads('teams')
     def load_teams_data(self) -> Dict:
         """Load teams data from file"""
         try:
             with open(self.teams_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                data = json.load(f)
         except:
-            return {"teams": [], "members": [], "departments": []}
+            return {"teams": KeyedCollection(), "members": KeyedCollection(), "departments": []}
+        for key in ("teams", "members"):
+            if isinstance(data.get(key), list):
+                data[key] = KeyedCollection(data[key])
+        return data
     
     # Team Management
+    @writes('teams')
     def create_team(self, team_data: Dict) -> Dict:
         """Create a new team"""
         data = self.load_teams_data()
@@ -63,6 +74,7 @@ class TeamManager:
         self.save_teams_data(data)
         return team
     
+    @writes('teams')
     def update_team(self, team_id: str, updates: Dict) -> Optional[Dict]:
         """Update an existing team"""
         data = self.load_teams_data()
@@ -75,6 +87,7 @@ class TeamManager:
                 return team
         return None
     
+    @writes('teams')
     def delete_team(self, team_id: str) -> bool:
         """Delete a team (soft delete)"""
         data = self.load_teams_data()
@@ -87,15 +100,13 @@ class TeamManager:
                 return True
         return False
     
+    @reads('teams')
     def get_team(self, team_id: str) -> Optional[Dict]:
         """Get a specific team"""
         data = self.load_teams_data()
-        
-        for team in data["teams"]:
-            if team["id"] == team_id:
-                return team
-        return None
+        return data["teams"].get(team_id)
     
+    @reads('teams')
     def get_all_teams(self, include_inactive: bool = False) -> List[Dict]:
         """Get all teams"""
         data = self.load_teams_data()
@@ -105,6 +116,7 @@ class TeamManager:
         return [t for t in data["teams"] if t.get("is_active", True)]
     
     # Member Management
+    @writes('teams')
     def create_member(self, member_data: Dict) -> Dict:
         """Create a new team member"""
         data = self.load_teams_data()
@@ -128,6 +140,7 @@ class TeamManager:
         self.save_teams_data(data)
         return member
     
+    @writes('teams')
     def update_member(self, member_id: str, updates: Dict) -> Optional[Dict]:
         """Update an existing member"""
         data = self.load_teams_data()
@@ -140,6 +153,7 @@ class TeamManager:
                 return member
         return None
     
+    @writes('teams')
     def delete_member(self, member_id: str) -> bool:
         """Delete a member (soft delete)"""
         data = self.load_teams_data()
@@ -158,15 +172,13 @@ class TeamManager:
                 return True
         return False
     
+    @reads('teams')
     def get_member(self, member_id: str) -> Optional[Dict]:
         """Get a specific member"""
         data = self.load_teams_data()
-        
-        for member in data["members"]:
-            if member["id"] == member_id:
-                return member
-        return None
+        return data["members"].get(member_id)
     
+    @reads('teams')
     def get_all_members(self, include_inactive: bool = False) -> List[Dict]:
         """Get all members"""
         data = self.load_teams_data()
@@ -175,6 +187,7 @@ class TeamManager:
             return data["members"]
         return [m for m in data["members"] if m.get("is_active", True)]
     
+    @reads('teams')
     def get_members_by_team(self, team_id: str) -> List[Dict]:
         """Get all members of a specific team"""
         team = self.get_team(team_id)
@@ -189,13 +202,17 @@ class TeamManager:
         return members
     
     # Task Assignment Analytics
-    def get_member_workload(self, member_id: str, tasks: List[Dict]) -> Dict:
+    @reads('teams')
+    def get_member_workload(self, member_id: str, tasks: Optional[List[Dict]] = None) -> Dict:
         """Calculate workload for a member based on assigned tasks"""
         member = self.get_member(member_id)
         if not member:
             return {}
         
-        assigned_tasks = [t for t in tasks if t.get("assigned_to_id") == member_id]
+        if tasks is None and self.task_store is not None:
+            assigned_tasks = self.task_store.find(assigned_to_id=member_id)
+        else:
+            assigned_tasks = [t for t in tasks or [] if t.get("assigned_to_id") == member_id]
         
         # Calculate metrics
         total_tasks = len(assigned_tasks)
@@ -224,7 +241,8 @@ class TeamManager:
             "is_overloaded": capacity_percentage > 100
         }
     
-    def get_team_workload(self, team_id: str, tasks: List[Dict]) -> Dict:
+    @reads('teams')
+    def get_team_workload(self, team_id: str, tasks: Optional[List[Dict]] = None) -> Dict:
         """Calculate workload for an entire team"""
         team = self.get_team(team_id)
         if not team:
@@ -256,6 +274,7 @@ class TeamManager:
         
         return team_workload
     
+    @reads('teams')
     def suggest_assignment(self, task: Dict, team_id: Optional[str] = None) -> Optional[str]:
         """Suggest the best team member to assign a task to based on workload"""
         if team_id:
@@ -310,11 +329,13 @@ class TeamManager:
         ]
         return random.choice(colors)
     
+    @reads('teams')
     def get_departments(self) -> List[str]:
         """Get list of departments"""
         data = self.load_teams_data()
         return data.get("departments", [])
     
+    @writes('teams')
     def add_department(self, department: str) -> bool:
         """Add a new department"""
         data = self.load_teams_data()
@@ -0,0 +1,113 @@
+"""
+Concurrent write stress test
+Fires task updates, comments and deal notes/updates from many threads at once
+through the Flask test client and checks that no write was lost
+
+Runs against a copy of data/ in a temporary directory:
+    python test_concurrent_writes.py [threads] [rounds]
+Exits non-zero if a check fails.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_app_on_copy():
+    """Import app with its working directory on a throwaway copy of data/"""
+    workdir = tempfile.mkdtemp(prefix='task-manager-stress-')
+    shutil.copytree(os.path.join(REPO_DIR, 'data'), os.path.join(workdir, 'data'),
+                    ignore=shutil.ignore_patterns('attachments', 'snapshots'))
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_DIR)
+    import app
+    return app, workdir
+
+
+def run_writer(app, task_id, deal_id, writer, rounds, errors):
+    client = app.app.test_client()
+    for n in range(rounds):
+        requests = (
+            ('PUT', f'/api/tasks/{task_id}', {'title': f'title {writer}-{n}', f'stress_{writer}': n}),
+            ('POST', f'/api/tasks/{task_id}/comments', {'text': f'comment {writer}-{n}'}),
+            ('POST', f'/api/deals/{deal_id}/notes', {'text': f'note {writer}-{n}'}),
+            ('PATCH', f'/api/deals/{deal_id}', {f'stress_{writer}': n}),
+        )
+        for method, url, body in requests:
+            response = client.open(url, method=method, json=body)
+            if response.status_code >= 300:
+                errors.append(f'{method} {url} -> {response.status_code}: {response.get_data(as_text=True)[:200]}')
+
+
+def check(app, task_id, deal_id, writers, rounds):
+    """Failures as messages; an empty list means no write was lost"""
+    failures = []
+    expected_comments = {f'comment {w}-{n}' for w in range(writers) for n in range(rounds)}
+    expected_notes = {f'note {w}-{n}' for w in range(writers) for n in range(rounds)}
+
+    task = app.task_store.get(task_id)
+    comments = app.task_activity.comments(task_id)
+    missing = expected_comments - {comment.get('text') for comment in comments}
+    if missing:
+        failures.append(f'{len(missing)} comments lost, e.g. {sorted(missing)[:3]}')
+    if task.get('comment_count') != len(comments):
+        failures.append(f"comment_count {task.get('comment_count')} != {len(comments)} comments")
+    for w in range(writers):
+        if task.get(f'stress_{w}') != rounds - 1:
+            failures.append(f"task stress_{w} is {task.get(f'stress_{w}')!r}, last write was {rounds - 1}")
+    # History is appended in lock order, so its last title change is the last writer's
+    titles = [entry['new_value'] for entry in app.task_activity.history(task_id) if entry.get('field') == 'title']
+    if not titles or task.get('title') != titles[-1]:
+        failures.append(f"task title {task.get('title')!r} is not the last written {titles[-1:]!r}")
+
+    # Reread from storage rather than trusting anything cached in memory
+    deal = app.storage.get('deals', deal_id)
+    notes = [note.get('text') for note in deal.get('notes', [])]
+    missing = expected_notes - set(notes)
+    if missing:
+        failures.append(f'{len(missing)} deal notes lost, e.g. {sorted(missing)[:3]}')
+    if len(notes) != len(set(notes)):
+        failures.append('deal notes duplicated')
+    for w in range(writers):
+        if deal.get(f'stress_{w}') != rounds - 1:
+            failures.append(f"deal stress_{w} is {deal.get(f'stress_{w}')!r}, last write was {rounds - 1}")
+    return failures
+
+
+def main(writers: int = 8, rounds: int = 25) -> int:
+    app, workdir = load_app_on_copy()
+    client = app.app.test_client()
+    task_id = client.post('/api/tasks', json={'title': 'stress task'}).get_json()['task']['id']
+    deal_id = client.post('/api/deals', json={'dealName': 'stress deal'}).get_json()['id']
+
+    errors = []
+    threads = [
+        threading.Thread(target=run_writer, args=(app, task_id, deal_id, writer, rounds, errors))
+        for writer in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    failures = errors + check(app, task_id, deal_id, writers, rounds)
+    # Again after the write-behind threads have saved everything and the caches are dropped
+    app.task_store.flush()
+    app.task_activity.flush()
+    app.task_activity._cache.clear()
+    failures += check(app, task_id, deal_id, writers, rounds)
+
+    print(f"{writers} threads x {rounds} rounds of task PUT, comment, deal note and deal PATCH "
+          f"({writers * rounds * 4} requests) in {workdir}")
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    print('FAILED' if failures else 'OK: no lost writes')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:3])))
@@ -0,0 +1,170 @@
+"""
+Dashboard summary equivalence test
+Applies random task add / update / delete / apply / replace_all operations and
+objective edits, and after each one compares DashboardSummary (maintained by
+deltas) with full_summary() (recomputed from scratch) - full and compact
+output, at several moments around the due dates, and the cached render()
+
+    python test_dashboard_summary.py [steps] [seed]
+Exits non-zero on the first difference.
+"""
+
+import copy
+import json
+import random
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+from dashboard_summary import DashboardSummary, full_summary
+from storage import JsonBackend
+from task_store import TaskStore
+
+STATUSES = ('Open', 'In Progress', 'Waiting', 'Completed', 'Cancelled')
+OPERATIONS = ('add', 'update', 'update_in_place', 'delete', 'apply', 'replace_all', 'objectives')
+OPERATION_WEIGHTS = (6, 4, 2, 2, 2, 0.3, 1)
+
+
+def _string_keys(value):
+    # by_customer can have a None key, which json.dumps cannot sort
+    if isinstance(value, dict):
+        return {str(key): _string_keys(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_string_keys(item) for item in value]
+    return value
+
+
+def serialize(summary) -> bytes:
+    return json.dumps(_string_keys(summary), sort_keys=True, default=str).encode('utf-8')
+
+
+def random_follow_up(rng: random.Random, base: datetime):
+    """Date-only, minute and second precision values around base, and junk"""
+    moment = base + timedelta(hours=rng.randint(-72, 96), minutes=rng.choice((0, 15, 30)))
+    return rng.choice((
+        moment.strftime('%Y-%m-%d'),
+        moment.strftime('%Y-%m-%dT%H:%M'),
+        moment.strftime('%Y-%m-%dT%H:%M:%S'),
+        moment.strftime('%Y-%m-%d %H:%M:%S'),
+        'someday', '', None
+    ))
+
+
+def random_fields(rng: random.Random, base: datetime) -> dict:
+    fields = {
+        'status': rng.choice(STATUSES),
+        'priority': rng.choice(('Low', 'Medium', 'High', 'Urgent')),
+        'customer_name': rng.choice(('Acme', 'Globex', 'Initech', None)),
+        'topic_id': rng.choice(('o1', 'o2', 'o3', 'o-missing', None)),
+        'follow_up_date': random_follow_up(rng, base),
+    }
+    return {name: value for name, value in fields.items() if rng.random() < 0.7}
+
+
+def random_task(rng: random.Random, base: datetime) -> dict:
+    return dict(random_fields(rng, base), id=str(uuid.uuid4()), title='task')
+
+
+def random_objectives(rng: random.Random) -> list:
+    return [{
+        'id': objective_id,
+        'title': f'Objective {objective_id}',
+        'status': rng.choice(('Active', 'Completed', None)),
+        'key_results': [{'progress': rng.choice((0, 0.5, 1))} for _ in range(rng.randint(0, 3))]
+    } for objective_id in ('o1', 'o2', 'o3') if rng.random() < 0.8]
+
+
+def step(store: TaskStore, dashboard: DashboardSummary, objectives: list,
+         rng: random.Random, base: datetime) -> str:
+    ids = [task['id'] for task in store.all()]
+    op = rng.choices(OPERATIONS, OPERATION_WEIGHTS)[0] if ids else 'add'
+    if op == 'add':
+        store.add(random_task(rng, base))
+    elif op == 'update':
+        task = copy.deepcopy(store.get(rng.choice(ids)))
+        task.update(random_fields(rng, base))
+        store.update(task)
+    elif op == 'update_in_place':
+        task = store.get(rng.choice(ids))
+        task.update(random_fields(rng, base))
+        store.update(task)
+    elif op == 'delete':
+        store.delete(rng.choice(ids))
+    elif op == 'apply':
+        upserted = [random_task(rng, base) for _ in range(rng.randint(0, 3))]
+        for task_id in rng.sample(ids, min(len(ids), rng.randint(0, 3))):
+            upserted.append(dict(copy.deepcopy(store.get(task_id)), **random_fields(rng, base)))
+        store.apply(upserted, rng.sample(ids, min(len(ids), rng.randint(0, 2))))
+    elif op == 'replace_all':
+        kept = [copy.deepcopy(store.get(task_id)) for task_id in ids if rng.random() < 0.8]
+        rng.shuffle(kept)
+        store.replace_all(kept + [random_task(rng, base) for _ in range(rng.randint(0, 5))])
+    else:
+        objectives[:] = random_objectives(rng)
+        dashboard.objectives_changed()
+    return op
+
+
+def expand(compact: dict) -> dict:
+    """A compact summary with its task ids replaced by the tasks"""
+    tasks = compact['tasks']
+    expanded = {name: value for name, value in compact.items() if name != 'tasks'}
+    for name in ('overdue_tasks', 'urgent', 'upcoming'):
+        expanded[name] = [tasks[task_id] for task_id in compact[name]]
+    expanded['by_customer'] = {customer: [tasks[task_id] for task_id in ids]
+                               for customer, ids in compact['by_customer'].items()}
+    return expanded
+
+
+def differences(store: TaskStore, dashboard: DashboardSummary, objectives: list,
+                rng: random.Random, base: datetime) -> list:
+    problems = []
+    tasks = list(store.all())
+    for now in (base, base + timedelta(hours=rng.randint(-48, 72), minutes=rng.randint(0, 59))):
+        expected = full_summary(tasks, objectives, now)
+        for compact in (False, True):
+            actual = dashboard.summary(now, compact=compact)
+            if compact:
+                actual = expand(actual)
+            if actual != expected:
+                different = sorted(name for name in expected if actual.get(name) != expected[name])
+                problems.append(f"{'compact ' if compact else ''}summary at {now:%Y-%m-%d %H:%M} differs in {different}")
+            elif list(actual['by_customer']) != list(expected['by_customer']):
+                problems.append(f'by_customer order at {now:%Y-%m-%d %H:%M} differs')
+    # The cached response, which render() reuses until the data or the time window changes
+    rendered = dashboard.render(serialize)
+    if rendered != serialize(full_summary(tasks, objectives, datetime.now())):
+        problems.append('render() returned a stale or wrong summary')
+    return problems
+
+
+def main(steps: int = 1500, seed: int = 1) -> int:
+    rng = random.Random(seed)
+    # Due dates are spread around the real clock so render() sees overdue / today / upcoming tasks
+    base = datetime.now().replace(second=0, microsecond=0)
+    store = TaskStore(JsonBackend(tempfile.mkdtemp(prefix='dashboard-summary-check-')), flush_interval=60)
+    objectives = random_objectives(rng)
+    dashboard = DashboardSummary(store, lambda: objectives)
+
+    failures = []
+    counts = {}
+    for number in range(steps):
+        op = step(store, dashboard, objectives, rng, base)
+        counts[op] = counts.get(op, 0) + 1
+        problems = differences(store, dashboard, objectives, rng, base)
+        if problems:
+            failures.append(f'step {number} ({op}): {problems}')
+            break
+    store.close()
+
+    print(f"{steps} steps ({', '.join(f'{op} {count}' for op, count in sorted(counts.items()))}), "
+          f"{len(store)} tasks at the end")
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    print('FAILED' if failures else 'OK: the maintained summary matched a full recompute after every step')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:3])))
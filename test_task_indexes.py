@@ -0,0 +1,116 @@
+"""
+Task index consistency test
+Applies random add / update / delete / apply / replace_all operations to a
+TaskStore, changing the indexed fields, and checks check_indexes() after each
+
+    python test_task_indexes.py [steps] [seed]
+Exits non-zero if the indexes ever disagree with a full scan.
+"""
+
+import copy
+import random
+import sys
+import tempfile
+import uuid
+
+from storage import JsonBackend
+from task_store import TaskStore
+
+# Task fields behind TASK_INDEXES and the due-date index
+INDEXED_FIELDS = ('topic_id', 'project_id', 'status', 'customer_name', 'assigned_to_id',
+                  'follow_up_date', 'meeting_reference')
+# replace_all is rare so the store can grow
+OPERATIONS = ('add', 'update', 'update_in_place', 'delete', 'apply', 'replace_all')
+OPERATION_WEIGHTS = (6, 4, 2, 2, 2, 0.2)
+STATUSES = ('Open', 'In Progress', 'Completed', 'Cancelled', None)
+DUE_DATES = ('2025-01-10', '2025-01-10T09:30', '2025-01-11 08:00:00', '2025-02-01T17:00:00',
+             'not a date', '', None)
+
+
+def random_fields(rng: random.Random) -> dict:
+    """Values for the indexed fields, including missing, None and unhashable ones"""
+    fields = {
+        'topic_id': rng.choice(('t1', 't2', 't3', None)),
+        'project_id': rng.choice(('p1', 'p2', None, ['p1'])),
+        'status': rng.choice(STATUSES),
+        'customer_name': rng.choice(('Acme', 'Globex', None)),
+        'assigned_to_id': rng.choice(('u1', 'u2', None)),
+        'follow_up_date': rng.choice(DUE_DATES),
+        'meeting_reference': rng.choice(({'meeting_id': 'm1'}, {'meeting_id': 'm2'}, {}, None, 'm1')),
+    }
+    # Sometimes leave fields out altogether
+    return {name: value for name, value in fields.items() if rng.random() < 0.8}
+
+
+def random_task(rng: random.Random) -> dict:
+    return dict(random_fields(rng), id=str(uuid.uuid4()), title='task')
+
+
+def step(store: TaskStore, rng: random.Random) -> str:
+    """Apply one random mutation, returning its description"""
+    ids = [task['id'] for task in store.all()]
+    op = rng.choices(OPERATIONS, OPERATION_WEIGHTS)[0] if ids else 'add'
+    if op == 'add':
+        store.add(random_task(rng))
+    elif op == 'update':
+        task = copy.deepcopy(store.get(rng.choice(ids)))
+        task.update(random_fields(rng))
+        for name in rng.sample(INDEXED_FIELDS, 2):
+            if rng.random() < 0.3:
+                task.pop(name, None)
+        store.update(task)
+    elif op == 'update_in_place':
+        # The pattern routes use: modify the stored dict, then hand it back
+        task = store.get(rng.choice(ids))
+        task.update(random_fields(rng))
+        store.update(task)
+    elif op == 'delete':
+        store.delete(rng.choice(ids + ['missing-id']))
+    elif op == 'apply':
+        upserted = [random_task(rng) for _ in range(rng.randint(0, 3))]
+        for task_id in rng.sample(ids, min(len(ids), rng.randint(0, 3))):
+            upserted.append(dict(copy.deepcopy(store.get(task_id)), **random_fields(rng)))
+        deleted = rng.sample(ids, min(len(ids), rng.randint(0, 2)))
+        store.apply(upserted, deleted)
+    else:
+        kept = [dict(copy.deepcopy(store.get(task_id)), **random_fields(rng))
+                for task_id in ids if rng.random() < 0.7]
+        store.replace_all(kept + [random_task(rng) for _ in range(rng.randint(0, 5))])
+    return op
+
+
+def main(steps: int = 2000, seed: int = 1) -> int:
+    rng = random.Random(seed)
+    store = TaskStore(JsonBackend(tempfile.mkdtemp(prefix='task-index-check-')), flush_interval=60)
+    failures = []
+    counts = {}
+    for number in range(steps):
+        op = step(store, rng)
+        counts[op] = counts.get(op, 0) + 1
+        problems = store.check_indexes()
+        if problems:
+            failures.append(f'step {number} ({op}): {problems[:3]}')
+            break
+
+    # The check itself must notice a task changed without update()
+    control = next((task for task in store.all() if task.get('status') not in ('Completed', 'Cancelled')), None)
+    if control is not None:
+        control['project_id'] = 'changed-behind-the-store'
+        control['follow_up_date'] = '1999-01-01'
+        if not store.check_indexes():
+            failures.append('check_indexes() missed a task modified without update()')
+        store.update(control)
+        if store.check_indexes():
+            failures.append('check_indexes() still failing after update()')
+    store.close()
+
+    print(f"{steps} steps ({', '.join(f'{op} {count}' for op, count in sorted(counts.items()))}), "
+          f"{len(store)} tasks at the end")
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    print('FAILED' if failures else 'OK: indexes matched a full scan after every step')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:3])))
@@ -0,0 +1,105 @@
+"""
+Working Calendar Module
+Working-day arithmetic (weekends and holidays) for capacity and duration
+calculations, in constant time per query plus a binary search over holidays
+"""
+
+import logging
+from bisect import bisect_left
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Monday = 0 ... Sunday = 6
+DEFAULT_WORKDAYS = (0, 1, 2, 3, 4)
+
+
+def _as_workdays(values: Iterable) -> frozenset:
+    """Weekday numbers 0-6 from ints or numeric strings; anything else is dropped"""
+    if isinstance(values, (int, str)):
+        values = [values]
+    elif not isinstance(values, Iterable):
+        logger.warning(f"Ignoring working days {values!r}: not a list of weekday numbers")
+        return frozenset()
+    workdays = set()
+    for value in values:
+        try:
+            day = int(value)
+        except (TypeError, ValueError):
+            day = None
+        if day is None or not 0 <= day <= 6:
+            logger.warning(f"Ignoring working day {value!r}: not a weekday number 0-6")
+            continue
+        workdays.add(day)
+    return frozenset(workdays)
+
+
+def _as_date(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            return date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    return None
+
+
+class WorkingCalendar:
+    """Which weekdays are worked, and which dates are holidays
+
+    working_days() counts whole weeks arithmetically, looks the leftover
+    days up in a 7 x 7 table built once, and subtracts the holidays in the
+    range found by bisecting the sorted holiday list, so a query costs
+    O(log holidays) however long the range is. Holidays that fall on a
+    day off are dropped when the calendar is built.
+    """
+
+    def __init__(self, holidays: Iterable = (), workdays: Iterable[int] = DEFAULT_WORKDAYS):
+        self.workdays = _as_workdays(workdays)
+        parsed = {_as_date(holiday) for holiday in holidays}
+        if None in parsed:
+            logger.warning("Ignoring holidays that are not ISO dates")
+            parsed.discard(None)
+        # All of them, for calendars derived from this one with other workdays
+        self._all_holidays = parsed
+        self.holidays = sorted(day for day in parsed if day.weekday() in self.workdays)
+        # _partial[weekday][n]: working days among the n days starting on that weekday (n < 7)
+        self._partial = [
+            [sum(1 for offset in range(n) if (weekday + offset) % 7 in self.workdays) for n in range(7)]
+            for weekday in range(7)
+        ]
+
+    def is_working_day(self, day) -> bool:
+        day = _as_date(day)
+        if day is None or day.weekday() not in self.workdays:
+            return False
+        index = bisect_left(self.holidays, day)
+        return index == len(self.holidays) or self.holidays[index] != day
+
+    def working_days(self, start, end) -> int:
+        """Working days in [start, end) - the end date itself is not counted"""
+        start, end = _as_date(start), _as_date(end)
+        if start is None or end is None or end <= start:
+            return 0
+        weeks, rest = divmod((end - start).days, 7)
+        count = weeks * len(self.workdays) + self._partial[start.weekday()][rest]
+        return count - (bisect_left(self.holidays, end) - bisect_left(self.holidays, start))
+
+    def for_record(self, record: Dict) -> 'WorkingCalendar':
+        """
+        The calendar of a project or resource: its own ``working_days``
+        (weekday numbers) if set, and its ``holidays`` on top of this
+        calendar's
+        """
+        # Stored values may be strings ("1") or junk; without a valid one this calendar's apply
+        workdays = _as_workdays(record.get('working_days') or ()) or self.workdays
+        holidays = record.get('holidays') or []
+        if not isinstance(holidays, (list, tuple, set)):
+            holidays = [holidays]
+        if workdays == self.workdays and not holidays:
+            return self
+        return WorkingCalendar(list(self._all_holidays) + list(holidays), workdays)